@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from drf_yasg import __version__ as DRF_YASG_VERSION
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+from scraping_data.reports import ecrire_atomique
+
+INFO = openapi.Info(
+    title="Scraping API",
+    default_version='v1',
+    description="API exposant des données scrapées",
+)
+
+schema_view = get_schema_view(
+    INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+DOSSIERS_IGNORES = {"__pycache__", "node_modules", "venv", "env", "reports", "spec_cache", "schema_cache"}
+
+
+def dossier_cache_schema():
+    return Path(getattr(settings, "SCHEMA_CACHE_DIR", Path(settings.BASE_DIR) / "schema_cache"))
+
+
+# ✅ Empreinte du déploiement : change dès que le code (donc potentiellement le schéma) change
+@lru_cache(maxsize=1)
+def empreinte_deploiement():
+    """SCHEMA_CACHE_VERSION (ex. identifiant de build) si défini, sinon empreinte des sources .py du projet."""
+    version = getattr(settings, "SCHEMA_CACHE_VERSION", None)
+    if version:
+        return hashlib.sha1(str(version).encode("utf-8")).hexdigest()[:16]
+
+    h = hashlib.sha1(DRF_YASG_VERSION.encode("utf-8"))
+    for racine, dossiers, fichiers in os.walk(settings.BASE_DIR):
+        dossiers[:] = sorted(d for d in dossiers if not d.startswith(".") and d not in DOSSIERS_IGNORES)
+        for nom in sorted(fichiers):
+            if nom.endswith(".py"):
+                stat = os.stat(os.path.join(racine, nom))
+                h.update(f"{os.path.relpath(os.path.join(racine, nom), settings.BASE_DIR)}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    return h.hexdigest()[:16]
+
+
+class SchemaEnCache:
+    """
+    Document OpenAPI généré une seule fois par déploiement : en mémoire, et sur disque pour
+    les autres processus (workers) et les redémarrages. Version JSON et version gzip pré-calculées.
+    """
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._entree = None  # (empreinte, corps, corps_gzip, etag)
+        self.generations = 0
+
+    def _generer(self):
+        generator = schema_view.generator_class(INFO, "", None, None, None)
+        schema = generator.get_schema(request=None, public=True)
+        self.generations += 1
+        return OpenAPICodecJson(validators=[]).encode(schema)
+
+    def _charger(self, empreinte):
+        chemin = dossier_cache_schema() / f"openapi-{empreinte}.json"
+        try:
+            corps = chemin.read_bytes()
+            corps_gzip = chemin.with_suffix(".json.gz").read_bytes()
+        except FileNotFoundError:
+            corps = self._generer()
+            corps_gzip = gzip.compress(corps, compresslevel=9, mtime=0)
+            ecrire_atomique(chemin, corps)
+            ecrire_atomique(chemin.with_suffix(".json.gz"), corps_gzip)
+        etag = f'"{hashlib.sha256(corps).hexdigest()[:32]}"'
+        return empreinte, corps, corps_gzip, etag
+
+    def obtenir(self):
+        empreinte = empreinte_deploiement()
+        entree = self._entree
+        if entree is None or entree[0] != empreinte:
+            with self._verrou:
+                if self._entree is None or self._entree[0] != empreinte:
+                    self._entree = self._charger(empreinte)
+                entree = self._entree
+        return entree
+
+    def invalider(self):
+        with self._verrou:
+            self._entree = None
+        empreinte_deploiement.cache_clear()
+
+
+schema_en_cache = SchemaEnCache()
+
+
+def _etag_correspond(if_none_match, etag):
+    valeurs = [v.strip().removeprefix("W/") for v in if_none_match.split(",")]
+    return "*" in valeurs or etag in valeurs
+
+
+# ✅ Document OpenAPI servi depuis le cache : ETag / 304 et gzip
+def schema_openapi(request):
+    _, corps, corps_gzip, etag = schema_en_cache.obtenir()
+    en_gzip = "gzip" in request.headers.get("Accept-Encoding", "")
+    if en_gzip:
+        etag = f'{etag[:-1]}-gz"'  # ETag fort : un validateur distinct par représentation (RFC 9110 §8.8.3)
+
+    if _etag_correspond(request.headers.get("If-None-Match", ""), etag):
+        reponse = HttpResponseNotModified()
+    elif en_gzip:
+        reponse = HttpResponse(corps_gzip, content_type="application/json")
+        reponse["Content-Encoding"] = "gzip"
+    else:
+        reponse = HttpResponse(corps, content_type="application/json")
+
+    reponse["ETag"] = etag
+    reponse["Cache-Control"] = "no-cache"  # revalidation systématique (304), jamais de version périmée
+    patch_vary_headers(reponse, ("Accept-Encoding",))
+    return reponse
+
+
+swagger_ui = schema_view.with_ui('swagger', cache_timeout=0)
+
+
+def swagger(request, *args, **kwargs):
+    """/swagger/ : interface Swagger UI, ou document OpenAPI en cache avec ?format=openapi."""
+    if request.GET.get("format") in ("openapi", "json"):
+        return schema_openapi(request)
+    return swagger_ui(request, *args, **kwargs)
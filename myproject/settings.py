@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,8 +51,14 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'scraping_data.middleware.ProfilingMiddleware',
 ]
 
+# Profilage par vue (SQL, JSONField, templates, HTTP sortant) : désactivé par défaut
+PROFILING_ENABLED = False
+PROFILING_SLOW_MS = 500       # seuil de conservation des piles cProfile
+PROFILING_SAMPLE_RATE = 0.0   # fraction des requêtes exécutées sous cProfile
+
 ROOT_URLCONF = 'myproject.urls'
 
 TEMPLATES = [
@@ -130,3 +137,76 @@ STATIC_URL = 'static/'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = '/swagger/'  # par exemple si tu veux rediriger vers la doc
+
+# Rapports Swagger versionnés : reports/<projet>/<version>.json + index.json
+SWAGGER_REPORTS_DIR = BASE_DIR / 'reports'
+SWAGGER_REPORTS_KEEP = 20  # versions conservées par projet (0 : toutes)
+
+# Cache disque des documents de spec téléchargés ($ref externes), revalidé par ETag
+SPEC_CACHE_DIR = BASE_DIR / 'spec_cache'
+
+# Limitation des requêtes de test sortantes (None = pas de plafond fixe, seuls 429 / Retry-After / X-RateLimit-* s'appliquent)
+RATE_LIMIT_HOST_RPS = None
+RATE_LIMIT_HOSTS = {}            # plafonds par hôte, ex. {'api.example.com': 5}
+RATE_LIMIT_PROJECT_RPS = None
+RATE_LIMIT_MAX_CONCURRENCY = 32  # plafond de la concurrence adaptative (AIMD) par hôte
+RATE_LIMIT_RETRIES = 3
+
+# Document OpenAPI de /swagger/ mis en cache (mémoire + disque) ; invalidé quand la version change.
+# Sans DEPLOY_ID, la version est une empreinte des sources .py du projet.
+SCHEMA_CACHE_DIR = BASE_DIR / 'schema_cache'
+SCHEMA_CACHE_VERSION = os.environ.get('DEPLOY_ID')
+
+# Campagnes de tests distribuées (sweep_worker) : durée d'un bail, prolongé par battements, et reprises maximum
+SWEEP_LEASE_SECONDS = 60
+SWEEP_MAX_ATTEMPTS = 3
+
+# Flux d'événements SSE (progression du scraping, tests en masse en direct)
+EVENTS_BUFFER_SIZE = 1000          # événements gardés par tâche pour la reprise (Last-Event-ID)
+EVENTS_BACKPRESSURE_SECONDS = 5.0  # attente max d'un producteur devant un client lent
+EVENTS_TTL_SECONDS = 600           # durée de conservation d'un flux terminé
+
+# Supervision synthétique (run_monitors) : concurrence, gigue (fraction de l'intervalle) et rétention en jours
+MONITOR_CONCURRENCY = 16
+MONITOR_PROJECT_CONCURRENCY = 4
+MONITOR_JITTER = 0.1
+MONITOR_RETENTION_DAYS = {'raw': 2, '1m': 30, '1h': 400}
+
+# Blob store : contenu décompressé gardé en mémoire (LRU) dans la limite d'un budget ; les blobs plus gros ne sont pas cachés
+BLOB_CACHE_MAX_BYTES = 64 * 1024 * 1024
+BLOB_CACHE_MAX_ENTRY_BYTES = 4 * 1024 * 1024
+
+# Tests d'endpoints : requêtes gardées dans l'historique partagé (export JSON), concurrence max des tests en masse
+TEST_HISTORY_MAX = 1000
+TESTS_MAX_CONCURRENCY = 32
+
+# Recherche d'endpoints : index en mémoire resynchronisé en tâche de fond au plus toutes les N secondes (projets
+# modifiés par d'autres processus ; ceux de ce processus sont réindexés dès leur enregistrement)
+SEARCH_SYNC_SECONDS = 60
+
+# Historique des versions de spec : un instantané complet toutes les N versions, des deltas entre les deux
+SPEC_SNAPSHOT_INTERVAL = 10
+
+# Réponses de référence (golden) : chemins JSONPath ignorés par toutes les comparaisons, en plus de ceux de chaque référence
+GOLDEN_IGNORE_PATHS = []
+# Arbres des réponses de référence gardés en mémoire : budget en octets de JSON source (références > 1/4 du budget non cachées)
+GOLDEN_TREE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+# Cache HTTP du testeur interactif (projets avec cache_enabled) : budget mémoire total et taille max d'une réponse
+HTTP_CACHE_MAX_BYTES = 32 * 1024 * 1024
+HTTP_CACHE_MAX_ENTRY_BYTES = 2 * 1024 * 1024
+
+# Authentification des requêtes de test (AuthProfile) : cache des profils, renouvellement anticipé des jetons OAuth2
+AUTH_PROFILE_CACHE_SECONDS = 30
+AUTH_REFRESH_AHEAD_SECONDS = 60
+AUTH_TOKEN_TIMEOUT = 10
+
+# Collecte de produits (products.py, crawl_products) : sources paginées, concurrence et taille des lots d'upsert
+PRODUCT_SOURCES = {
+    "fakestoreapi": {"url": "https://fakestoreapi.com/products"},
+    "dummyjson": {"url": "https://dummyjson.com/products", "pagination": "offset", "page_size": 100,
+                  "offset_param": "skip", "limit_param": "limit", "items_path": "products", "total_path": "total"},
+}
+PRODUCT_DEFAULT_SOURCE = "fakestoreapi"
+PRODUCT_CRAWL_CONCURRENCY = 8
+PRODUCT_BATCH_SIZE = 1000
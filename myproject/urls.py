@@ -1,19 +1,8 @@
 from django.contrib import admin
 from django.urls import path, include
 from django.shortcuts import redirect
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 
-schema_view = get_schema_view(
-    openapi.Info(
-        title="Scraping API",
-        default_version='v1',
-        description="API exposant des données scrapées",
-    ),
-    public=True,
-    permission_classes=(permissions.AllowAny,),
-)
+from .schema import schema_openapi, swagger
 
 def home(request):
     return redirect('schema-swagger-ui')
@@ -21,7 +10,9 @@ def home(request):
 urlpatterns = [
     path('', home, name='home'),
     path('admin/', admin.site.urls),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
+    # UI Swagger ; le document OpenAPI (?format=openapi, swagger.json) est généré une fois par déploiement
+    path('swagger/', swagger, name='schema-swagger-ui'),
+    path('swagger.json', schema_openapi, name='schema-json'),
     # Une seule inclusion, avec namespace
     path('api/', include(('scraping_data.urls', 'scraping_data'), namespace='scraping_data')),
 ]
@@ -1,3 +1,50 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import AuthProfile, GoldenResponse, Monitor, Sweep, SwaggerProject, TestPlan
+
+
+@admin.register(SwaggerProject)
+class SwaggerProjectAdmin(admin.ModelAdmin):
+    # swagger_json (blob store) n'est jamais chargé par la liste ni par le formulaire
+    list_display = ('id', 'name', 'swagger_url', 'endpoint_count', 'spec_size', 'last_scraped_at', 'created_at')
+    search_fields = ('name', 'swagger_url')
+    ordering = ('-created_at', '-id')
+    fields = ('name', 'swagger_url', 'cache_enabled', 'endpoint_count', 'spec_size', 'last_scraped_at', 'created_at')
+    readonly_fields = ('endpoint_count', 'spec_size', 'last_scraped_at', 'created_at')
+    show_full_result_count = False
+
+
+@admin.register(TestPlan)
+class TestPlanAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'project', 'updated_at')
+    list_select_related = ('project',)
+    search_fields = ('name',)
+
+
+@admin.register(Sweep)
+class SweepAdmin(admin.ModelAdmin):
+    list_display = ('id', 'project', 'status', 'total', 'created_at', 'finished_at')
+    list_select_related = ('project',)
+    list_filter = ('status',)
+
+
+@admin.register(Monitor)
+class MonitorAdmin(admin.ModelAdmin):
+    list_display = ('id', 'endpoint', 'interval_seconds', 'enabled', 'next_run_at', 'last_run_at', 'missed_runs')
+    list_select_related = ('endpoint',)
+    list_filter = ('enabled',)
+
+
+@admin.register(GoldenResponse)
+class GoldenResponseAdmin(admin.ModelAdmin):
+    list_display = ('id', 'project', 'method', 'endpoint', 'status_code', 'recorded_at')
+    list_select_related = ('project',)
+    search_fields = ('endpoint',)
+    readonly_fields = ('params_hash', 'parameters', 'body_blob', 'recorded_at')
+
+
+@admin.register(AuthProfile)
+class AuthProfileAdmin(admin.ModelAdmin):
+    list_display = ('id', 'project', 'kind', 'enabled', 'updated_at')
+    list_select_related = ('project',)
+    list_filter = ('kind', 'enabled')
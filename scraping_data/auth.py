@@ -0,0 +1,176 @@
+import base64
+import hashlib
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from .models import AuthProfile
+
+
+class ErreurAuth(requests.RequestException):
+    """Échec d'obtention d'un jeton : traité par executer_test comme une erreur réseau."""
+
+
+class Jeton:
+    def __init__(self, valeur, expire_a):
+        self.valeur = valeur
+        self.expire_a = expire_a  # time.monotonic()
+
+
+# ✅ Jeton OAuth2 (client credentials)
+def demander_jeton(profil):
+    donnees = {"grant_type": "client_credentials"}
+    if profil.scope:
+        donnees["scope"] = profil.scope
+    resp = requests.post(profil.token_url, data=donnees, auth=(profil.client_id, profil.client_secret),
+                         timeout=getattr(settings, "AUTH_TOKEN_TIMEOUT", 10))
+    if resp.status_code != 200:
+        raise ErreurAuth(f"Jeton OAuth2 refusé par {profil.token_url} : HTTP {resp.status_code}")
+    try:
+        corps = resp.json()
+        valeur = corps["access_token"]
+        duree = float(corps.get("expires_in") or 3600)
+    except (ValueError, KeyError, TypeError):
+        raise ErreurAuth(f"Réponse inattendue de {profil.token_url} (access_token absent)")
+    return Jeton(valeur, time.monotonic() + duree)
+
+
+class GestionnaireAuth:
+    """
+    Authentification des requêtes de test, partagée par tous les threads du processus :
+    - profils des projets gardés AUTH_PROFILE_CACHE_SECONDS (pas de requête SQL par requête de test) ;
+    - jetons OAuth2 mis en cache jusqu'à expiration, un seul renouvellement à la fois par profil ;
+    - renouvellement anticipé : à moins de AUTH_REFRESH_AHEAD_SECONDS de l'expiration, le jeton courant est
+      encore servi pendant qu'un thread en demande un nouveau (les tests ne l'attendent jamais).
+    """
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._profils = {}
+        self._jetons = {}
+        self._verrous_jetons = {}
+        self._en_renouvellement = set()
+
+    def profil(self, projet_id):
+        ttl = getattr(settings, "AUTH_PROFILE_CACHE_SECONDS", 30)
+        maintenant = time.monotonic()
+        with self._verrou:
+            en_cache = self._profils.get(projet_id)
+        if en_cache and maintenant - en_cache[1] < ttl:
+            return en_cache[0]
+        profil = AuthProfile.objects.filter(project_id=projet_id, enabled=True).first()
+        with self._verrou:
+            self._profils[projet_id] = (profil, maintenant)
+        return profil
+
+    def oublier(self, projet_id):
+        """Après modification d'un profil : relu à la prochaine requête, jeton redemandé."""
+        with self._verrou:
+            self._profils.pop(projet_id, None)
+            for cle in [c for c in self._jetons if c[0] == projet_id]:
+                del self._jetons[cle]
+
+    def _cle(self, profil):
+        return profil.project_id, profil.pk, profil.updated_at
+
+    def _verrou_jeton(self, cle):
+        with self._verrou:
+            return self._verrous_jetons.setdefault(cle, threading.Lock())
+
+    def _renouveler(self, profil, cle):
+        jeton = demander_jeton(profil)
+        with self._verrou:
+            self._jetons[cle] = jeton
+        return jeton
+
+    def _renouveler_en_fond(self, profil, cle, marge):
+        with self._verrou:
+            if cle in self._en_renouvellement:
+                return
+            self._en_renouvellement.add(cle)
+
+        def renouveler():
+            try:
+                with self._verrou_jeton(cle):
+                    jeton = self._jetons.get(cle)
+                    if jeton is None or jeton.expire_a - time.monotonic() <= marge:
+                        self._renouveler(profil, cle)
+            except requests.RequestException:
+                pass  # le jeton courant reste valable ; nouvel essai à la requête suivante
+            finally:
+                with self._verrou:
+                    self._en_renouvellement.discard(cle)
+
+        threading.Thread(target=renouveler, daemon=True).start()
+
+    def jeton(self, profil):
+        cle = self._cle(profil)
+        marge = getattr(settings, "AUTH_REFRESH_AHEAD_SECONDS", 60)
+        jeton = self._jetons.get(cle)
+        if jeton is not None and time.monotonic() < jeton.expire_a:
+            if jeton.expire_a - time.monotonic() <= marge:
+                self._renouveler_en_fond(profil, cle, marge)
+            return jeton.valeur
+        with self._verrou_jeton(cle):  # les autres threads attendent le jeton demandé par le premier
+            jeton = self._jetons.get(cle)
+            if jeton is not None and time.monotonic() < jeton.expire_a:
+                return jeton.valeur
+            return self._renouveler(profil, cle).valeur
+
+    def invalider(self, projet_id, autorisation):
+        """Jeton refusé (401) : oublié, sauf s'il a déjà été remplacé par un autre thread."""
+        with self._verrou:
+            for cle in [c for c, j in self._jetons.items() if c[0] == projet_id and f"Bearer {j.valeur}" == autorisation]:
+                del self._jetons[cle]
+
+    def empreinte(self, projet_id):
+        """Empreinte des identifiants du projet (None sans profil) : clé du cache HTTP, stable d'un jeton OAuth2 à l'autre."""
+        profil = self.profil(projet_id) if projet_id is not None else None
+        if profil is None:
+            return None
+        return hashlib.sha256(f"{profil.pk}:{profil.kind}:{profil.updated_at.isoformat()}".encode("utf-8")).hexdigest()[:32]
+
+    # ✅ En-têtes et paramètres à injecter dans une requête de test
+    def authentification(self, projet_id):
+        """Retourne (en-têtes, paramètres de query, type de profil ou None)."""
+        profil = self.profil(projet_id) if projet_id is not None else None
+        if profil is None:
+            return {}, {}, None
+        if profil.kind == 'bearer':
+            return {'Authorization': f"Bearer {profil.token}"}, {}, profil.kind
+        if profil.kind == 'api_key':
+            if profil.api_key_location == 'query':
+                return {}, {profil.api_key_name: profil.api_key}, profil.kind
+            return {profil.api_key_name: profil.api_key}, {}, profil.kind
+        if profil.kind == 'basic':
+            identifiants = base64.b64encode(f"{profil.username}:{profil.password}".encode("utf-8")).decode("ascii")
+            return {'Authorization': f"Basic {identifiants}"}, {}, profil.kind
+        return {'Authorization': f"Bearer {self.jeton(profil)}"}, {}, profil.kind
+
+    async def aauthentification(self, projet_id):
+        # Tâches asynchrones : SQL et appel au serveur de jetons dans un thread, mêmes caches et verrous
+        return await sync_to_async(self.authentification, thread_sensitive=False)(projet_id)
+
+    # ✅ Session de scraping : authentification du projet pour l'hôte de la spec uniquement
+    def session(self, projet_id, url):
+        """Les $ref vers d'autres hôtes sont téléchargées sans les identifiants du projet."""
+        session = requests.Session()
+        headers, params, _ = self.authentification(projet_id)
+        if headers or params:
+            hote = urlparse(url).netloc
+
+            def authentifier(requete):
+                if urlparse(requete.url).netloc == hote:
+                    requete.headers.update(headers)
+                    requete.prepare_url(requete.url, params)
+                return requete
+
+            session.auth = authentifier
+        return session
+
+
+gestionnaire_auth = GestionnaireAuth()
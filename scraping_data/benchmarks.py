@@ -0,0 +1,162 @@
+import json
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from django.db import transaction
+from django.test import RequestFactory, override_settings
+
+from .search import index_recherche
+
+TAILLES_PAR_DEFAUT = (100, 1000, 10000, 50000)
+
+# Métriques comparées à la baseline (plus petit = meilleur)
+METRIQUES = ("parse_s", "enrich_s", "memoire_pic_mo", "ecriture_db_s", "rendu_rapport_s", "taille_api_octets",
+             "diff_golden_us")
+
+METHODES = ("get", "post", "put", "delete")
+
+
+# ✅ Spécification OpenAPI synthétique et déterministe de n endpoints
+def generer_spec(nb_endpoints):
+    paths = {}
+    for i in range(nb_endpoints):
+        ressource = f"/ressource{i // len(METHODES)}"
+        method = METHODES[i % len(METHODES)]
+        chemin = ressource if method == "post" else f"{ressource}/{{id}}"
+
+        operation = {
+            "summary": f"Opération {i}",
+            "parameters": [
+                {"name": "limit", "in": "query", "schema": {"type": "integer", "default": 10}},
+                {"name": "X-Trace", "in": "header", "schema": {"type": "string"}},
+            ],
+            "responses": {"200": {"content": {"application/json": {"schema": {
+                "type": "object",
+                "properties": {"id": {"type": "integer"}, "nom": {"type": "string"}},
+            }}}}},
+        }
+        if chemin.endswith("{id}"):
+            operation["parameters"].append({"name": "id", "in": "path", "required": True, "schema": {"type": "integer"}})
+        if method in ("post", "put"):
+            operation["requestBody"] = {"content": {"application/json": {"schema": {
+                "type": "object",
+                "required": ["nom"],
+                "properties": {"nom": {"type": "string"}, "prix": {"type": "number"}},
+            }}}}
+
+        paths.setdefault(chemin, {})[method] = operation
+
+    return {
+        "openapi": "3.0.0",
+        "info": {"title": f"Bench {nb_endpoints}", "version": "1.0"},
+        "paths": paths,
+    }
+
+
+def _chrono(fonction, *args, **kwargs):
+    debut = time.perf_counter()
+    resultat = fonction(*args, **kwargs)
+    return resultat, time.perf_counter() - debut
+
+
+# ✅ Coût du diff golden par réponse (µs) : liste de n objets, un champ modifié, un horodatage ignoré
+def mesurer_diff_golden(nb_elements, repetitions=20):
+    from .golden import arbre, compiler_motifs, differences
+
+    motifs = compiler_motifs(("$..updated_at",))
+    reference = [{"id": i, "nom": f"Produit {i}", "prix": i * 1.5, "updated_at": "2024-01-01"} for i in range(nb_elements)]
+    nouvelle = [dict(element, updated_at="2024-06-01") for element in reference]
+    nouvelle[nb_elements // 2]["prix"] = -1
+    arbre_reference = arbre(reference, motifs)  # calculé une fois par référence (arbre_golden)
+    texte = json.dumps(nouvelle)
+
+    durees = []
+    for _ in range(repetitions):
+        _, duree = _chrono(lambda: differences(arbre_reference, arbre(json.loads(texte), motifs)))
+        durees.append(duree)
+    return statistics.median(durees) * 1e6
+
+
+# ✅ Mesure d'une exécution complète du pipeline pour une taille donnée
+def mesurer_pipeline(nb_endpoints, url="https://bench.example.com/v3/api-docs"):
+    """
+    scrape (décodage + extraction) → enrich → écritures du scraping → rendu du rapport → taille de l'API.
+    ecriture_db_s couvre tout ce que fait scraper_projet après le téléchargement : projet, version de spec,
+    rapport (dans un dossier temporaire), index de recherche et lignes Endpoint.
+    Les écritures en base sont annulées à la fin (transaction avec rollback).
+    """
+    from .views import (SwaggerScrapeAPIView, afficher_rapport_swagger, enregistrer_projet, enrich_and_save,
+                        extraire_endpoints)
+
+    brut = json.dumps(generer_spec(nb_endpoints)).encode("utf-8")
+
+    tracemalloc.start()
+    endpoints, parse_s = _chrono(lambda: extraire_endpoints(json.loads(brut)))
+    endpoints, enrich_s = _chrono(enrich_and_save, endpoints, url)
+    _, pic = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    factory = RequestFactory()
+    with tempfile.TemporaryDirectory() as rapports, override_settings(SWAGGER_REPORTS_DIR=rapports), \
+            transaction.atomic():
+        projet, ecriture_db_s = _chrono(enregistrer_projet, url, endpoints)
+        reponse, rendu_rapport_s = _chrono(
+            afficher_rapport_swagger, factory.get("/api/rapport-swagger/", {"id": projet.pk})
+        )
+        # Payload du seul projet de bench : indépendant des autres projets présents en base
+        api = SwaggerScrapeAPIView.as_view()(factory.get("/api/swagger/endpoints/", {"project": projet.pk}))
+        api.render()
+        transaction.set_rollback(True)
+    index_recherche.retirer(projet.pk)  # projet annulé : plus dans l'index
+
+    return {
+        "endpoints": len(endpoints),
+        "parse_s": parse_s,
+        "enrich_s": enrich_s,
+        "memoire_pic_mo": pic / (1024 * 1024),
+        "ecriture_db_s": ecriture_db_s,
+        "rendu_rapport_s": rendu_rapport_s,
+        "taille_rapport_octets": len(reponse.content),
+        "taille_api_octets": len(api.content),
+        "diff_golden_us": mesurer_diff_golden(min(nb_endpoints, 1000)),
+    }
+
+
+# ✅ Médiane de plusieurs exécutions par taille
+def executer_benchmarks(tailles=TAILLES_PAR_DEFAUT, repetitions=3):
+    resultats = {}
+    for taille in tailles:
+        mesures = [mesurer_pipeline(taille) for _ in range(repetitions)]
+        resultats[str(taille)] = {
+            cle: round(statistics.median(m[cle] for m in mesures), 6)
+            for cle in mesures[0]
+        }
+    return resultats
+
+
+# ✅ Comparaison avec une baseline enregistrée
+def comparer_baseline(resultats, baseline, seuil=0.20):
+    """
+    Retourne la liste des régressions : métrique dépassant la baseline de plus de `seuil` (20 % par défaut).
+    """
+    regressions = []
+    for taille, mesures in resultats.items():
+        reference = baseline.get(taille)
+        if not reference:
+            continue
+        for metrique in METRIQUES:
+            avant, apres = reference.get(metrique), mesures.get(metrique)
+            if not avant or apres is None:
+                continue
+            ecart = (apres - avant) / avant
+            if ecart > seuil:
+                regressions.append({
+                    "taille": taille,
+                    "metrique": metrique,
+                    "baseline": avant,
+                    "mesure": apres,
+                    "ecart_pct": round(ecart * 100, 1),
+                })
+    return regressions
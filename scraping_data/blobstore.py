@@ -0,0 +1,152 @@
+import gzip
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .middleware import sonde
+
+try:  # zstd si disponible, sinon gzip (bibliothèque standard)
+    import zstandard
+except ImportError:
+    zstandard = None
+
+CODEC_PAR_DEFAUT = "zstd" if zstandard else "gzip"
+
+
+def compresser(data, codec=CODEC_PAR_DEFAUT):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=6, mtime=0)
+    raise ValueError(f"Codec inconnu : {codec}")
+
+
+def decompresser(data, codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Le paquet zstandard est requis pour lire ce blob.")
+        return zstandard.ZstdDecompressor().decompress(data)
+    if codec == "gzip":
+        return gzip.decompress(data)
+    raise ValueError(f"Codec inconnu : {codec}")
+
+
+def empreinte(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+# ✅ Écriture d'un blob : adressé par son contenu, jamais dupliqué
+def stocker_blob(data):
+    """Compresse et enregistre `data` (bytes) ; retourne son empreinte sha256."""
+    from .models import SpecBlob
+
+    sha = empreinte(data)
+    # Blob déjà présent : sa date est rafraîchie, le ramasse-miettes (purger_blobs) ne le prend pas pour un orphelin
+    if not SpecBlob.objects.filter(pk=sha).update(created_at=timezone.now()):
+        try:
+            with transaction.atomic():
+                SpecBlob.objects.create(
+                    sha256=sha,
+                    codec=CODEC_PAR_DEFAUT,
+                    size=len(data),
+                    data=compresser(data),
+                )
+        except IntegrityError:
+            pass  # écrit en parallèle par une autre requête : même contenu
+    return sha
+
+
+# Les blobs sont immuables : le contenu décompressé des petits blobs est gardé en mémoire (LRU borné en octets)
+_verrou_cache = threading.Lock()
+_cache = OrderedDict()  # sha -> contenu décompressé
+_octets_cache = 0
+
+
+def lire_blob(sha):
+    global _octets_cache
+    from .models import SpecBlob
+
+    with _verrou_cache:
+        if sha in _cache:
+            _cache.move_to_end(sha)
+            return _cache[sha]
+    contenu = SpecBlob.objects.get(pk=sha).contenu()
+    if len(contenu) > getattr(settings, "BLOB_CACHE_MAX_ENTRY_BYTES", 4 * 1024 * 1024):
+        return contenu  # gros blob : relu depuis la base à chaque fois
+    with _verrou_cache:
+        if sha not in _cache:
+            _cache[sha] = contenu
+            _octets_cache += len(contenu)
+        budget = getattr(settings, "BLOB_CACHE_MAX_BYTES", 64 * 1024 * 1024)
+        while _octets_cache > budget and _cache:
+            _octets_cache -= len(_cache.popitem(last=False)[1])
+    return contenu
+
+
+def vider_cache():
+    global _octets_cache
+    with _verrou_cache:
+        _cache.clear()
+        _octets_cache = 0
+
+
+def encoder_json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def stocker_json(obj):
+    return stocker_blob(encoder_json(obj))
+
+
+@sonde("json_decode_ms")
+def lire_json(sha):
+    # Nouvel objet à chaque lecture : les appelants peuvent le modifier
+    return json.loads(lire_blob(sha))
+
+
+@sonde("json_decode_ms")
+def lire_json_blob(blob):
+    """Même décodage qu'lire_json pour un SpecBlob déjà chargé (select_related)."""
+    return json.loads(blob.contenu())
+
+
+# ✅ Ramasse-miettes : blobs qui ne sont plus référencés par aucune ligne
+def blobs_references():
+    from .models import GoldenResponse, SpecVersion, SwaggerProject
+    from .runner import test_history
+
+    references = set(SwaggerProject.objects.exclude(spec_blob=None).values_list('spec_blob_id', flat=True))
+    for champ in ('snapshot_blob_id', 'delta_blob_id'):
+        references.update(SpecVersion.objects.exclude(**{champ: None}).values_list(champ, flat=True))
+    references.update(GoldenResponse.objects.values_list('body_blob_id', flat=True))
+    # Historique de ce processus seulement : ailleurs, entree_complete se contente de l'aperçu si le blob a disparu
+    references.update(e['response_blob'] for e in list(test_history) if 'response_blob' in e)
+    return references
+
+
+def purger_blobs(delai=timedelta(hours=1), simulation=False):
+    """
+    Supprime les blobs non référencés créés il y a plus de `delai` (un blob tout juste écrit n'est peut-être
+    pas encore rattaché à sa ligne). Retourne {"supprimes", "octets"} ; simulation=True ne supprime rien.
+    """
+    from .models import SpecBlob
+
+    references = blobs_references()
+    orphelins = [(sha, taille) for sha, taille in SpecBlob.objects.filter(created_at__lt=timezone.now() - delai)
+                 .values_list('sha256', 'size').iterator() if sha not in references]
+    global _octets_cache
+    if not simulation:
+        shas = [sha for sha, _ in orphelins]
+        for debut in range(0, len(shas), 500):
+            SpecBlob.objects.filter(pk__in=shas[debut:debut + 500]).delete()
+        with _verrou_cache:
+            for sha in shas:
+                if sha in _cache:
+                    _octets_cache -= len(_cache.pop(sha))
+    return {"supprimes": len(orphelins), "octets": sum(taille for _, taille in orphelins)}
@@ -0,0 +1,197 @@
+import hashlib
+import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from pathlib import Path
+from urllib.parse import urljoin, urlparse
+
+import requests
+from django.conf import settings
+
+from .reports import ecrire_atomique
+from .spec_loader import SpecInvalide, charger_document, charger_spec
+
+MAX_DOCUMENTS = 500
+SCHEMAS_DISTANTS = ("http", "https")
+SCHEMAS_LOCAUX = ("", "file")
+
+
+def dossier_cache_specs():
+    return Path(getattr(settings, "SPEC_CACHE_DIR", Path(settings.BASE_DIR) / "spec_cache"))
+
+
+def separer_ref(ref, base):
+    """'./schemas/user.yaml#/User' relatif à base -> (URL absolue du document, fragment)."""
+    url, _, fragment = urljoin(base, ref).partition("#")
+    return url, fragment
+
+
+def est_distante(url):
+    return urlparse(url).scheme.lower() in SCHEMAS_DISTANTS
+
+
+def _echapper(cle):
+    return str(cle).replace("~", "~0").replace("/", "~1")
+
+
+def suivre_pointeur(document, fragment):
+    noeud = document
+    for morceau in [m for m in fragment.split("/") if m]:
+        morceau = morceau.replace("~1", "/").replace("~0", "~")
+        if isinstance(noeud, list) and morceau.isdigit() and int(morceau) < len(noeud):
+            noeud = noeud[int(morceau)]
+        elif isinstance(noeud, dict) and morceau in noeud:
+            noeud = noeud[morceau]
+        else:
+            raise SpecInvalide(f"Référence introuvable : #{fragment}")
+    return noeud
+
+
+def refs_externes(document, base):
+    """URLs des documents référencés par `document` (hors références locales #/...)."""
+    trouvees, pile = set(), [document]
+    while pile:
+        noeud = pile.pop()
+        if isinstance(noeud, dict):
+            ref = noeud.get("$ref")
+            if isinstance(ref, str) and not ref.startswith("#"):
+                trouvees.add(separer_ref(ref, base)[0])
+            pile.extend(noeud.values())
+        elif isinstance(noeud, list):
+            pile.extend(noeud)
+    return trouvees
+
+
+class AssembleurSpec:
+    """
+    Assemble une spec découpée en plusieurs fichiers ($ref externes, locaux ou distants) en un seul document.
+    Les documents référencés sont téléchargés en parallèle (une seule fois chacun) avec une session partagée
+    et un cache disque revalidé par ETag / Last-Modified.
+    fichiers_locaux=True (CLI, tests) : fichiers du serveur autorisés, pour une racine elle-même locale ;
+    un document reçu en http(s) ne peut jamais référencer que des URLs http(s).
+    """
+
+    def __init__(self, session=None, concurrence=8, timeout=10, dossier_cache=None, fichiers_locaux=False):
+        self.session = session or requests.Session()
+        self.fichiers_locaux = fichiers_locaux
+        self.concurrence = concurrence
+        self.timeout = timeout
+        self.dossier_cache = Path(dossier_cache) if dossier_cache else dossier_cache_specs()
+        self.documents = {}     # URL -> document chargé
+        self.telechargements = 0
+
+    # ---------- Téléchargement ----------
+    def verifier_url(self, url, parent=None):
+        """SpecInvalide si `url` (référencée depuis `parent`, None pour la racine) ne peut pas être lue."""
+        schema = urlparse(url).scheme.lower()
+        if schema in SCHEMAS_DISTANTS:
+            return
+        if schema in SCHEMAS_LOCAUX and self.fichiers_locaux and (parent is None or not est_distante(parent)):
+            return
+        raise SpecInvalide(f"Référence refusée : {url}" + (f" (depuis {parent})" if parent else ""))
+
+    def _lire_cache(self, url):
+        base = self.dossier_cache / hashlib.sha1(url.encode("utf-8")).hexdigest()
+        try:
+            meta = json.loads(base.with_suffix(".json").read_text(encoding="utf-8"))
+            return meta, base.with_suffix(".bin").read_bytes()
+        except (FileNotFoundError, ValueError):
+            return None, None
+
+    def _ecrire_cache(self, url, reponse):
+        base = self.dossier_cache / hashlib.sha1(url.encode("utf-8")).hexdigest()
+        meta = {
+            "url": url,
+            "etag": reponse.headers.get("ETag"),
+            "last_modified": reponse.headers.get("Last-Modified"),
+            "content_type": reponse.headers.get("Content-Type"),
+        }
+        ecrire_atomique(base.with_suffix(".bin"), reponse.content)
+        ecrire_atomique(base.with_suffix(".json"), json.dumps(meta).encode("utf-8"))
+
+    def telecharger(self, url):
+        """Retourne (contenu, content_type)."""
+        if urlparse(url).scheme.lower() in SCHEMAS_LOCAUX:
+            return Path(urlparse(url).path).read_bytes(), None
+
+        meta, contenu = self._lire_cache(url)
+        headers = {}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+        try:
+            reponse = self.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException:
+            if meta:
+                return contenu, meta.get("content_type")  # hors ligne : copie du cache
+            raise
+        self.telechargements += 1
+        if reponse.status_code == 304 and meta:
+            return contenu, meta.get("content_type")
+        reponse.raise_for_status()
+        if reponse.headers.get("ETag") or reponse.headers.get("Last-Modified"):
+            self._ecrire_cache(url, reponse)
+        return reponse.content, reponse.headers.get("Content-Type")
+
+    def _charger(self, url):
+        contenu, content_type = self.telecharger(url)
+        return charger_document(contenu, content_type, url)
+
+    def recuperer(self, url_racine, racine):
+        """Parcourt le graphe des références ; chaque document découvert part aussitôt en téléchargement."""
+        self.documents[url_racine] = racine
+        vus = {url_racine}
+        with ThreadPoolExecutor(max_workers=self.concurrence) as executor:
+            en_cours = {}
+            for url in refs_externes(racine, url_racine) - vus:
+                self.verifier_url(url, url_racine)
+                vus.add(url)
+                en_cours[executor.submit(self._charger, url)] = url
+            while en_cours:
+                finis, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+                for futur in finis:
+                    url = en_cours.pop(futur)
+                    document = self.documents[url] = futur.result()
+                    for suivante in refs_externes(document, url) - vus:
+                        if len(vus) >= MAX_DOCUMENTS:
+                            raise SpecInvalide(f"Plus de {MAX_DOCUMENTS} documents référencés.")
+                        self.verifier_url(suivante, url)
+                        vus.add(suivante)
+                        en_cours[executor.submit(self._charger, suivante)] = suivante
+
+    # ---------- Résolution ----------
+    def _inliner(self, noeud, base, pointeur, emplacements):
+        if isinstance(noeud, list):
+            return [self._inliner(n, base, f"{pointeur}/{i}", emplacements) for i, n in enumerate(noeud)]
+        if not isinstance(noeud, dict):
+            return noeud
+
+        ref = noeud.get("$ref")
+        if isinstance(ref, str):
+            url, fragment = separer_ref(ref, base)
+            if url == self.url_racine:
+                return {"$ref": f"#{fragment}"}
+            if (url, fragment) in emplacements:
+                # Déjà inclus (ou en cours d'inclusion : cycle) : référence locale vers la première copie
+                return {"$ref": f"#{emplacements[(url, fragment)]}"}
+            emplacements[(url, fragment)] = pointeur
+            cible = suivre_pointeur(self.documents[url], fragment)
+            return self._inliner(cible, url, pointeur, emplacements)
+
+        return {k: self._inliner(v, base, f"{pointeur}/{_echapper(k)}", emplacements) for k, v in noeud.items()}
+
+    def assembler(self, url):
+        self.url_racine = url.partition("#")[0]
+        self.verifier_url(self.url_racine)
+        contenu, content_type = self.telecharger(self.url_racine)
+        racine = charger_spec(contenu, content_type, self.url_racine)
+        if not refs_externes(racine, self.url_racine):
+            return racine  # spec autonome : document partagé du cache de spec_loader
+        self.recuperer(self.url_racine, racine)
+        return self._inliner(racine, self.url_racine, "", {})
+
+
+# ✅ Point d'entrée : spec complète (références externes incluses) depuis une URL
+def assembler_spec(url, session=None, concurrence=8, fichiers_locaux=False):
+    return AssembleurSpec(session=session, concurrence=concurrence, fichiers_locaux=fichiers_locaux).assembler(url)
@@ -0,0 +1,127 @@
+import threading
+from urllib.parse import urlparse
+
+from django.db import transaction
+
+from .models import Endpoint, SwaggerProject
+from .routing import RoutingTrie
+from .runner import preparer_payload, url_base_projet
+
+CHAMPS_ENDPOINT = ('summary', 'parameters', 'url_complete', 'cleaned_url',
+                   'query_params', 'path_variables', 'request_body', 'headers')
+
+
+def _valeurs_endpoint(ep, base_url):
+    payload = preparer_payload(ep, base_url)
+    return {
+        'summary': ep.get('summary', ''),
+        'parameters': ep.get('parameters', []),
+        'url_complete': ep.get('url_complete') or payload['url'],
+        'cleaned_url': payload['url'],
+        'query_params': payload['params'],
+        'path_variables': payload['path_vars'],
+        'request_body': payload['body'],
+        'headers': payload['headers'],
+    }
+
+
+# ✅ Lignes Endpoint d'un projet alignées sur son swagger_json (diff, identifiants stables)
+def synchroniser_endpoints(projet):
+    base_url = url_base_projet(projet)
+    voulus = {
+        (ep.get('method', 'GET').upper(), ep.get('endpoint', '')): _valeurs_endpoint(ep, base_url)
+        for ep in projet.swagger_json or []
+    }
+    existants = {(e.method, e.endpoint): e for e in projet.endpoints.all()}
+
+    a_creer = [
+        Endpoint(project=projet, method=method, endpoint=chemin, **valeurs)
+        for (method, chemin), valeurs in voulus.items() if (method, chemin) not in existants
+    ]
+    a_modifier = []
+    for cle, endpoint in existants.items():
+        valeurs = voulus.get(cle)
+        if valeurs and any(getattr(endpoint, champ) != valeur for champ, valeur in valeurs.items()):
+            for champ, valeur in valeurs.items():
+                setattr(endpoint, champ, valeur)
+            a_modifier.append(endpoint)
+    a_supprimer = [e.pk for cle, e in existants.items() if cle not in voulus]
+
+    with transaction.atomic():
+        Endpoint.objects.bulk_create(a_creer, batch_size=500)
+        Endpoint.objects.bulk_update(a_modifier, CHAMPS_ENDPOINT, batch_size=500)
+        Endpoint.objects.filter(pk__in=a_supprimer).delete()
+
+    return {'crees': len(a_creer), 'modifies': len(a_modifier), 'supprimes': len(a_supprimer)}
+
+
+class RoutageProjets:
+    """
+    Un RoutingTrie par projet, construit depuis ses lignes Endpoint.
+    Après un re-scraping (spec_blob différent), seuls les endpoints ajoutés ou retirés sont appliqués.
+    """
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._tries = {}  # projet_id -> (spec_blob_id, RoutingTrie, {(method, template): endpoint_id})
+
+    def trie(self, projet):
+        with self._verrou:
+            signature, trie, routes = self._tries.get(projet.pk, (False, None, {}))
+            if signature == projet.spec_blob_id:
+                return trie
+
+            trie = trie or RoutingTrie()
+            if projet.endpoint_count and not projet.endpoints.exists():
+                synchroniser_endpoints(projet)  # projet scrapé avant la synchronisation des Endpoint
+            nouvelles = {
+                (method, chemin): pk
+                for pk, method, chemin in projet.endpoints.values_list('id', 'method', 'endpoint')
+            }
+            for cle in routes.keys() - nouvelles.keys():
+                trie.retirer(*cle)
+            for cle, pk in nouvelles.items():
+                if routes.get(cle) != pk:
+                    trie.inserer(cle[0], cle[1], pk)
+
+            self._tries[projet.pk] = (projet.spec_blob_id, trie, nouvelles)
+            return trie
+
+    def invalider(self, projet_id):
+        """Lignes Endpoint supprimées ou recréées hors re-scraping : trie reconstruit au prochain appel."""
+        with self._verrou:
+            self._tries.pop(projet_id, None)
+
+
+routage = RoutageProjets()
+
+
+# ✅ Endpoint catalogué correspondant à une méthode + URL concrète
+def trouver_endpoint(method, url, projet_id=None):
+    """
+    Retourne (endpoint, variables de chemin) ou (None, {}).
+    Les projets candidats sont ceux dont l'URL de base préfixe l'URL testée.
+    """
+    parsed = urlparse(url)
+    if not parsed.netloc:
+        return None, {}
+
+    projets = SwaggerProject.objects.filter(swagger_url__startswith=f"{parsed.scheme}://{parsed.netloc}")
+    if projet_id:
+        projets = projets.filter(pk=projet_id)
+
+    for projet in projets.order_by('-created_at', '-id'):
+        base_path = urlparse(url_base_projet(projet)).path.rstrip('/')
+        if base_path and parsed.path != base_path and not parsed.path.startswith(base_path + '/'):
+            continue  # /api ne couvre pas /apiv2/...
+        for _ in range(2):
+            trouve = routage.trie(projet).trouver(method, parsed.path[len(base_path):])
+            if not trouve:
+                break
+            endpoint_id, variables, _ = trouve
+            endpoint = Endpoint.objects.filter(pk=endpoint_id).first()
+            if endpoint is not None:
+                return endpoint, variables
+            routage.invalider(projet.pk)  # ligne supprimée depuis la construction du trie
+
+    return None, {}
@@ -0,0 +1,202 @@
+import json
+import threading
+import time
+import uuid
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection
+from django.http import StreamingHttpResponse
+
+BATTEMENT_S = 15.0  # commentaire SSE régulier : garde la connexion ouverte à travers les proxys
+
+
+def format_sse(id_, type_, donnees):
+    return f"id: {id_}\nevent: {type_}\ndata: {json.dumps(donnees, ensure_ascii=False, default=str)}\n\n"
+
+
+class Canal:
+    """
+    Flux d'événements d'une tâche (scraping, tests en masse), numérotés 1, 2, 3...
+    Tampon circulaire borné : un client qui se reconnecte avec Last-Event-ID reprend où il s'était arrêté.
+    Contre-pression : quand le tampon est plein d'événements qu'un abonné n'a pas encore lus, le producteur
+    attend (au plus EVENTS_BACKPRESSURE_SECONDS) ; passé ce délai, les abonnés en retard sont décrochés et ne
+    freinent plus la tâche tant qu'ils ne relisent pas.
+    """
+
+    def __init__(self, taille=None, attente_max_s=None):
+        self.tampon = deque(maxlen=taille or getattr(settings, "EVENTS_BUFFER_SIZE", 1000))
+        self.attente_max_s = getattr(settings, "EVENTS_BACKPRESSURE_SECONDS", 5.0) if attente_max_s is None else attente_max_s
+        self.dernier_id = 0
+        self.termine = False
+        self.fin = None
+        self.abonnes = {}
+        self._condition = threading.Condition()
+
+    def _bloquant(self):
+        """Un abonné n'a pas lu l'événement le plus ancien du tampon plein."""
+        return (len(self.tampon) == self.tampon.maxlen and self.abonnes
+                and min(self.abonnes.values()) < self.tampon[0][0])
+
+    def _decrocher_retardataires(self):
+        """
+        Attente écoulée : les abonnés toujours en retard ne freinent plus les publications suivantes.
+        À leur prochaine lecture, ils se réinscrivent et reçoivent l'événement "reset" des événements perdus.
+        """
+        plus_ancien = self.tampon[0][0]
+        for abonne in [a for a, position in self.abonnes.items() if position < plus_ancien]:
+            del self.abonnes[abonne]
+
+    def publier(self, type_, donnees=None):
+        with self._condition:
+            echeance = time.monotonic() + self.attente_max_s
+            while self._bloquant():
+                restant = echeance - time.monotonic()
+                if restant <= 0:
+                    self._decrocher_retardataires()
+                    break
+                self._condition.wait(restant)
+            self.dernier_id += 1
+            self.tampon.append((self.dernier_id, type_, donnees))
+            self._condition.notify_all()
+            return self.dernier_id
+
+    def terminer(self, type_="fin", donnees=None):
+        self.publier(type_, donnees)
+        with self._condition:
+            self.termine = True
+            self.fin = time.monotonic()
+            self._condition.notify_all()
+
+    def lire(self, abonne, depuis, timeout):
+        """
+        Événements d'id > `depuis`, en attendant au plus `timeout` s'il n'y en a pas encore.
+        Retourne (événements, perdus) : perdus = nombre d'événements sortis du tampon avant d'être lus.
+        """
+        with self._condition:
+            self.abonnes[abonne] = depuis
+            if depuis >= self.dernier_id and not self.termine:
+                self._condition.wait(timeout)
+            evenements = [e for e in self.tampon if e[0] > depuis]
+            premier = evenements[0][0] if evenements else self.dernier_id + 1
+            perdus = max(0, premier - depuis - 1)
+            if evenements:
+                self.abonnes[abonne] = evenements[-1][0]
+                self._condition.notify_all()  # libère un producteur en attente
+            return evenements, perdus
+
+    def quitter(self, abonne):
+        with self._condition:
+            self.abonnes.pop(abonne, None)
+            self._condition.notify_all()
+
+    def epuise(self, depuis):
+        return self.termine and depuis >= self.dernier_id
+
+
+class BusEvenements:
+    """Canaux en mémoire du processus, oubliés EVENTS_TTL_SECONDS après la fin de leur tâche."""
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._canaux = {}
+
+    def creer(self):
+        ttl = getattr(settings, "EVENTS_TTL_SECONDS", 600)
+        maintenant = time.monotonic()
+        with self._verrou:
+            for cle in [c for c, canal in self._canaux.items() if canal.fin and maintenant - canal.fin > ttl]:
+                del self._canaux[cle]
+            cle = uuid.uuid4().hex
+            self._canaux[cle] = Canal()
+        return cle, self._canaux[cle]
+
+    def canal(self, cle):
+        with self._verrou:
+            return self._canaux.get(cle)
+
+
+bus = BusEvenements()
+
+
+# ✅ Tâche de fond publiant sur un canal
+def lancer_tache(fonction, *args, **kwargs):
+    """
+    Exécute fonction(canal, *args, **kwargs) dans un thread ; une exception termine le canal par un événement "erreur".
+    Retourne l'identifiant du canal.
+    """
+    cle, canal = bus.creer()
+
+    def executer():
+        try:
+            fonction(canal, *args, **kwargs)
+            if not canal.termine:
+                canal.terminer()
+        except Exception as e:
+            canal.terminer("erreur", {"error": str(e)})
+        finally:
+            connection.close()
+
+    threading.Thread(target=executer, daemon=True).start()
+    return cle
+
+
+def _dernier_id(request):
+    valeur = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id") or 0
+    try:
+        return max(0, int(valeur))
+    except ValueError:
+        return 0
+
+
+def _morceaux(evenements, perdus, depuis):
+    if perdus:
+        # Le client a trop de retard : il est prévenu plutôt que de recevoir un flux troué sans le savoir
+        yield format_sse(evenements[0][0] - 1 if evenements else depuis + perdus, "reset", {"perdus": perdus})
+    for id_, type_, donnees in evenements:
+        yield format_sse(id_, type_, donnees)
+
+
+def _flux_sync(canal, depuis):
+    abonne = object()
+    try:
+        yield "retry: 2000\n\n"
+        while not canal.epuise(depuis):
+            evenements, perdus = canal.lire(abonne, depuis, BATTEMENT_S)
+            if not evenements and not perdus:
+                yield ": ping\n\n"
+                continue
+            yield from _morceaux(evenements, perdus, depuis)
+            depuis = evenements[-1][0] if evenements else depuis
+    finally:
+        canal.quitter(abonne)
+
+
+async def _flux_async(canal, depuis):
+    # Sous ASGI : l'attente se fait dans un thread, la boucle d'événements n'est jamais bloquée
+    abonne = object()
+    lire = sync_to_async(canal.lire, thread_sensitive=False)
+    try:
+        yield "retry: 2000\n\n"
+        while not canal.epuise(depuis):
+            evenements, perdus = await lire(abonne, depuis, BATTEMENT_S)
+            if not evenements and not perdus:
+                yield ": ping\n\n"
+                continue
+            for morceau in _morceaux(evenements, perdus, depuis):
+                yield morceau
+            depuis = evenements[-1][0] if evenements else depuis
+    finally:
+        canal.quitter(abonne)
+
+
+# ✅ Réponse Server-Sent Events, reprise possible avec Last-Event-ID
+def reponse_sse(request, canal):
+    depuis = _dernier_id(request)
+    flux = _flux_async(canal, depuis) if isinstance(request, ASGIRequest) else _flux_sync(canal, depuis)
+    reponse = StreamingHttpResponse(flux, content_type="text/event-stream; charset=utf-8")
+    reponse["Cache-Control"] = "no-cache"
+    reponse["X-Accel-Buffering"] = "no"  # nginx : pas de mise en tampon du flux
+    return reponse
@@ -0,0 +1,284 @@
+import base64
+import copy
+import json
+import random
+import string
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+
+try:  # analyseur d'expressions régulières de la bibliothèque standard
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+ALPHANUM = string.ascii_letters + string.digits
+PROFONDEUR_MAX = 6
+REPETITION_MAX = 4  # plafond des répétitions ouvertes (*, +, {n,}) dans un pattern
+
+# Seules ces clés influencent la génération : le reste (description, title...) ne change pas la valeur
+CLES_SCHEMA = {
+    "$ref", "type", "format", "enum", "const", "pattern", "nullable", "example", "default",
+    "minimum", "maximum", "exclusiveMinimum", "exclusiveMaximum", "multipleOf",
+    "minLength", "maxLength", "minItems", "maxItems", "items",
+    "properties", "required", "allOf", "oneOf", "anyOf",
+}
+
+
+def contraintes(schema):
+    """Schéma réduit aux contraintes de génération (stocké avec les paramètres, clé de cache)."""
+    if isinstance(schema, list):
+        return [contraintes(s) for s in schema]
+    if not isinstance(schema, dict):
+        return schema
+    reduit = {}
+    for cle, valeur in schema.items():
+        if cle not in CLES_SCHEMA:
+            continue
+        if cle == "properties":
+            reduit[cle] = {nom: contraintes(prop) for nom, prop in valeur.items()}
+        elif cle in ("items", "allOf", "oneOf", "anyOf"):
+            reduit[cle] = contraintes(valeur)
+        else:
+            reduit[cle] = valeur
+    return reduit
+
+
+# ---------- Chaînes ----------
+def _caractere_classe(elements, rng):
+    negation = any(op == sre_parse.NEGATE for op, _ in elements)
+    candidats = []
+    for op, argument in elements:
+        if op == sre_parse.LITERAL:
+            candidats.append(chr(argument))
+        elif op == sre_parse.RANGE:
+            debut, fin = argument
+            candidats.extend(chr(c) for c in range(debut, min(fin, debut + 255) + 1))
+        elif op == sre_parse.CATEGORY:
+            candidats.extend({
+                sre_parse.CATEGORY_DIGIT: string.digits,
+                sre_parse.CATEGORY_WORD: ALPHANUM + "_",
+                sre_parse.CATEGORY_SPACE: " ",
+                sre_parse.CATEGORY_NOT_DIGIT: string.ascii_letters,
+                sre_parse.CATEGORY_NOT_WORD: "-.",
+                sre_parse.CATEGORY_NOT_SPACE: ALPHANUM,
+            }.get(argument, ""))
+    if negation:
+        exclus = set(candidats)
+        candidats = [c for c in ALPHANUM if c not in exclus]
+    return rng.choice(candidats) if candidats else ""
+
+
+def _depuis_arbre(arbre, rng, groupes):
+    morceaux = []
+    for op, argument in arbre:
+        if op == sre_parse.LITERAL:
+            morceaux.append(chr(argument))
+        elif op == sre_parse.NOT_LITERAL:
+            morceaux.append(rng.choice([c for c in ALPHANUM if ord(c) != argument]))
+        elif op == sre_parse.ANY:
+            morceaux.append(rng.choice(ALPHANUM))
+        elif op == sre_parse.IN:
+            morceaux.append(_caractere_classe(argument, rng))
+        elif op == sre_parse.BRANCH:
+            morceaux.append(_depuis_arbre(rng.choice(argument[1]), rng, groupes))
+        elif op == sre_parse.SUBPATTERN:
+            groupe, sous_arbre = argument[0], argument[-1]
+            texte = _depuis_arbre(sous_arbre, rng, groupes)
+            if groupe:
+                groupes[groupe] = texte
+            morceaux.append(texte)
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT):
+            minimum, maximum, sous_arbre = argument
+            maximum = min(maximum, minimum + REPETITION_MAX)
+            morceaux.extend(_depuis_arbre(sous_arbre, rng, groupes) for _ in range(rng.randint(minimum, maximum)))
+        elif op == sre_parse.GROUPREF:
+            morceaux.append(groupes.get(argument, ""))
+        # AT (ancres ^ $ \b) et assertions : aucun caractère produit
+    return "".join(morceaux)
+
+
+@lru_cache(maxsize=512)
+def _arbre_pattern(pattern):
+    return sre_parse.parse(pattern)
+
+
+def depuis_pattern(pattern, rng):
+    """Chaîne correspondant à `pattern` (sous-ensemble courant des expressions régulières)."""
+    try:
+        return _depuis_arbre(_arbre_pattern(pattern), rng, {})
+    except Exception:  # motif non supporté : la contrainte est ignorée
+        return None
+
+
+def _texte(rng, longueur):
+    return "".join(rng.choice(ALPHANUM) for _ in range(longueur))
+
+
+def _format(format_, rng):
+    jour = date(2020, 1, 1) + timedelta(days=rng.randint(0, 3650))
+    if format_ == "date":
+        return jour.isoformat()
+    if format_ == "date-time":
+        instant = datetime(jour.year, jour.month, jour.day, tzinfo=timezone.utc) + timedelta(seconds=rng.randint(0, 86399))
+        return instant.isoformat().replace("+00:00", "Z")
+    if format_ == "time":
+        return f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+    if format_ == "email":
+        return f"{_texte(rng, 8).lower()}@example.com"
+    if format_ == "uuid":
+        h = f"{rng.getrandbits(128):032x}"
+        return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{'89ab'[rng.randint(0, 3)]}{h[17:20]}-{h[20:32]}"
+    if format_ in ("uri", "url", "uri-reference"):
+        return f"https://example.com/{_texte(rng, 6).lower()}"
+    if format_ == "hostname":
+        return f"{_texte(rng, 6).lower()}.example.com"
+    if format_ == "ipv4":
+        return ".".join(str(rng.randint(1, 254)) for _ in range(4))
+    if format_ == "ipv6":
+        return ":".join(f"{rng.getrandbits(16):x}" for _ in range(8))
+    if format_ == "byte":
+        return base64.b64encode(_texte(rng, 9).encode()).decode()
+    return None
+
+
+def _chaine(schema, rng, fuzz):
+    if schema.get("format"):
+        valeur = _format(schema["format"], rng)
+        if valeur is not None:
+            return valeur
+    if schema.get("pattern"):
+        valeur = depuis_pattern(schema["pattern"], rng)
+        if valeur is not None:
+            return valeur
+
+    minimum = schema.get("minLength", 0)
+    maximum = max(minimum, schema.get("maxLength", 8 if not fuzz else minimum + 32))  # bornes contradictoires : minLength
+    if fuzz:
+        longueur = rng.choice([minimum, maximum, rng.randint(minimum, maximum)])
+    else:
+        longueur = max(minimum, min(maximum, 8))
+    return _texte(rng, longueur)
+
+
+# ---------- Nombres ----------
+def _bornes(schema, entier):
+    pas = 1 if entier else 0.01
+    bas, haut = schema.get("minimum"), schema.get("maximum")
+    ex_bas, ex_haut = schema.get("exclusiveMinimum"), schema.get("exclusiveMaximum")
+    # OpenAPI 3.0 : booléens associés à minimum / maximum ; 3.1 : valeurs numériques
+    if isinstance(ex_bas, bool):
+        bas = bas + pas if ex_bas and bas is not None else bas
+    elif ex_bas is not None:
+        bas = ex_bas + pas
+    if isinstance(ex_haut, bool):
+        haut = haut - pas if ex_haut and haut is not None else haut
+    elif ex_haut is not None:
+        haut = ex_haut - pas
+    if bas is None:
+        bas = 1 if haut is None or haut >= 1 else haut - 1000
+    if haut is None:
+        haut = bas + 1000
+    return bas, max(bas, haut)  # bornes contradictoires (minimum = maximum exclusif, min > max) : la borne basse
+
+
+def _nombre(schema, rng, fuzz, entier):
+    bas, haut = _bornes(schema, entier)
+    if entier:
+        bas = int(-(-bas // 1))
+        haut = max(bas, int(haut // 1))
+    valeur = rng.choice([bas, haut, None]) if fuzz else None
+    if valeur is None:
+        valeur = rng.randint(bas, haut) if entier else round(rng.uniform(bas, haut), 2)
+
+    multiple = schema.get("multipleOf")
+    if multiple:
+        n = -(-bas // multiple)
+        valeur = max(n, min(valeur // multiple, haut // multiple)) * multiple
+        if entier:
+            valeur = int(valeur)
+    return valeur
+
+
+# ---------- Génération ----------
+def _generer(schema, rng, fuzz, profondeur):
+    if not isinstance(schema, dict) or profondeur > PROFONDEUR_MAX or "$ref" in schema:
+        return None
+    if not fuzz:
+        for cle in ("example", "default"):
+            if schema.get(cle) is not None:
+                return schema[cle]
+    if "const" in schema:
+        return schema["const"]
+    if schema.get("enum"):
+        return rng.choice(schema["enum"])
+
+    type_ = schema.get("type")
+    nullable = schema.get("nullable", False)
+    if isinstance(type_, list):  # OpenAPI 3.1 : ["string", "null"]
+        nullable = nullable or "null" in type_
+        types = [t for t in type_ if t != "null"]
+        type_ = (rng.choice(types) if fuzz else types[0]) if types else "null"
+    if type_ == "null" or (fuzz and nullable and rng.random() < 0.1):
+        return None
+
+    if schema.get("allOf"):
+        fusion = {k: v for k, v in schema.items() if k != "allOf"}
+        for partie in schema["allOf"]:
+            if isinstance(partie, dict):
+                fusion.setdefault("properties", {}).update(partie.get("properties", {}))
+                fusion["required"] = fusion.get("required", []) + partie.get("required", [])
+                fusion.update({k: v for k, v in partie.items() if k not in ("properties", "required")})
+        return _generer(fusion, rng, fuzz, profondeur)
+    for cle in ("oneOf", "anyOf"):
+        if schema.get(cle):
+            choix = rng.choice(schema[cle]) if fuzz else schema[cle][0]
+            return _generer(choix, rng, fuzz, profondeur + 1)
+
+    if type_ == "object" or "properties" in schema:
+        requis = set(schema.get("required", []))
+        return {
+            nom: _generer(prop, rng, fuzz, profondeur + 1)
+            for nom, prop in schema.get("properties", {}).items()
+            if not fuzz or nom in requis or rng.random() < 0.5
+        }
+    if type_ == "array":
+        minimum = schema.get("minItems", 0)
+        maximum = max(minimum, schema.get("maxItems", minimum + 5))
+        taille = rng.randint(minimum, maximum) if fuzz else max(minimum, min(maximum, 1))
+        return [_generer(schema.get("items", {}), rng, fuzz, profondeur + 1) for _ in range(taille)]
+    if type_ == "integer":
+        return _nombre(schema, rng, fuzz, entier=True)
+    if type_ == "number":
+        return _nombre(schema, rng, fuzz, entier=False)
+    if type_ == "boolean":
+        return rng.random() < 0.5 if fuzz else True
+    return _chaine(schema, rng, fuzz)
+
+
+@lru_cache(maxsize=4096)
+def _generer_en_cache(cle_schema, graine, fuzz):
+    rng = random.Random(f"{cle_schema}|{graine}|{fuzz}")
+    return _generer(json.loads(cle_schema), rng, fuzz, 0)
+
+
+# ✅ Valeur respectant le schéma (type, format, enum, pattern, bornes), reproductible pour une graine
+def generer_valeur(schema, graine=0, fuzz=False):
+    """
+    Mode normal : l'example / default documenté s'il existe, sinon une valeur valide.
+    Mode fuzz : valeurs valides variées (bornes, champs optionnels absents, null autorisé) selon la graine.
+    Le résultat est mis en cache par (schéma, graine, mode).
+    """
+    cle_schema = json.dumps(schema or {}, sort_keys=True, default=str)
+    valeur = _generer_en_cache(cle_schema, graine, fuzz)
+    return copy.deepcopy(valeur) if isinstance(valeur, (dict, list)) else valeur
+
+
+# ✅ Paramètres d'un endpoint régénérés en mode fuzz (tests en masse)
+def endpoint_fuzz(ep, graine):
+    parametres = []
+    for position, param in enumerate(ep.get("parameters", [])):
+        schema = param.get("schema") or {"type": param.get("type") or "string"}
+        # Graine propre à chaque paramètre : deux paramètres de même schéma reçoivent des valeurs différentes
+        nom = param.get("name") or position
+        parametres.append({**param, "value": generer_valeur(schema, f"{graine}|{param.get('in')}:{nom}", fuzz=True)})
+    return {**ep, "parameters": parametres}
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+from django.conf import settings
+
+from .blobstore import lire_blob, stocker_blob
+from .jsonpath import compiler_jsonpath
+from .models import GoldenResponse
+
+MAX_DIFFERENCES = 50
+TAILLE_APERCU = 200
+TOUT_IGNORER = None  # état du filtre : le nœud courant est ignoré
+
+
+def _empreinte(*morceaux):
+    h = hashlib.blake2b(digest_size=16)
+    for morceau in morceaux:
+        h.update(morceau)
+    return h.digest()
+
+
+# ✅ Chemins ignorés : motifs JSONPath ($..updated_at, $.data[*].id) suivis comme un petit automate
+@lru_cache(maxsize=256)
+def compiler_motifs(motifs):
+    return tuple(ops for ops in (compiler_jsonpath(m) for m in motifs) if ops)
+
+
+def _etat_initial(motifs):
+    return frozenset((i, 0) for i in range(len(motifs)))
+
+
+@lru_cache(maxsize=4096)  # mêmes transitions à chaque élément d'une liste d'objets
+def _avancer(motifs, etat, type_, valeur):
+    """État après être descendu dans la clé / l'index `valeur` ; TOUT_IGNORER si un motif est complet."""
+    if not etat:
+        return etat
+    suivants = set()
+    for i, position in etat:
+        operation, argument = motifs[i][position]
+        if operation == "descente":
+            suivants.add((i, position))  # ..cle : peut encore correspondre plus bas
+            if type_ == "cle" and valeur == argument:
+                suivants.add((i, position + 1))
+        elif operation == "tout" or (operation == type_ and argument == valeur):
+            suivants.add((i, position + 1))
+    if any(position == len(motifs[i]) for i, position in suivants):
+        return TOUT_IGNORER
+    return frozenset(suivants)
+
+
+# ✅ Arbre de Merkle d'un document JSON : (empreinte, enfants, valeur)
+def arbre(valeur, motifs=(), etat=None):
+    """
+    Chaque nœud porte l'empreinte de son sous-arbre (chemins ignorés exclus) : deux sous-arbres
+    d'empreinte égale sont identiques et le diff ne les parcourt pas.
+    """
+    etat = _etat_initial(motifs) if etat is None else etat
+    if isinstance(valeur, dict):
+        enfants = {}
+        for cle in sorted(valeur):
+            sous_etat = _avancer(motifs, etat, "cle", cle)
+            if sous_etat is not TOUT_IGNORER:
+                enfants[cle] = arbre(valeur[cle], motifs, sous_etat)
+        empreinte = _empreinte(b"o", *(cle.encode("utf-8") + b"\0" + n[0] for cle, n in enfants.items()))
+        return empreinte, enfants, valeur
+    if isinstance(valeur, list):
+        enfants = []
+        for i, element in enumerate(valeur):
+            sous_etat = _avancer(motifs, etat, "index", i)
+            enfants.append(None if sous_etat is TOUT_IGNORER else arbre(element, motifs, sous_etat))
+        empreinte = _empreinte(b"a", *(n[0] if n else b"-" for n in enfants))
+        return empreinte, enfants, valeur
+    return _empreinte(b"s", json.dumps(valeur).encode("utf-8")), None, valeur
+
+
+def _apercu(valeur):
+    if isinstance(valeur, (dict, list)):
+        texte = json.dumps(valeur, ensure_ascii=False)
+        return texte if len(texte) <= TAILLE_APERCU else texte[:TAILLE_APERCU] + "…"
+    return valeur
+
+
+def _chemin_cle(chemin, cle):
+    return f"{chemin}.{cle}" if cle.isidentifier() else f"{chemin}['{cle}']"
+
+
+def _differences(a, b, chemin, sortie):
+    if len(sortie) >= MAX_DIFFERENCES or a[0] == b[0]:
+        return
+    enfants_a, enfants_b = a[1], b[1]
+    if isinstance(enfants_a, dict) and isinstance(enfants_b, dict):
+        for cle in sorted(enfants_a.keys() | enfants_b.keys()):
+            sous_chemin = _chemin_cle(chemin, cle)
+            if cle not in enfants_b:
+                sortie.append({"path": sous_chemin, "change": "removed", "before": _apercu(enfants_a[cle][2])})
+            elif cle not in enfants_a:
+                sortie.append({"path": sous_chemin, "change": "added", "after": _apercu(enfants_b[cle][2])})
+            else:
+                _differences(enfants_a[cle], enfants_b[cle], sous_chemin, sortie)
+    elif isinstance(enfants_a, list) and isinstance(enfants_b, list):
+        for i in range(max(len(enfants_a), len(enfants_b))):
+            noeud_a = enfants_a[i] if i < len(enfants_a) else False
+            noeud_b = enfants_b[i] if i < len(enfants_b) else False
+            if noeud_a is None or noeud_b is None:  # élément ignoré
+                continue
+            if noeud_b is False:
+                sortie.append({"path": f"{chemin}[{i}]", "change": "removed", "before": _apercu(noeud_a[2])})
+            elif noeud_a is False:
+                sortie.append({"path": f"{chemin}[{i}]", "change": "added", "after": _apercu(noeud_b[2])})
+            else:
+                _differences(noeud_a, noeud_b, f"{chemin}[{i}]", sortie)
+    else:
+        sortie.append({"path": chemin, "change": "changed", "before": _apercu(a[2]), "after": _apercu(b[2])})
+    del sortie[MAX_DIFFERENCES:]
+
+
+def differences(arbre_a, arbre_b):
+    """Différences structurelles entre deux arbres (au plus MAX_DIFFERENCES)."""
+    sortie = []
+    _differences(arbre_a, arbre_b, "$", sortie)
+    return sortie
+
+
+def _document(texte):
+    try:
+        return json.loads(texte)
+    except (TypeError, ValueError):
+        return texte  # réponse non JSON : comparée comme une chaîne
+
+
+# Arbres des réponses de référence (blobs immuables) gardés en mémoire : LRU borné en octets, comme le blob store
+_verrou_arbres = threading.Lock()
+_arbres = OrderedDict()  # (blob, chemins ignorés) -> (arbre, taille du document source)
+_octets_arbres = 0
+
+
+def arbre_golden(body_blob_id, motifs):
+    """Arbre d'une réponse de référence : calculé une fois par jeu de chemins ignorés."""
+    global _octets_arbres
+    cle = (body_blob_id, motifs)
+    with _verrou_arbres:
+        if cle in _arbres:
+            _arbres.move_to_end(cle)
+            return _arbres[cle][0]
+    contenu = lire_blob(body_blob_id)
+    resultat = arbre(_document(contenu.decode("utf-8")), compiler_motifs(motifs))
+    # L'arbre occupe plusieurs fois la taille du JSON source : c'est elle qui est décomptée du budget
+    budget = getattr(settings, "GOLDEN_TREE_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+    if len(contenu) > budget // 4:
+        return resultat  # grosse référence : reconstruite à chaque comparaison
+    with _verrou_arbres:
+        if cle not in _arbres:
+            _arbres[cle] = (resultat, len(contenu))
+            _octets_arbres += len(contenu)
+        while _octets_arbres > budget and _arbres:
+            _octets_arbres -= _arbres.popitem(last=False)[1][1]
+    return resultat
+
+
+def comparer(texte_reference, texte, ignore_paths=()):
+    motifs = compiler_motifs(tuple(ignore_paths))
+    return differences(arbre(_document(texte_reference), motifs), arbre(_document(texte), motifs))
+
+
+# ✅ Clé d'une réponse de référence : endpoint + jeu de paramètres
+def cle_parametres(payload):
+    """Empreinte des paramètres (valeurs de query / chemin normalisées en chaînes) et paramètres retenus."""
+    parametres = {
+        "params": {k: str(v) for k, v in (payload.get("params") or {}).items()},
+        "path_vars": {k: str(v) for k, v in (payload.get("path_vars") or {}).items()},
+        "body": payload.get("body") or {},
+    }
+    canonique = json.dumps(parametres, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonique.encode("utf-8")).hexdigest()[:32], parametres
+
+
+def ignores_par_defaut():
+    return list(getattr(settings, "GOLDEN_IGNORE_PATHS", []))
+
+
+def enregistrer_golden(projet_id, method, endpoint, payload, status_code, texte, ignore_paths=None):
+    params_hash, parametres = cle_parametres(payload)
+    valeurs = {"parameters": parametres, "status_code": status_code, "body_blob_id": stocker_blob(texte.encode("utf-8"))}
+    if ignore_paths is not None:
+        compiler_motifs(tuple(ignore_paths))  # motif invalide : JSONPathInvalide avant toute écriture
+        valeurs["ignore_paths"] = list(ignore_paths)
+    golden, _ = GoldenResponse.objects.update_or_create(
+        project_id=projet_id, method=method.upper(), endpoint=endpoint, params_hash=params_hash, defaults=valeurs,
+    )
+    return golden
+
+
+def index_goldens(projet_id, **filtres):
+    """{(METHOD, endpoint, params_hash): (status_code, body_blob_id, chemins ignorés)} : une requête par exécution."""
+    defaut = ignores_par_defaut()
+    return {
+        (method, endpoint, params_hash): (status_code, blob_id, tuple(defaut + list(ignore or [])))
+        for method, endpoint, params_hash, status_code, blob_id, ignore in GoldenResponse.objects.filter(
+            project_id=projet_id, **filtres).values_list('method', 'endpoint', 'params_hash', 'status_code', 'body_blob_id', 'ignore_paths')
+    }
+
+
+# ✅ Comparaison d'une réponse à sa référence
+def verifier_golden(goldens, method, endpoint, payload, status_code, texte):
+    """None si aucune référence n'existe ; sinon {"identical", "differences"}."""
+    reference = goldens.get((method.upper(), endpoint, cle_parametres(payload)[0]))
+    if reference is None:
+        return None
+    status_reference, blob_id, motifs = reference
+    ecarts = differences(arbre_golden(blob_id, motifs), arbre(_document(texte), compiler_motifs(motifs)))
+    if status_code != status_reference:
+        ecarts.insert(0, {"path": "status_code", "change": "changed", "before": status_reference, "after": status_code})
+    return {"identical": not ecarts, "differences": ecarts[:MAX_DIFFERENCES]}
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Mapping
+from email.utils import parsedate_to_datetime
+
+from django.conf import settings
+
+# Statuts dont la réponse peut être réutilisée (RFC 9111, « heuristically cacheable »)
+STATUTS_CACHABLES = {200, 203, 204, 300, 301, 404, 410}
+METHODES_CACHABLES = {"GET", "HEAD"}
+ENTETES_CONSERVES = ("Content-Type", "Cache-Control", "ETag", "Last-Modified", "Expires", "Vary")
+
+
+class ReponseCachee:
+    """Réponse servie depuis le cache : mêmes attributs que requests.Response pour executer_test."""
+
+    def __init__(self, status_code, text, headers):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+
+
+class Entree:
+    def __init__(self, reponse, projet_id, maintenant):
+        self.reponse = ReponseCachee(reponse.status_code, reponse.text, _entetes(reponse))
+        self.projet_id = projet_id
+        self.taille = len(self.reponse.text.encode("utf-8")) + 256  # corps + en-têtes et structure (approx.)
+        self.rafraichir(self.reponse.headers, maintenant)
+
+    def rafraichir(self, headers, maintenant):
+        """Durée de fraîcheur depuis Cache-Control / Expires (et Age) ; aussi appelée après un 304."""
+        directives = directives_cache(headers)
+        self.revalider_toujours = "no-cache" in directives
+        self.etag = headers.get("ETag") or self.reponse.headers.get("ETag")
+        self.last_modified = headers.get("Last-Modified") or self.reponse.headers.get("Last-Modified")
+        duree = _entier(directives.get("s-maxage", directives.get("max-age")))
+        if duree is None and headers.get("Expires"):
+            try:
+                duree = parsedate_to_datetime(headers["Expires"]).timestamp() - time.time()
+            except (TypeError, ValueError):
+                duree = 0  # Expires invalide : déjà expirée
+        age = _entier(headers.get("Age")) or 0
+        self.expire_a = maintenant + max(0, (duree or 0) - age)
+
+    def fraiche(self, maintenant):
+        return not self.revalider_toujours and maintenant < self.expire_a
+
+    def validateurs(self):
+        entetes = {}
+        if self.etag:
+            entetes["If-None-Match"] = self.etag
+        if self.last_modified:
+            entetes["If-Modified-Since"] = self.last_modified
+        return entetes
+
+
+class _Vol:
+    """Requête en cours partagée par les appelants identiques (single-flight)."""
+
+    def __init__(self):
+        self.fini = threading.Event()
+        self.resultat = None
+        self.erreur = None
+
+
+def _entier(valeur):
+    try:
+        return int(str(valeur).strip('"'))
+    except (TypeError, ValueError):
+        return None
+
+
+def _entetes(reponse):
+    headers = getattr(reponse, "headers", None)
+    headers = headers if isinstance(headers, Mapping) else {}
+    return {nom: headers[nom] for nom in ENTETES_CONSERVES if headers.get(nom) is not None}
+
+
+def directives_cache(headers):
+    """Cache-Control: max-age=60, no-cache → {"max-age": "60", "no-cache": None}"""
+    directives = {}
+    for morceau in (headers.get("Cache-Control") or "").split(","):
+        nom, _, valeur = morceau.strip().partition("=")
+        if nom:
+            directives[nom.lower()] = valeur or None
+    return directives
+
+
+def cle_requete(method, url, params=None, headers=None, projet_id=None, auth=None):
+    """
+    Clé de cache : projet, méthode, URL, paramètres et en-têtes fournis par l'appelant, empreinte de l'authentification
+    injectée ensuite par executer_test (GestionnaireAuth.empreinte). Une réponse n'est resservie qu'à une requête
+    identique, faite avec les mêmes identifiants : cela couvre Vary et les réponses « private ».
+    """
+    canonique = json.dumps([projet_id, auth, method.upper(), url, params or {},
+                            {k.lower(): v for k, v in (headers or {}).items()}], sort_keys=True, default=str)
+    return hashlib.sha256(canonique.encode("utf-8")).hexdigest()
+
+
+class CacheHTTP:
+    """
+    Cache des réponses du testeur interactif, borné par un budget mémoire (LRU, HTTP_CACHE_MAX_BYTES).
+    - Cache-Control (max-age, s-maxage, no-cache, no-store) et Expires déterminent la fraîcheur ;
+    - une entrée périmée porteuse d'un ETag / Last-Modified est revalidée (If-None-Match, 304 → corps en cache) ;
+    - les requêtes identiques simultanées sont fusionnées : une seule part vers l'API, les autres attendent.
+    """
+
+    def __init__(self, budget=None, taille_max_entree=None):
+        self.budget = budget or getattr(settings, "HTTP_CACHE_MAX_BYTES", 32 * 1024 * 1024)
+        self.taille_max_entree = taille_max_entree or getattr(settings, "HTTP_CACHE_MAX_ENTRY_BYTES", 2 * 1024 * 1024)
+        self.octets = 0
+        self.entrees = OrderedDict()
+        self.en_vol = {}
+        self.compteurs = {}  # projet_id → Counter(hits, misses, revalidated, coalesced, stored, evicted)
+        self._verrou = threading.Lock()
+
+    def _compter(self, projet_id, evenement):
+        self.compteurs.setdefault(projet_id, Counter())[evenement] += 1
+
+    def _retirer(self, cle):
+        entree = self.entrees.pop(cle, None)
+        if entree is not None:
+            self.octets -= entree.taille
+
+    def _stocker(self, cle, entree):
+        self._retirer(cle)
+        self.entrees[cle] = entree
+        self.octets += entree.taille
+        self._compter(entree.projet_id, "stored")
+        while self.octets > self.budget and self.entrees:
+            _, evincee = self.entrees.popitem(last=False)
+            self.octets -= evincee.taille
+            self._compter(evincee.projet_id, "evicted")
+
+    def _chercher(self, cle):
+        entree = self.entrees.get(cle)
+        if entree is not None:
+            self.entrees.move_to_end(cle)
+        return entree
+
+    def _telecharger(self, cle, envoyer, projet_id):
+        """Appel réel (meneur du vol) : revalidation d'une entrée périmée ou téléchargement."""
+        with self._verrou:
+            entree = self._chercher(cle)
+        validateurs = entree.validateurs() if entree else {}
+        reponse = envoyer(validateurs)
+        maintenant = time.monotonic()
+
+        with self._verrou:
+            if reponse.status_code == 304 and entree is not None:
+                entree.rafraichir(_entetes(reponse), maintenant)
+                self._compter(projet_id, "revalidated")
+                return entree.reponse, "revalidated"
+            self._compter(projet_id, "misses")
+            directives = directives_cache(_entetes(reponse))
+            if reponse.status_code not in STATUTS_CACHABLES or "no-store" in directives:
+                self._retirer(cle)
+                return reponse, "miss"
+            nouvelle = Entree(reponse, projet_id, maintenant)
+            if nouvelle.taille <= self.taille_max_entree and (nouvelle.fraiche(maintenant) or nouvelle.validateurs()):
+                self._stocker(cle, nouvelle)
+            else:
+                self._retirer(cle)
+        return reponse, "miss"
+
+    # ✅ Point d'entrée : cache, revalidation et fusion des requêtes identiques
+    def obtenir(self, cle, envoyer, projet_id=None, attente_max_s=60):
+        """
+        `envoyer(entetes_supplementaires)` émet la requête (en-têtes conditionnels éventuels) et retourne la réponse.
+        Retourne (réponse, statut) avec statut parmi "hit", "revalidated", "miss", "coalesced".
+        Les exceptions de l'appel réel sont propagées à tous les appelants fusionnés.
+        """
+        with self._verrou:
+            entree = self._chercher(cle)
+            if entree is not None and entree.fraiche(time.monotonic()):
+                self._compter(projet_id, "hits")
+                return entree.reponse, "hit"
+            vol = self.en_vol.get(cle)
+            meneur = vol is None
+            if meneur:
+                vol = self.en_vol[cle] = _Vol()
+
+        if not meneur:
+            if vol.fini.wait(attente_max_s):
+                with self._verrou:
+                    self._compter(projet_id, "coalesced")
+                if vol.erreur is not None:
+                    raise vol.erreur
+                return vol.resultat[0], "coalesced"
+            return self._telecharger(cle, envoyer, projet_id)  # meneur trop lent : appel indépendant
+
+        try:
+            vol.resultat = self._telecharger(cle, envoyer, projet_id)
+            return vol.resultat
+        except Exception as e:
+            vol.erreur = e
+            raise
+        finally:
+            with self._verrou:
+                self.en_vol.pop(cle, None)
+            vol.fini.set()
+
+    def purger(self, projet_id=None):
+        with self._verrou:
+            for cle in [c for c, e in self.entrees.items() if projet_id is None or e.projet_id == projet_id]:
+                self._retirer(cle)
+
+    def statistiques(self, projet_id=None):
+        """Compteurs et taux de réussite (hits + revalidations + fusions sur le total), globaux ou d'un projet."""
+        with self._verrou:
+            if projet_id is None:
+                compteurs = sum(self.compteurs.values(), Counter())
+                entrees = list(self.entrees.values())
+            else:
+                compteurs = Counter(self.compteurs.get(projet_id, {}))
+                entrees = [e for e in self.entrees.values() if e.projet_id == projet_id]
+        servis = compteurs["hits"] + compteurs["revalidated"] + compteurs["coalesced"]
+        total = servis + compteurs["misses"]
+        return {
+            **{cle: compteurs[cle] for cle in ("hits", "revalidated", "coalesced", "misses", "stored", "evicted")},
+            "hit_rate": round(servis / total, 4) if total else None,
+            "entries": len(entrees),
+            "bytes": sum(e.taille for e in entrees),
+            "budget_bytes": self.budget,
+        }
+
+
+cache_http = CacheHTTP()
@@ -0,0 +1,37 @@
+import re
+from functools import lru_cache
+
+_RE_JSONPATH = re.compile(r"\.\.(\w+)|\.(\w+|\*)|\[(\d+|\*)\]|\[['\"]([^'\"]+)['\"]\]")
+
+
+class JSONPathInvalide(ValueError):
+    pass
+
+
+# ✅ Sous-ensemble de JSONPath : $.a.b, $['a'], $.items[0], $.items[*].id, $..id
+@lru_cache(maxsize=256)
+def compiler_jsonpath(expression):
+    """Suite d'opérations (cle | index | tout | descente, argument) ; JSONPathInvalide si hors du sous-ensemble."""
+    if not isinstance(expression, str):
+        raise JSONPathInvalide(f"Expression JSONPath invalide : {expression!r}")
+    expression = expression.strip()
+    if not expression.startswith("$"):
+        raise JSONPathInvalide(f"Expression JSONPath invalide : {expression}")
+    operations, position = [], 1
+    while position < len(expression):
+        morceau = _RE_JSONPATH.match(expression, position)
+        if not morceau:
+            raise JSONPathInvalide(f"Expression JSONPath invalide : {expression}")
+        descente, cle, index, cle_crochets = morceau.groups()
+        if descente:
+            operations.append(("descente", descente))
+        elif cle_crochets is not None:
+            operations.append(("cle", cle_crochets))
+        elif (cle or index) == "*":
+            operations.append(("tout", None))
+        elif index is not None:
+            operations.append(("index", int(index)))
+        else:
+            operations.append(("cle", cle))
+        position = morceau.end()
+    return tuple(operations)
@@ -0,0 +1,44 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from scraping_data.benchmarks import TAILLES_PAR_DEFAUT, comparer_baseline, executer_benchmarks
+
+
+class Command(BaseCommand):
+    help = "Benchmark du pipeline scrape → enrich → écriture en base → rapport, comparé à une baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default=",".join(str(t) for t in TAILLES_PAR_DEFAUT),
+                            help="Nombres d'endpoints des specs synthétiques, séparés par des virgules")
+        parser.add_argument('--repeat', type=int, default=3, help="Exécutions par taille (médiane retenue)")
+        parser.add_argument('--baseline', default=str(Path(settings.BASE_DIR) / 'bench_baseline.json'))
+        parser.add_argument('--save-baseline', action='store_true', help="Enregistre les résultats comme nouvelle baseline")
+        parser.add_argument('--threshold', type=float, default=0.20, help="Régression tolérée (0.20 = +20 %%)")
+
+    def handle(self, *args, **options):
+        tailles = [int(t) for t in options['sizes'].split(',') if t]
+        resultats = executer_benchmarks(tailles, repetitions=options['repeat'])
+        self.stdout.write(json.dumps(resultats, indent=2))
+
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.write_text(json.dumps(resultats, indent=2), encoding='utf-8')
+            self.stdout.write(self.style.SUCCESS(f"✅ Baseline enregistrée dans {baseline_path}"))
+            return
+
+        if not baseline_path.exists():
+            self.stdout.write(self.style.WARNING("Aucune baseline trouvée, lancez avec --save-baseline."))
+            return
+
+        baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+        regressions = comparer_baseline(resultats, baseline, seuil=options['threshold'])
+        for r in regressions:
+            self.stdout.write(self.style.ERROR(
+                f"❌ {r['taille']} endpoints : {r['metrique']} {r['baseline']} → {r['mesure']} (+{r['ecart_pct']} %)"
+            ))
+        if regressions:
+            raise CommandError(f"{len(regressions)} régression(s) au-delà du seuil.")
+        self.stdout.write(self.style.SUCCESS("✅ Aucune régression par rapport à la baseline."))
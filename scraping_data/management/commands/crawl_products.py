@@ -0,0 +1,26 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scraping_data.products import ErreurCollecte, SourceInconnue, collecter_produits
+
+
+class Command(BaseCommand):
+    help = "Collecte les produits d'une source paginée (PRODUCT_SOURCES) et les enregistre en base par lots (upsert)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('source', help="Nom de la source dans PRODUCT_SOURCES")
+        parser.add_argument('--incremental', action='store_true',
+                            help="S'arrête à la première page dont tous les produits sont déjà en base")
+        parser.add_argument('--max-pages', type=int, default=None)
+        parser.add_argument('--concurrency', type=int, default=None, help="Pages téléchargées en parallèle")
+        parser.add_argument('--batch-size', type=int, default=None, help="Produits par upsert")
+
+    def handle(self, *args, **options):
+        try:
+            bilan = collecter_produits(options['source'], incremental=options['incremental'],
+                                       max_pages=options['max_pages'], concurrence=options['concurrency'],
+                                       taille_lot=options['batch_size'])
+        except (SourceInconnue, ErreurCollecte) as e:
+            raise CommandError(str(e))
+        self.stdout.write(json.dumps(bilan, ensure_ascii=False))
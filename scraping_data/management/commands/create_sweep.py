@@ -0,0 +1,26 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scraping_data.models import SwaggerProject
+from scraping_data.sweeps import creer_sweep
+
+
+class Command(BaseCommand):
+    help = "Crée une campagne de tests en masse (un item par endpoint) à exécuter par des workers sweep_worker."
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument('--base-url', default=None, help="Cible alternative, ex. http://127.0.0.1:8001 (serveur mock)")
+        parser.add_argument('--timeout', type=float, default=5)
+        parser.add_argument('--fuzz', type=int, default=None, metavar='GRAINE')
+
+    def handle(self, *args, **options):
+        try:
+            projet = SwaggerProject.objects.get(pk=options['project_id'])
+        except SwaggerProject.DoesNotExist:
+            raise CommandError(f"Projet {options['project_id']} introuvable.")
+
+        sweep = creer_sweep(projet, base_url=options['base_url'], timeout=options['timeout'],
+                            graine_fuzz=options['fuzz'])
+        self.stdout.write(json.dumps({'sweep': sweep.pk, 'total': sweep.total}))
@@ -0,0 +1,20 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from scraping_data.blobstore import purger_blobs
+
+
+class Command(BaseCommand):
+    help = ("Supprime du blob store les blobs qui ne sont plus référencés (specs, versions, réponses de référence, "
+            "historique des tests).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-minutes', type=int, default=60,
+                            help="Âge minimum d'un blob supprimé (les blobs récents peuvent être en cours de rattachement)")
+        parser.add_argument('--dry-run', action='store_true', help="Compter les blobs orphelins sans les supprimer")
+
+    def handle(self, *args, **options):
+        bilan = purger_blobs(delai=timedelta(minutes=options['grace_minutes']), simulation=options['dry_run'])
+        self.stdout.write(json.dumps(bilan))
@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scraping_data.models import SwaggerProject
+from scraping_data.runner import executer_charge
+
+
+class Command(BaseCommand):
+    help = "Mode charge : rejoue les tests en masse d'un projet et mesure le débit."
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument('--base-url', default=None, help="Cible alternative, ex. http://127.0.0.1:8001 (serveur mock)")
+        parser.add_argument('--repeat', type=int, default=1)
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument('--timeout', type=float, default=5)
+        parser.add_argument('--fuzz', type=int, default=None, metavar='GRAINE',
+                            help="Valeurs de paramètres générées selon les schémas, variées à chaque répétition")
+
+    def handle(self, *args, **options):
+        try:
+            projet = SwaggerProject.objects.get(pk=options['project_id'])
+        except SwaggerProject.DoesNotExist:
+            raise CommandError(f"Projet {options['project_id']} introuvable.")
+
+        stats = executer_charge(
+            projet,
+            base_url=options['base_url'],
+            repetitions=options['repeat'],
+            concurrence=options['concurrency'],
+            timeout=options['timeout'],
+            graine_fuzz=options['fuzz'],
+        )
+        self.stdout.write(json.dumps(stats, indent=2))
@@ -0,0 +1,52 @@
+import json
+from contextlib import ExitStack
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scraping_data.models import SwaggerProject
+from scraping_data.replay import Rejeu, lire_capture
+
+
+class Command(BaseCommand):
+    help = "Importe une capture HAR / NDJSON et la rejoue sur les endpoints d'un projet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument('fichier')
+        parser.add_argument('--format', choices=['har', 'ndjson'], default=None,
+                            help="Détecté par l'extension si absent (.ndjson / .jsonl)")
+        parser.add_argument('--mode', choices=['fast', 'original', 'scaled'], default='fast')
+        parser.add_argument('--speed', type=float, default=1.0, help="Facteur d'accélération du mode scaled")
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--base-url', default=None, help="Rejoue vers une autre cible (ex. serveur mock)")
+        parser.add_argument('--timeout', type=float, default=5)
+        parser.add_argument('--output', default=None,
+                            help="Fichier NDJSON recevant le résultat de chaque requête (sinon : historique en mémoire)")
+
+    def handle(self, *args, **options):
+        try:
+            projet = SwaggerProject.objects.get(pk=options['project_id'])
+        except SwaggerProject.DoesNotExist:
+            raise CommandError(f"Projet {options['project_id']} introuvable.")
+        if options['speed'] <= 0:
+            raise CommandError("--speed doit être positif.")
+
+        with ExitStack() as pile:
+            sortie = pile.enter_context(open(options['output'], 'w', encoding='utf-8')) if options['output'] else None
+            rejeu = Rejeu(
+                projet,
+                mode=options['mode'],
+                vitesse=options['speed'],
+                concurrence=options['concurrency'],
+                base_url=options['base_url'],
+                timeout=options['timeout'],
+                sortie=sortie,
+            )
+            fichier = pile.enter_context(open(options['fichier'], 'r', encoding='utf-8'))
+            stats = rejeu.executer(lire_capture(fichier, options['format']))
+
+        for message in stats['messages_erreurs']:
+            self.stderr.write(message)
+        self.stdout.write(json.dumps(stats, indent=2))
+        if stats['erreurs']:
+            raise CommandError(f"{stats['erreurs']} requête(s) interrompue(s) par une exception.")
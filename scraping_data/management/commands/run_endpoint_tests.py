@@ -0,0 +1,136 @@
+import hashlib
+import json
+import re
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scraping_data.models import SwaggerProject
+from scraping_data.runner import en_echec, iterer_tests
+
+
+def shard_de(ep, total):
+    """Shard (1..total) d'un endpoint : stable d'une exécution et d'une machine à l'autre."""
+    cle = f"{ep.get('method', 'GET').upper()} {ep.get('endpoint', '')}"
+    return int(hashlib.sha1(cle.encode("utf-8")).hexdigest(), 16) % total + 1
+
+
+def lire_shard(valeur):
+    morceaux = re.fullmatch(r"(\d+)/(\d+)", valeur or "")
+    if not morceaux or not 1 <= int(morceaux.group(1)) <= int(morceaux.group(2)):
+        raise CommandError(f"--shard invalide : {valeur} (attendu i/n, 1 <= i <= n)")
+    return int(morceaux.group(1)), int(morceaux.group(2))
+
+
+def filtrer(endpoints, methodes=None, prefixe=None, motif=None, tags=None, shard=None):
+    methodes = {m.upper() for m in methodes or []}
+    motif = re.compile(motif) if motif else None
+    for ep in endpoints:
+        if methodes and ep.get("method", "GET").upper() not in methodes:
+            continue
+        if prefixe and not ep.get("endpoint", "").startswith(prefixe):
+            continue
+        if motif and not motif.search(f"{ep.get('method', 'GET').upper()} {ep.get('endpoint', '')}"):
+            continue
+        if tags and not set(tags) & set(ep.get("tags") or []):
+            continue
+        if shard and shard_de(ep, shard[1]) != shard[0]:
+            continue
+        yield ep
+
+
+# ✅ Rapport JUnit : un testcase par endpoint, lisible par la CI
+def rapport_junit(resultats, nom, duree_s):
+    echecs = sum(1 for r in resultats if en_echec(r) and "erreur" not in r)
+    erreurs = sum(1 for r in resultats if "erreur" in r)
+    suite = ET.Element("testsuite", {
+        "name": nom,
+        "tests": str(len(resultats)),
+        "failures": str(echecs),
+        "errors": str(erreurs),
+        "skipped": "0",
+        "time": f"{duree_s:.3f}",
+    })
+    for resultat in resultats:
+        cas = ET.SubElement(suite, "testcase", {
+            "classname": nom,
+            "name": resultat["endpoint"],
+            "time": f"{(resultat['duree_ms'] or 0) / 1000:.3f}",
+        })
+        if "erreur" in resultat:
+            ET.SubElement(cas, "error", {"message": resultat["erreur"][:200]}).text = resultat["erreur"]
+        elif resultat["status"] in ("failed", "skipped"):
+            ET.SubElement(cas, "failure", {"message": f"HTTP {resultat['status_code']}"}).text = resultat["details"]
+        elif resultat.get("schema_valide") is False:
+            violations = resultat.get("violations", [])
+            ET.SubElement(cas, "failure", {"message": f"{len(violations)} violation(s) du schéma"}).text = "\n".join(
+                f"{v['champ']} : {v['erreur']}" for v in violations
+            )
+        elif resultat.get("golden_ok") is False:
+            differences = resultat.get("golden_differences", [])
+            ET.SubElement(cas, "failure", {"message": f"{len(differences)} écart(s) à la réponse de référence"}).text = "\n".join(
+                f"{d['path']} : {d['change']}" for d in differences
+            )
+    return ET.ElementTree(suite)
+
+
+class Command(BaseCommand):
+    help = ("Tests en masse sans interface : filtres, shards déterministes pour la CI, "
+            "résultats en NDJSON au fil de l'eau et synthèse JUnit XML.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument('--base-url', default=None, help="Cible alternative, ex. http://127.0.0.1:8001 (serveur mock)")
+        parser.add_argument('--method', action='append', default=[], help="Méthode HTTP à tester (répétable)")
+        parser.add_argument('--path-prefix', default=None, help="Seuls les endpoints dont le chemin commence ainsi")
+        parser.add_argument('--match', default=None, help="Expression régulière sur « METHOD /chemin »")
+        parser.add_argument('--tag', action='append', default=[], help="Tag OpenAPI (répétable)")
+        parser.add_argument('--shard', default=None, metavar='I/N', help="Ne teste que le shard I sur N (ex. 2/4)")
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--timeout', type=float, default=5)
+        parser.add_argument('--fuzz', type=int, default=None, metavar='GRAINE')
+        parser.add_argument('--ndjson', default='-', help="Fichier NDJSON des résultats (- : sortie standard)")
+        parser.add_argument('--junit', default=None, help="Fichier JUnit XML de synthèse")
+        parser.add_argument('--record-golden', action='store_true',
+                            help="Enregistre les réponses comme références au lieu de les comparer")
+
+    def handle(self, *args, **options):
+        try:
+            projet = SwaggerProject.objects.get(pk=options['project_id'])
+        except SwaggerProject.DoesNotExist:
+            raise CommandError(f"Projet {options['project_id']} introuvable.")
+
+        shard = lire_shard(options['shard']) if options['shard'] else None
+        try:
+            endpoints = list(filtrer(projet.swagger_json or [], options['method'], options['path_prefix'],
+                                     options['match'], options['tag'], shard))
+        except re.error as e:
+            raise CommandError(f"--match invalide : {e}")
+
+        sortie = sys.stdout if options['ndjson'] == '-' else open(options['ndjson'], 'w', encoding='utf-8')
+        resultats = []
+        debut = time.perf_counter()
+        try:
+            for resultat in iterer_tests(projet, base_url=options['base_url'], concurrence=options['concurrency'],
+                                         timeout=options['timeout'], graine_fuzz=options['fuzz'], endpoints=endpoints,
+                                         enregistrer_goldens=options['record_golden'], historiser=False):
+                resultats.append(resultat)
+                sortie.write(json.dumps(resultat, ensure_ascii=False) + "\n")
+                sortie.flush()
+        finally:
+            if sortie is not sys.stdout:
+                sortie.close()
+        duree = time.perf_counter() - debut
+
+        nom = f"{projet.name}" + (f" [shard {shard[0]}/{shard[1]}]" if shard else "")
+        if options['junit']:
+            arbre = rapport_junit(resultats, nom, duree)
+            ET.indent(arbre)
+            arbre.write(options['junit'], encoding='utf-8', xml_declaration=True)
+
+        echecs = sum(1 for r in resultats if en_echec(r))
+        self.stderr.write(f"{len(resultats)} endpoint(s) testé(s), {echecs} échec(s) en {duree:.2f}s")
+        if echecs:
+            raise CommandError(f"{echecs} test(s) en échec.", returncode=1)
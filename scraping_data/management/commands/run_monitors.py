@@ -0,0 +1,29 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from scraping_data.monitoring import Ordonnanceur, purger
+
+
+class Command(BaseCommand):
+    help = ("Planificateur de la supervision synthétique : contrôle les monitors à leur intervalle "
+            "(gigue, exécutions manquées, concurrence par projet) et applique la rétention des mesures.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=None, help="Contrôles simultanés (MONITOR_CONCURRENCY)")
+        parser.add_argument('--per-project', type=int, default=None,
+                            help="Contrôles simultanés par projet (MONITOR_PROJECT_CONCURRENCY)")
+        parser.add_argument('--tick', type=float, default=1.0, help="Période de scrutation des monitors dus (s)")
+        parser.add_argument('--purge-only', action='store_true', help="Appliquer la rétention puis quitter")
+
+    def handle(self, *args, **options):
+        if options['purge_only']:
+            self.stdout.write(json.dumps(purger()))
+            return
+        ordonnanceur = Ordonnanceur(concurrence=options['concurrency'], par_projet=options['per_project'])
+        self.stderr.write(f"Supervision : {ordonnanceur.concurrence} contrôles simultanés, "
+                          f"{ordonnanceur.par_projet} par projet. Ctrl+C pour arrêter.")
+        try:
+            ordonnanceur.executer(tick_s=options['tick'])
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from scraping_data.mock_server import MockAPI, creer_serveur
+from scraping_data.models import SwaggerProject
+
+
+class Command(BaseCommand):
+    help = "Sert le swagger_json d'un projet comme serveur mock local (tests hors ligne)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('project_id', type=int)
+        parser.add_argument('--host', default='127.0.0.1')
+        parser.add_argument('--port', type=int, default=8001)
+        parser.add_argument('--latency-ms', type=float, default=0, help="Latence fixe ajoutée à chaque réponse")
+        parser.add_argument('--jitter-ms', type=float, default=0, help="Latence aléatoire supplémentaire (0..jitter)")
+        parser.add_argument('--error-rate', type=float, default=0.0, help="Proportion de réponses en erreur (0..1)")
+        parser.add_argument('--error-codes', default='500,503')
+        parser.add_argument('--seed', type=int, default=None, help="Graine pour une latence / des erreurs reproductibles")
+        parser.add_argument('--oauth', default=None, metavar='CLIENT_ID:SECRET',
+                            help="Serveur OAuth2 local (POST /oauth/token) ; jeton Bearer exigé sur toutes les routes")
+        parser.add_argument('--token-ttl', type=int, default=3600, help="Durée de validité des jetons émis (s)")
+        parser.add_argument('--verbose-log', action='store_true')
+
+    def handle(self, *args, **options):
+        try:
+            projet = SwaggerProject.objects.get(pk=options['project_id'])
+        except SwaggerProject.DoesNotExist:
+            raise CommandError(f"Projet {options['project_id']} introuvable.")
+
+        api = MockAPI(
+            projet.swagger_json,
+            latence_ms=options['latency_ms'],
+            gigue_ms=options['jitter_ms'],
+            taux_erreur=options['error_rate'],
+            codes_erreur=[int(c) for c in options['error_codes'].split(',') if c],
+            seed=options['seed'],
+            oauth=tuple(options['oauth'].split(':', 1)) if options['oauth'] else None,
+            duree_jeton_s=options['token_ttl'],
+        )
+        serveur = creer_serveur(api, options['host'], options['port'], verbose=options['verbose_log'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Serveur mock du projet {projet.pk} ({len(api.routes)} endpoints) "
+            f"sur http://{options['host']}:{serveur.server_port}"
+        ))
+        try:
+            serveur.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            serveur.server_close()
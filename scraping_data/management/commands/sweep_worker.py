@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from scraping_data.models import Sweep
+from scraping_data.sweeps import Worker, bilan
+
+
+class Command(BaseCommand):
+    help = ("Worker de campagne : loue des lots d'items, les teste et écrit les résultats. "
+            "Lancer autant de processus que voulu, sur une ou plusieurs machines partageant la base.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sweep', type=int, default=None, help="Limiter le worker à une campagne")
+        parser.add_argument('--batch', type=int, default=20, help="Items loués par lot")
+        parser.add_argument('--concurrency', type=int, default=8, help="Requêtes simultanées dans un lot")
+        parser.add_argument('--lease', type=float, default=None, help="Durée du bail en secondes (SWEEP_LEASE_SECONDS)")
+        parser.add_argument('--name', default=None, help="Nom du worker (défaut : hôte:pid)")
+        parser.add_argument('--no-wait', action='store_true',
+                            help="S'arrêter dès qu'il n'y a plus rien à louer, sans attendre les baux des autres workers")
+
+    def handle(self, *args, **options):
+        if options['sweep'] and not Sweep.objects.filter(pk=options['sweep']).exists():
+            raise CommandError(f"Campagne {options['sweep']} introuvable.")
+
+        worker = Worker(nom=options['name'], taille_lot=options['batch'], concurrence=options['concurrency'],
+                        sweep_id=options['sweep'], duree_bail_s=options['lease'])
+        traites = worker.executer(jusqua_fin=not options['no_wait'])
+        self.stderr.write(f"{worker.nom} : {traites} item(s) traité(s)")
+        if options['sweep']:
+            self.stdout.write(json.dumps(bilan(Sweep.objects.get(pk=options['sweep'])), indent=2))
@@ -0,0 +1,161 @@
+import contextvars
+import cProfile
+import io
+import pstats
+import random
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+
+import requests
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.backends.django import Template
+
+# Mesure de la requête en cours (None hors requête profilée)
+_mesure_courante = contextvars.ContextVar("mesure_profilage", default=None)
+
+_verrou = threading.Lock()
+_verrou_cprofile = threading.Lock()
+_statistiques = {}
+_echantillons = deque(maxlen=20)
+_sondes_installees = False
+
+COMPTEURS = ("sql_count", "sql_ms", "json_decode_ms", "template_ms", "http_count", "http_ms")
+
+
+def _ajouter(cle, valeur):
+    mesure = _mesure_courante.get()
+    if mesure is not None:
+        mesure[cle] += valeur
+
+
+def sonde(cle_ms, cle_count=None):
+    """Décorateur de mesure : cumule la durée (et le nombre d'appels) dans la mesure courante."""
+    def decorateur(fonction):
+        def wrapper(*args, **kwargs):
+            if _mesure_courante.get() is None:
+                return fonction(*args, **kwargs)
+            debut = time.perf_counter()
+            try:
+                return fonction(*args, **kwargs)
+            finally:
+                _ajouter(cle_ms, (time.perf_counter() - debut) * 1000)
+                if cle_count:
+                    _ajouter(cle_count, 1)
+        wrapper.__wrapped__ = fonction
+        return wrapper
+    return decorateur
+
+
+# ✅ Sondes installées une seule fois : rendu des templates, HTTP sortant
+# (le décodage des specs est mesuré dans blobstore : lire_json, lire_json_blob)
+def installer_sondes():
+    global _sondes_installees
+    with _verrou:
+        if _sondes_installees:
+            return
+        Template.render = sonde("template_ms")(Template.render)
+        requests.Session.request = sonde("http_ms", "http_count")(requests.Session.request)
+        _sondes_installees = True
+
+
+def _sonde_sql(execute, sql, params, many, context):
+    debut = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        _ajouter("sql_ms", (time.perf_counter() - debut) * 1000)
+        _ajouter("sql_count", 1)
+
+
+class ProfilingMiddleware:
+    """
+    Profilage optionnel par vue (PROFILING_ENABLED = True dans settings) :
+    nombre et durée des requêtes SQL, décodage des specs (blob store), rendu des templates, HTTP sortant.
+    Une fraction des requêtes (PROFILING_SAMPLE_RATE) est exécutée sous cProfile ;
+    la pile est conservée si la requête dépasse PROFILING_SLOW_MS.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PROFILING_ENABLED", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.seuil_lent_ms = getattr(settings, "PROFILING_SLOW_MS", 500)
+        self.taux_echantillon = getattr(settings, "PROFILING_SAMPLE_RATE", 0.0)
+        installer_sondes()
+
+    def __call__(self, request):
+        mesure = dict.fromkeys(COMPTEURS, 0)
+        jeton = _mesure_courante.set(mesure)
+
+        profileur = None
+        if self.taux_echantillon and random.random() < self.taux_echantillon \
+                and _verrou_cprofile.acquire(blocking=False):
+            profileur = cProfile.Profile()
+
+        debut = time.perf_counter()
+        try:
+            with ExitStack() as pile:
+                for connexion in connections.all():
+                    pile.enter_context(connexion.execute_wrapper(_sonde_sql))
+                if profileur:
+                    profileur.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    if profileur:
+                        profileur.disable()
+        finally:
+            _mesure_courante.reset(jeton)
+            if profileur:
+                _verrou_cprofile.release()
+
+        duree_ms = (time.perf_counter() - debut) * 1000
+        match = getattr(request, "resolver_match", None)
+        vue = match.view_name if match else request.path
+        enregistrer(vue, duree_ms, mesure)
+
+        if profileur and duree_ms >= self.seuil_lent_ms:
+            sortie = io.StringIO()
+            pstats.Stats(profileur, stream=sortie).sort_stats("cumulative").print_stats(25)
+            _echantillons.append({
+                "vue": vue,
+                "path": request.get_full_path(),
+                "duree_ms": round(duree_ms, 2),
+                "pile": sortie.getvalue(),
+            })
+
+        return response
+
+
+# ✅ Agrégats par vue
+def enregistrer(vue, duree_ms, mesure):
+    with _verrou:
+        stats = _statistiques.setdefault(vue, dict(requetes=0, total_ms=0.0, max_ms=0.0, **dict.fromkeys(COMPTEURS, 0)))
+        stats["requetes"] += 1
+        stats["total_ms"] += duree_ms
+        stats["max_ms"] = max(stats["max_ms"], duree_ms)
+        for cle in COMPTEURS:
+            stats[cle] += mesure[cle]
+
+
+def statistiques():
+    with _verrou:
+        resultat = {}
+        for vue, stats in _statistiques.items():
+            n = stats["requetes"]
+            resultat[vue] = {
+                **{cle: round(valeur, 2) for cle, valeur in stats.items()},
+                "moyenne_ms": round(stats["total_ms"] / n, 2),
+                "sql_par_requete": round(stats["sql_count"] / n, 2),
+            }
+        return {"vues": resultat, "echantillons_lents": list(_echantillons)}
+
+
+def reinitialiser():
+    with _verrou:
+        _statistiques.clear()
+        _echantillons.clear()
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:06
+
+import json
+
+from django.db import migrations, models
+
+
+def remplir_resume(apps, schema_editor):
+    SwaggerProject = apps.get_model('scraping_data', 'SwaggerProject')
+    for projet in SwaggerProject.objects.only('id', 'swagger_json', 'created_at').iterator(chunk_size=100):
+        swagger_json = projet.swagger_json or []
+        SwaggerProject.objects.filter(pk=projet.pk).update(
+            endpoint_count=len(swagger_json),
+            spec_size=len(json.dumps(swagger_json, ensure_ascii=False).encode('utf-8')) if swagger_json else 0,
+            last_scraped_at=projet.created_at,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping_data', '0004_endpoint_delete_swaggerendpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='swaggerproject',
+            name='endpoint_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='swaggerproject',
+            name='last_scraped_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='swaggerproject',
+            name='spec_size',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='swaggerproject',
+            index=models.Index(fields=['-created_at', '-id'], name='swaggerproject_keyset_idx'),
+        ),
+        migrations.RunPython(remplir_resume, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:07
+
+import gzip
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+
+# Copies figées des fonctions du blob store : la migration ne dépend pas du code applicatif
+CODEC_PAR_DEFAUT = "zstd" if zstandard else "gzip"
+
+
+def compresser(data):
+    if CODEC_PAR_DEFAUT == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return gzip.compress(data, compresslevel=6, mtime=0)
+
+
+def decompresser(data, codec):
+    if codec == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+def empreinte(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def encoder_json(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def vers_blob_store(apps, schema_editor):
+    """Copie le swagger_json de chaque projet existant dans le blob store."""
+    SwaggerProject = apps.get_model('scraping_data', 'SwaggerProject')
+    SpecBlob = apps.get_model('scraping_data', 'SpecBlob')
+
+    for projet in SwaggerProject.objects.exclude(swagger_json=None).iterator(chunk_size=50):
+        if not projet.swagger_json:
+            continue
+        data = encoder_json(projet.swagger_json)
+        sha = empreinte(data)
+        if not SpecBlob.objects.filter(pk=sha).exists():
+            SpecBlob.objects.create(sha256=sha, codec=CODEC_PAR_DEFAUT, size=len(data), data=compresser(data))
+        SwaggerProject.objects.filter(pk=projet.pk).update(spec_blob_id=sha, spec_size=len(data))
+
+
+def depuis_blob_store(apps, schema_editor):
+    SwaggerProject = apps.get_model('scraping_data', 'SwaggerProject')
+    SpecBlob = apps.get_model('scraping_data', 'SpecBlob')
+
+    for projet in SwaggerProject.objects.exclude(spec_blob=None).iterator(chunk_size=50):
+        blob = SpecBlob.objects.get(pk=projet.spec_blob_id)
+        swagger_json = json.loads(decompresser(bytes(blob.data), blob.codec))
+        SwaggerProject.objects.filter(pk=projet.pk).update(swagger_json=swagger_json)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping_data', '0005_swaggerproject_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpecBlob',
+            fields=[
+                ('sha256', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('codec', models.CharField(max_length=10)),
+                ('size', models.PositiveIntegerField()),
+                ('data', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='swaggerproject',
+            name='spec_blob',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='scraping_data.specblob'),
+        ),
+        migrations.RunPython(vers_blob_store, depuis_blob_store),
+        migrations.RemoveField(
+            model_name='swaggerproject',
+            name='swagger_json',
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping_data', '0006_spec_blob_store'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TestPlan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('steps', models.JSONField(default=list)),
+                ('variables', models.JSONField(blank=True, default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='test_plans', to='scraping_data.swaggerproject')),
+            ],
+        ),
+    ]
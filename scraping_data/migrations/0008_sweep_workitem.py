@@ -0,0 +1,47 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping_data', '0007_testplan'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Sweep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('base_url', models.CharField(max_length=500)),
+                ('timeout', models.FloatField(default=5)),
+                ('fuzz_seed', models.IntegerField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('running', 'En cours'), ('done', 'Terminée')], default='running', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sweeps', to='scraping_data.swaggerproject')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WorkItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('endpoint', models.JSONField()),
+                ('status', models.CharField(choices=[('pending', 'En attente'), ('leased', 'Loué'), ('done', 'Terminé'), ('failed', 'Abandonné')], default='pending', max_length=10)),
+                ('lease_owner', models.CharField(blank=True, default='', max_length=100)),
+                ('lease_token', models.CharField(blank=True, default='', max_length=32)),
+                ('lease_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('sweep', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='scraping_data.sweep')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['sweep', 'status', 'lease_expires_at'], name='workitem_lease_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:36
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping_data', '0008_sweep_workitem'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Monitor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('interval_seconds', models.PositiveIntegerField(default=60)),
+                ('timeout', models.FloatField(default=5)),
+                ('expect_status', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('enabled', models.BooleanField(default=True)),
+                ('next_run_at', models.DateTimeField(blank=True, null=True)),
+                ('last_run_at', models.DateTimeField(blank=True, null=True)),
+                ('missed_runs', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('endpoint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='monitors', to='scraping_data.endpoint')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CheckRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.PositiveIntegerField()),
+                ('bucket', models.DateTimeField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('failures', models.PositiveIntegerField(default=0)),
+                ('duration_sum', models.FloatField(default=0)),
+                ('duration_min', models.FloatField(blank=True, null=True)),
+                ('duration_max', models.FloatField(blank=True, null=True)),
+                ('monitor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rollups', to='scraping_data.monitor')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='CheckResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('checked_at', models.DateTimeField()),
+                ('ok', models.BooleanField()),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('duration_ms', models.FloatField()),
+                ('monitor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checks', to='scraping_data.monitor')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='monitor',
+            index=models.Index(fields=['enabled', 'next_run_at'], name='monitor_due_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='checkrollup',
+            constraint=models.UniqueConstraint(fields=('monitor', 'resolution', 'bucket'), name='rollup_unique_bucket'),
+        ),
+        migrations.AddIndex(
+            model_name='checkresult',
+            index=models.Index(fields=['monitor', 'checked_at'], name='check_monitor_time_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping_data', '0009_monitoring'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpecVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('endpoint_count', models.PositiveIntegerField(default=0)),
+                ('added', models.PositiveIntegerField(default=0)),
+                ('removed', models.PositiveIntegerField(default=0)),
+                ('changed', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('delta_blob', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='scraping_data.specblob')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='spec_versions', to='scraping_data.swaggerproject')),
+                ('snapshot_blob', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='+', to='scraping_data.specblob')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('project', 'number'), name='specversion_unique_number')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping_data', '0010_specversion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoldenResponse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('method', models.CharField(max_length=10)),
+                ('endpoint', models.CharField(max_length=500)),
+                ('params_hash', models.CharField(max_length=32)),
+                ('parameters', models.JSONField(default=dict)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('ignore_paths', models.JSONField(blank=True, default=list)),
+                ('recorded_at', models.DateTimeField(auto_now=True)),
+                ('body_blob', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='+', to='scraping_data.specblob')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='goldens', to='scraping_data.swaggerproject')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('project', 'method', 'endpoint', 'params_hash'), name='golden_unique_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping_data', '0011_goldenresponse'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='swaggerproject',
+            name='cache_enabled',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.4 on 2026-10-19 15:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scraping_data', '0012_swaggerproject_cache_enabled'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('bearer', 'Bearer token'), ('api_key', 'API key'), ('basic', 'HTTP Basic'), ('oauth2_client_credentials', 'OAuth2 client credentials')], max_length=32)),
+                ('enabled', models.BooleanField(default=True)),
+                ('token', models.TextField(blank=True, default='')),
+                ('api_key', models.CharField(blank=True, default='', max_length=500)),
+                ('api_key_name', models.CharField(blank=True, default='X-API-Key', max_length=100)),
+                ('api_key_location', models.CharField(choices=[('header', 'Header'), ('query', 'Query')], default='header', max_length=10)),
+                ('username', models.CharField(blank=True, default='', max_length=255)),
+                ('password', models.CharField(blank=True, default='', max_length=255)),
+                ('token_url', models.URLField(blank=True, default='')),
+                ('client_id', models.CharField(blank=True, default='', max_length=255)),
+                ('client_secret', models.CharField(blank=True, default='', max_length=500)),
+                ('scope', models.CharField(blank=True, default='', max_length=500)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('project', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='auth_profile', to='scraping_data.swaggerproject')),
+            ],
+        ),
+    ]
@@ -0,0 +1,177 @@
+import base64
+import json
+import random
+import re
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+# Valeurs d'exemple par type Swagger / OpenAPI
+EXEMPLES_PAR_TYPE = {
+    "integer": 1,
+    "number": 1.0,
+    "boolean": True,
+    "string": "string",
+}
+
+EXEMPLES_PAR_FORMAT = {
+    "date": "2025-01-01",
+    "date-time": "2025-01-01T00:00:00Z",
+    "email": "user@example.com",
+    "uuid": "00000000-0000-0000-0000-000000000000",
+    "uri": "https://example.com",
+}
+
+
+# ✅ Génère une valeur d'exemple à partir d'un schéma JSON
+def exemple_depuis_schema(schema, profondeur=0):
+    if not isinstance(schema, dict) or profondeur > 5:
+        return None
+    if "example" in schema:
+        return schema["example"]
+    if "default" in schema:
+        return schema["default"]
+    if schema.get("enum"):
+        return schema["enum"][0]
+
+    type_ = schema.get("type")
+    if isinstance(type_, list):  # OpenAPI 3.1 : ["string", "null"]
+        type_ = next((t for t in type_ if t != "null"), None)
+
+    if type_ == "object" or "properties" in schema:
+        return {
+            nom: exemple_depuis_schema(prop, profondeur + 1)
+            for nom, prop in schema.get("properties", {}).items()
+        }
+    if type_ == "array":
+        return [exemple_depuis_schema(schema.get("items", {}), profondeur + 1)]
+    if type_ == "string" and schema.get("format") in EXEMPLES_PAR_FORMAT:
+        return EXEMPLES_PAR_FORMAT[schema["format"]]
+    return EXEMPLES_PAR_TYPE.get(type_)
+
+
+# ✅ Réponse d'exemple d'un endpoint de swagger_json
+def reponse_exemple(ep):
+    """
+    Utilise le premier schéma de réponse 2xx documenté ;
+    sinon renvoie un objet construit à partir des types des paramètres.
+    """
+    for code, schema in sorted((ep.get("responses") or {}).items()):
+        if code.startswith("2"):
+            return int(code), exemple_depuis_schema(schema)
+
+    return 200, {
+        "method": ep.get("method", "GET").upper(),
+        "endpoint": ep.get("endpoint", ""),
+        "parameters": {
+            p.get("name"): EXEMPLES_PAR_TYPE.get(p.get("type"), "string")
+            for p in ep.get("parameters", [])
+        },
+    }
+
+
+# ✅ Expression régulière d'un chemin Swagger (/users/{id} -> /users/[^/]+)
+def compiler_chemin(chemin):
+    morceaux = re.split(r"(\{[^}/]+\})", chemin)
+    motif = "".join("[^/]+" if m.startswith("{") else re.escape(m) for m in morceaux)
+    return re.compile(f"^{motif}/?$")
+
+
+class MockAPI:
+    """
+    Table de routage du serveur mock construite depuis swagger_json.
+    Les corps de réponse sont sérialisés une seule fois au démarrage.
+    """
+
+    def __init__(self, swagger_json, latence_ms=0, gigue_ms=0, taux_erreur=0.0,
+                 codes_erreur=(500, 503), seed=None, oauth=None, duree_jeton_s=3600):
+        self.oauth = oauth  # (client_id, client_secret) : serveur OAuth2 local, jeton exigé sur toutes les routes
+        self.duree_jeton_s = duree_jeton_s
+        self.jetons = {}
+        self.jetons_emis = 0
+        self._verrou = threading.Lock()
+        self.latence_ms = latence_ms
+        self.gigue_ms = gigue_ms
+        self.taux_erreur = taux_erreur
+        self.codes_erreur = tuple(codes_erreur)
+        self.random = random.Random(seed)
+        self.routes = []
+
+        for ep in swagger_json or []:
+            status, corps = reponse_exemple(ep)
+            self.routes.append((
+                ep.get("method", "GET").upper(),
+                compiler_chemin(ep.get("endpoint", "")),
+                status,
+                json.dumps(corps, ensure_ascii=False).encode("utf-8"),
+            ))
+
+    # ✅ OAuth2 client credentials local (tests de l'authentification sans fournisseur réel)
+    def emettre_jeton(self, entetes):
+        attendu = base64.b64encode(":".join(self.oauth).encode("utf-8")).decode("ascii")
+        if entetes.get("Authorization") != f"Basic {attendu}":
+            return 401, json.dumps({"error": "invalid_client"}).encode("utf-8")
+        jeton = secrets.token_hex(16)
+        with self._verrou:
+            self.jetons[jeton] = time.monotonic() + self.duree_jeton_s
+            self.jetons_emis += 1
+        return 200, json.dumps({"access_token": jeton, "token_type": "Bearer",
+                                "expires_in": self.duree_jeton_s}).encode("utf-8")
+
+    def jeton_valide(self, entetes):
+        schema, _, jeton = (entetes.get("Authorization") or "").partition(" ")
+        with self._verrou:
+            return schema == "Bearer" and self.jetons.get(jeton, 0) > time.monotonic()
+
+    def repondre(self, method, chemin, entetes=None):
+        """Retourne (status, corps en octets) pour une requête entrante."""
+        if self.oauth:
+            entetes = entetes or {}
+            if method == "POST" and chemin == "/oauth/token":
+                return self.emettre_jeton(entetes)
+            if not self.jeton_valide(entetes):
+                return 401, json.dumps({"error": "invalid_token"}).encode("utf-8")
+
+        if self.latence_ms or self.gigue_ms:
+            time.sleep((self.latence_ms + self.random.uniform(0, self.gigue_ms)) / 1000)
+
+        if self.taux_erreur and self.random.random() < self.taux_erreur:
+            code = self.random.choice(self.codes_erreur)
+            return code, json.dumps({"error": "Erreur injectée par le serveur mock"}).encode("utf-8")
+
+        for route_method, motif, status, corps in self.routes:
+            if route_method == method and motif.match(chemin):
+                return status, corps
+
+        return 404, json.dumps({"error": "Endpoint inconnu"}).encode("utf-8")
+
+
+# ✅ Serveur HTTP multi-thread servant un MockAPI
+def creer_serveur(api, host="127.0.0.1", port=8001, verbose=False):
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _traiter(self):
+            longueur = int(self.headers.get("Content-Length") or 0)
+            if longueur:
+                self.rfile.read(longueur)
+
+            status, corps = api.repondre(self.command, urlparse(self.path).path, self.headers)
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(corps)))
+            self.end_headers()
+            self.wfile.write(corps)
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _traiter
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    serveur = ThreadingHTTPServer((host, port), Handler)
+    serveur.daemon_threads = True
+    return serveur
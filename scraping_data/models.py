@@ -1,24 +1,97 @@
 from django.db import models
 
+from .blobstore import decompresser, encoder_json, lire_json, lire_json_blob, stocker_blob
+
 
 class Product(models.Model):
     title = models.CharField(max_length=255)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     description = models.TextField(blank=True, null=True)
 
+    # Origine d'un produit collecté (products.py) : clé des upserts ; vides pour les produits saisis
+    source = models.CharField(max_length=100, blank=True, default='')
+    source_id = models.CharField(max_length=255, blank=True, null=True)
+    category = models.CharField(max_length=255, blank=True, default='')
+    fetched_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['source', 'source_id'], name='product_source_unique'),
+        ]
+
     def __str__(self):
         return self.title
 
 
+class SpecBlob(models.Model):
+    """Contenu compressé (zstd ou gzip), adressé et dédupliqué par son empreinte sha256."""
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    codec = models.CharField(max_length=10)
+    size = models.PositiveIntegerField()  # taille décompressée en octets
+    data = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.sha256[:12]} ({self.codec}, {self.size} o)"
+
+    def contenu(self):
+        return decompresser(bytes(self.data), self.codec)
+
+
 class SwaggerProject(models.Model):
     name = models.CharField(max_length=255, blank=True, null=True)
     swagger_url = models.URLField()
-    swagger_json = models.JSONField(blank=True, null=True)
+    # Liste des endpoints stockée dans le blob store ; lue via la propriété swagger_json
+    spec_blob = models.ForeignKey(SpecBlob, blank=True, null=True, on_delete=models.PROTECT, related_name='+')
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Résumé dénormalisé de swagger_json : les listes n'ont pas à charger le JSON
+    endpoint_count = models.PositiveIntegerField(default=0)
+    spec_size = models.PositiveIntegerField(default=0)
+    last_scraped_at = models.DateTimeField(blank=True, null=True)
+
+    # Cache HTTP des réponses du testeur interactif (GET / HEAD), désactivé par défaut
+    cache_enabled = models.BooleanField(default=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='swaggerproject_keyset_idx'),
+        ]
+
     def __str__(self):
         return self.name or f"Swagger Project {self.id}"
 
+    @property
+    def swagger_json(self):
+        # Décompression transparente, une seule fois par instance
+        if '_swagger_json' not in self.__dict__:
+            if self.spec_blob_id is None:
+                self._swagger_json = None
+            elif SwaggerProject.spec_blob.is_cached(self):  # select_related('spec_blob')
+                self._swagger_json = lire_json_blob(self.spec_blob)
+            else:
+                self._swagger_json = lire_json(self.spec_blob_id)
+        return self._swagger_json
+
+    @swagger_json.setter
+    def swagger_json(self, value):
+        self._swagger_json = value
+        self._swagger_json_modifie = True
+
+    def save(self, *args, **kwargs):
+        # Nouveau contenu : écrit dans le blob store, la ligne ne garde que la référence
+        if self.__dict__.pop('_swagger_json_modifie', False):
+            swagger_json = self._swagger_json or []
+            data = encoder_json(swagger_json) if swagger_json else b''
+            self.spec_blob_id = stocker_blob(data) if data else None
+            self.endpoint_count = len(swagger_json)
+            self.spec_size = len(data)
+
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'spec_blob', 'endpoint_count', 'spec_size'} - {'swagger_json'}
+        super().save(*args, **kwargs)
+
 
 class Endpoint(models.Model):
     project = models.ForeignKey(SwaggerProject, on_delete=models.CASCADE, related_name='endpoints')
@@ -37,3 +110,192 @@ class Endpoint(models.Model):
 
     def __str__(self):
         return f"{self.method} {self.endpoint}"
+
+
+class TestPlan(models.Model):
+    """
+    Scénario de test d'un projet : graphe (DAG) d'appels d'endpoints.
+    Chaque étape peut extraire des variables de sa réponse (JSONPath) pour les étapes suivantes.
+    """
+    project = models.ForeignKey(SwaggerProject, on_delete=models.CASCADE, related_name='test_plans')
+    name = models.CharField(max_length=255)
+    steps = models.JSONField(default=list)
+    variables = models.JSONField(default=dict, blank=True)  # valeurs initiales disponibles pour {{var}}
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return self.name
+
+
+class Sweep(models.Model):
+    """Campagne de tests en masse découpée en WorkItem, exécutée par des workers sur plusieurs machines."""
+    STATUTS = [('running', 'En cours'), ('done', 'Terminée')]
+
+    project = models.ForeignKey(SwaggerProject, on_delete=models.CASCADE, related_name='sweeps')
+    base_url = models.CharField(max_length=500)
+    timeout = models.FloatField(default=5)
+    fuzz_seed = models.IntegerField(blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUTS, default='running')
+    total = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Sweep {self.pk} ({self.project_id})"
+
+
+class WorkItem(models.Model):
+    """Un endpoint à tester ; loué par un worker pour une durée limitée (bail prolongé par battements)."""
+    STATUTS = [('pending', 'En attente'), ('leased', 'Loué'), ('done', 'Terminé'), ('failed', 'Abandonné')]
+
+    sweep = models.ForeignKey(Sweep, on_delete=models.CASCADE, related_name='items')
+    position = models.PositiveIntegerField()
+    endpoint = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUTS, default='pending')
+    lease_owner = models.CharField(max_length=100, blank=True, default='')
+    lease_token = models.CharField(max_length=32, blank=True, default='')
+    lease_expires_at = models.DateTimeField(blank=True, null=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    result = models.JSONField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['sweep', 'status', 'lease_expires_at'], name='workitem_lease_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sweep_id}#{self.position}"
+
+
+class Monitor(models.Model):
+    """Contrôle périodique (supervision synthétique) d'un endpoint catalogué."""
+    endpoint = models.ForeignKey(Endpoint, on_delete=models.CASCADE, related_name='monitors')
+    interval_seconds = models.PositiveIntegerField(default=60)
+    timeout = models.FloatField(default=5)
+    expect_status = models.PositiveSmallIntegerField(blank=True, null=True)  # None : tout 2xx est un succès
+    enabled = models.BooleanField(default=True)
+    next_run_at = models.DateTimeField(blank=True, null=True)
+    last_run_at = models.DateTimeField(blank=True, null=True)
+    missed_runs = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['enabled', 'next_run_at'], name='monitor_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"Monitor {self.pk} ({self.endpoint})"
+
+
+class CheckResult(models.Model):
+    """Mesure brute, volontairement compacte (pas de corps de réponse) ; purgée après MONITOR_RETENTION['raw']."""
+    monitor = models.ForeignKey(Monitor, on_delete=models.CASCADE, related_name='checks')
+    checked_at = models.DateTimeField()
+    ok = models.BooleanField()
+    status_code = models.PositiveSmallIntegerField(blank=True, null=True)
+    duration_ms = models.FloatField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['monitor', 'checked_at'], name='check_monitor_time_idx'),
+        ]
+
+
+class CheckRollup(models.Model):
+    """Agrégat d'un monitor sur une fenêtre de `resolution` secondes (60 ou 3600) commençant à `bucket`."""
+    monitor = models.ForeignKey(Monitor, on_delete=models.CASCADE, related_name='rollups')
+    resolution = models.PositiveIntegerField()
+    bucket = models.DateTimeField()
+    count = models.PositiveIntegerField(default=0)
+    failures = models.PositiveIntegerField(default=0)
+    duration_sum = models.FloatField(default=0)
+    duration_min = models.FloatField(blank=True, null=True)
+    duration_max = models.FloatField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['monitor', 'resolution', 'bucket'], name='rollup_unique_bucket'),
+        ]
+
+
+class SpecVersion(models.Model):
+    """
+    Version de la spec d'un projet. Chaque version (sauf la première) garde son delta structurel depuis la
+    précédente ; seules certaines gardent aussi l'instantané complet (tous les SPEC_SNAPSHOT_INTERVAL versions).
+    """
+    project = models.ForeignKey(SwaggerProject, on_delete=models.CASCADE, related_name='spec_versions')
+    number = models.PositiveIntegerField()
+    snapshot_blob = models.ForeignKey(SpecBlob, blank=True, null=True, on_delete=models.PROTECT, related_name='+')
+    delta_blob = models.ForeignKey(SpecBlob, blank=True, null=True, on_delete=models.PROTECT, related_name='+')
+    endpoint_count = models.PositiveIntegerField(default=0)
+    added = models.PositiveIntegerField(default=0)
+    removed = models.PositiveIntegerField(default=0)
+    changed = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'number'], name='specversion_unique_number'),
+        ]
+
+    def __str__(self):
+        return f"{self.project_id} v{self.number}"
+
+
+class GoldenResponse(models.Model):
+    """
+    Réponse de référence d'un endpoint pour un jeu de paramètres donné (params_hash).
+    Les nouvelles réponses lui sont comparées structurellement, hors chemins ignorés (champs volatils).
+    """
+    project = models.ForeignKey(SwaggerProject, on_delete=models.CASCADE, related_name='goldens')
+    method = models.CharField(max_length=10)
+    endpoint = models.CharField(max_length=500)
+    params_hash = models.CharField(max_length=32)
+    parameters = models.JSONField(default=dict)
+    status_code = models.PositiveSmallIntegerField()
+    body_blob = models.ForeignKey(SpecBlob, on_delete=models.PROTECT, related_name='+')
+    ignore_paths = models.JSONField(default=list, blank=True)  # ex. ["$..updated_at", "$.data[*].id"]
+    recorded_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'method', 'endpoint', 'params_hash'], name='golden_unique_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.method} {self.endpoint} [{self.params_hash[:8]}]"
+
+
+class AuthProfile(models.Model):
+    """
+    Authentification des requêtes de test d'un projet, injectée dans toutes les requêtes sortantes (auth.py).
+    Seuls les champs du type choisi sont utilisés.
+    """
+    KINDS = [
+        ('bearer', 'Bearer token'),
+        ('api_key', 'API key'),
+        ('basic', 'HTTP Basic'),
+        ('oauth2_client_credentials', 'OAuth2 client credentials'),
+    ]
+    API_KEY_LOCATIONS = [('header', 'Header'), ('query', 'Query')]
+
+    project = models.OneToOneField(SwaggerProject, on_delete=models.CASCADE, related_name='auth_profile')
+    kind = models.CharField(max_length=32, choices=KINDS)
+    enabled = models.BooleanField(default=True)
+    token = models.TextField(blank=True, default='')
+    api_key = models.CharField(max_length=500, blank=True, default='')
+    api_key_name = models.CharField(max_length=100, blank=True, default='X-API-Key')
+    api_key_location = models.CharField(max_length=10, choices=API_KEY_LOCATIONS, default='header')
+    username = models.CharField(max_length=255, blank=True, default='')
+    password = models.CharField(max_length=255, blank=True, default='')
+    token_url = models.URLField(blank=True, default='')
+    client_id = models.CharField(max_length=255, blank=True, default='')
+    client_secret = models.CharField(max_length=500, blank=True, default='')
+    scope = models.CharField(max_length=500, blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.project_id} ({self.kind})"
@@ -0,0 +1,209 @@
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import Greatest, Least
+from django.utils import timezone
+
+from .models import CheckResult, CheckRollup, Monitor
+from .runner import executer_test
+
+# Résolutions des agrégats (secondes) et nom de leur durée de conservation dans MONITOR_RETENTION_DAYS
+RESOLUTIONS = {60: '1m', 3600: '1h'}
+RETENTION_JOURS = {'raw': 2, '1m': 30, '1h': 400}
+
+logger = logging.getLogger(__name__)
+
+
+def retention_jours(niveau):
+    return getattr(settings, "MONITOR_RETENTION_DAYS", {}).get(niveau, RETENTION_JOURS[niveau])
+
+
+def debut_fenetre(instant, resolution):
+    secondes = int(instant.timestamp()) // resolution * resolution
+    return datetime.fromtimestamp(secondes, tz=dt_timezone.utc)
+
+
+def payload_endpoint(endpoint):
+    """Requête d'un Endpoint catalogué : les valeurs pré-remplies de la page de test."""
+    return {
+        'method': endpoint.method,
+        'url': endpoint.cleaned_url or endpoint.url_complete,
+        'params': endpoint.query_params or {},
+        'path_vars': endpoint.path_variables or {},
+        'body': endpoint.request_body or {},
+        'headers': endpoint.headers or {},
+    }
+
+
+# ✅ Écriture d'une mesure : ligne brute + agrégats 1 min et 1 h mis à jour au fil de l'eau
+def enregistrer(monitor_id, instant, ok, status_code, duree_ms):
+    CheckResult.objects.create(monitor_id=monitor_id, checked_at=instant, ok=ok,
+                               status_code=status_code, duration_ms=duree_ms)
+    duree = Value(float(duree_ms), output_field=FloatField())
+    for resolution in RESOLUTIONS:
+        fenetre = {'monitor_id': monitor_id, 'resolution': resolution, 'bucket': debut_fenetre(instant, resolution)}
+        increments = {
+            'count': F('count') + 1,
+            'failures': F('failures') + (0 if ok else 1),
+            'duration_sum': F('duration_sum') + duree_ms,
+            'duration_min': Least('duration_min', duree),
+            'duration_max': Greatest('duration_max', duree),
+        }
+        if CheckRollup.objects.filter(**fenetre).update(**increments):
+            continue
+        try:
+            with transaction.atomic():
+                CheckRollup.objects.create(**fenetre, count=1, failures=0 if ok else 1, duration_sum=duree_ms,
+                                           duration_min=duree_ms, duration_max=duree_ms)
+        except IntegrityError:  # fenêtre créée entre-temps par un autre processus
+            CheckRollup.objects.filter(**fenetre).update(**increments)
+
+
+def controler(monitor):
+    """Exécute le contrôle d'un monitor (même logique d'envoi que test_endpoint) et enregistre la mesure."""
+    endpoint = monitor.endpoint
+    instant = timezone.now()
+    entry = executer_test(timeout=monitor.timeout, projet_id=endpoint.project_id, historiser=False,
+                          contexte={'source': 'monitor', 'monitor_id': monitor.pk}, **payload_endpoint(endpoint))
+    erreur = 'erreur' in entry
+    if monitor.expect_status:
+        ok = not erreur and entry['status_code'] == monitor.expect_status
+    else:
+        ok = not erreur and 200 <= entry['status_code'] <= 299
+    enregistrer(monitor.pk, instant, ok, None if erreur else entry['status_code'], entry['duree_ms'])
+    return ok
+
+
+# ✅ Rétention : purge des mesures brutes et des agrégats trop anciens
+def purger(maintenant=None):
+    maintenant = maintenant or timezone.now()
+    supprimes = {'raw': CheckResult.objects.filter(
+        checked_at__lt=maintenant - timedelta(days=retention_jours('raw'))).delete()[0]}
+    for resolution, niveau in RESOLUTIONS.items():
+        supprimes[niveau] = CheckRollup.objects.filter(
+            resolution=resolution, bucket__lt=maintenant - timedelta(days=retention_jours(niveau))
+        ).delete()[0]
+    return supprimes
+
+
+def resolution_pour(duree):
+    """Mesures brutes sur 2 h, agrégats 1 min jusqu'à 2 jours, 1 h au-delà : ~120 à ~2000 points par série."""
+    if duree <= timedelta(hours=2):
+        return 0
+    return 60 if duree <= timedelta(days=2) else 3600
+
+
+# ✅ Série temporelle d'un monitor pour les tableaux de bord
+def serie(monitor, depuis, jusqua=None, resolution=None):
+    jusqua = jusqua or timezone.now()
+    resolution = resolution_pour(jusqua - depuis) if resolution is None else resolution
+    if resolution == 0:
+        points = [
+            {'t': t, 'count': 1, 'failures': int(not ok), 'avg_ms': d, 'min_ms': d, 'max_ms': d}
+            for t, ok, d in monitor.checks.filter(checked_at__gte=depuis, checked_at__lt=jusqua)
+            .order_by('checked_at').values_list('checked_at', 'ok', 'duration_ms')
+        ]
+    else:
+        points = [
+            {'t': t, 'count': n, 'failures': f, 'avg_ms': round(s / n, 2) if n else None, 'min_ms': mn, 'max_ms': mx}
+            for t, n, f, s, mn, mx in monitor.rollups.filter(resolution=resolution, bucket__gte=debut_fenetre(depuis, resolution),
+                                                              bucket__lt=jusqua)
+            .order_by('bucket').values_list('bucket', 'count', 'failures', 'duration_sum', 'duration_min', 'duration_max')
+        ]
+    total = sum(p['count'] for p in points)
+    echecs = sum(p['failures'] for p in points)
+    return {
+        'monitor': monitor.pk,
+        'resolution': resolution,
+        'availability': round(1 - echecs / total, 4) if total else None,
+        'points': points,
+    }
+
+
+class Ordonnanceur:
+    """
+    Planificateur des monitors : à chaque tour, les monitors dus sont réclamés (UPDATE conditionnel sur
+    next_run_at, sûr entre plusieurs processus) puis contrôlés dans un pool de threads.
+    - gigue : ±MONITOR_JITTER de l'intervalle, pour étaler les contrôles de même période ;
+    - exécutions manquées (arrêt, surcharge) : comptées, sans rattrapage en rafale ;
+    - au plus MONITOR_PROJECT_CONCURRENCY contrôles simultanés par projet (les autres attendent le tour suivant).
+    """
+
+    def __init__(self, concurrence=None, par_projet=None, gigue=None):
+        self.concurrence = concurrence or getattr(settings, "MONITOR_CONCURRENCY", 16)
+        self.par_projet = par_projet or getattr(settings, "MONITOR_PROJECT_CONCURRENCY", 4)
+        self.gigue = getattr(settings, "MONITOR_JITTER", 0.1) if gigue is None else gigue
+        self.en_cours = Counter()
+        self._verrou = threading.Lock()
+
+    def prochaine_execution(self, monitor, maintenant):
+        """Retourne (prochaine exécution, nombre d'exécutions manquées depuis la date prévue)."""
+        intervalle = timedelta(seconds=monitor.interval_seconds)
+        prevu = monitor.next_run_at or maintenant
+        manquees = int((maintenant - prevu) / intervalle) if maintenant > prevu else 0
+        suivante = prevu + intervalle * (manquees + 1)
+        return suivante + timedelta(seconds=random.uniform(-self.gigue, self.gigue) * monitor.interval_seconds), manquees
+
+    def reclamer(self, monitor, maintenant):
+        suivante, manquees = self.prochaine_execution(monitor, maintenant)
+        return Monitor.objects.filter(pk=monitor.pk, next_run_at=monitor.next_run_at).update(
+            next_run_at=suivante, last_run_at=maintenant, missed_runs=F('missed_runs') + manquees,
+        ) == 1
+
+    def _controler(self, monitor, projet_id):
+        """Contrôle exécuté dans le pool : une exception est journalisée et comptée comme un échec."""
+        instant, debut = timezone.now(), time.perf_counter()
+        try:
+            close_old_connections()
+            controler(monitor)
+        except Exception:
+            logger.exception("Échec du contrôle du monitor %s", monitor.pk)
+            try:
+                enregistrer(monitor.pk, instant, False, None, (time.perf_counter() - debut) * 1000)
+            except Exception:
+                logger.exception("Mesure en échec non enregistrée pour le monitor %s", monitor.pk)
+        finally:
+            with self._verrou:
+                self.en_cours[projet_id] -= 1
+
+    def tour(self, executor, maintenant=None):
+        """Lance les monitors dus ; retourne le nombre de contrôles démarrés."""
+        maintenant = maintenant or timezone.now()
+        dus = (Monitor.objects.filter(enabled=True)
+               .filter(Q(next_run_at__lte=maintenant) | Q(next_run_at__isnull=True))
+               .select_related('endpoint').order_by(F('next_run_at').asc(nulls_first=True))[:self.concurrence * 4])
+        lances = 0
+        for monitor in dus:
+            projet_id = monitor.endpoint.project_id
+            with self._verrou:
+                if sum(self.en_cours.values()) >= self.concurrence:
+                    break
+                if self.en_cours[projet_id] >= self.par_projet:
+                    continue
+            if not self.reclamer(monitor, maintenant):
+                continue  # réclamé par un autre processus
+            with self._verrou:
+                self.en_cours[projet_id] += 1
+            executor.submit(self._controler, monitor, projet_id)
+            lances += 1
+        return lances
+
+    def executer(self, arret=None, tick_s=1.0, purge_s=3600):
+        arret = arret or threading.Event()
+        derniere_purge = 0.0
+        with ThreadPoolExecutor(max_workers=self.concurrence) as executor:
+            while not arret.is_set():
+                self.tour(executor)
+                if time.monotonic() - derniere_purge >= purge_s:
+                    purger()
+                    derniere_purge = time.monotonic()
+                arret.wait(tick_s)
@@ -0,0 +1,239 @@
+import json
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .jsonpath import JSONPathInvalide, compiler_jsonpath
+from .runner import executer_test, preparer_payload, url_base_projet
+
+_RE_VARIABLE = re.compile(r"\{\{\s*([\w.-]+)\s*\}\}")
+CHAMPS_REQUETE = ("params", "path_vars", "body", "headers")
+
+
+class PlanInvalide(ValueError):
+    pass
+
+
+class ValeurAbsente(LookupError):
+    pass
+
+
+def _descendre(noeud, cle):
+    pile = [noeud]
+    while pile:
+        courant = pile.pop()
+        if isinstance(courant, dict):
+            if cle in courant:
+                yield courant[cle]
+            pile.extend(reversed(list(courant.values())))
+        elif isinstance(courant, list):
+            pile.extend(reversed(courant))
+
+
+def extraire(document, expression):
+    """
+    Valeur désignée par `expression` dans `document`.
+    Chemin défini ($.data.id) : la valeur ; avec [*] ou .. : la liste des correspondances.
+    """
+    operations = compiler_jsonpath(expression)
+    noeuds = [document]
+    for operation, argument in operations:
+        suivants = []
+        for noeud in noeuds:
+            if operation == "cle" and isinstance(noeud, dict) and argument in noeud:
+                suivants.append(noeud[argument])
+            elif operation == "index" and isinstance(noeud, list) and -len(noeud) <= argument < len(noeud):
+                suivants.append(noeud[argument])
+            elif operation == "tout":
+                suivants.extend(noeud.values() if isinstance(noeud, dict) else noeud if isinstance(noeud, list) else [])
+            elif operation == "descente":
+                suivants.extend(_descendre(noeud, argument))
+        noeuds = suivants
+
+    if any(operation in ("tout", "descente") for operation, _ in operations):
+        return noeuds
+    if not noeuds:
+        raise ValeurAbsente(f"{expression} absent de la réponse")
+    return noeuds[0]
+
+
+# ✅ Gabarits {{variable}} dans les chemins, paramètres, corps et en-têtes
+def substituer(valeur, variables):
+    """"{{id}}" seul garde le type de la variable ; inclus dans un texte, il est converti en chaîne."""
+    if isinstance(valeur, str):
+        seule = _RE_VARIABLE.fullmatch(valeur.strip())
+        if seule:
+            return variables[seule.group(1)]
+        return _RE_VARIABLE.sub(lambda m: str(variables[m.group(1)]), valeur)
+    if isinstance(valeur, dict):
+        return {k: substituer(v, variables) for k, v in valeur.items()}
+    if isinstance(valeur, list):
+        return [substituer(v, variables) for v in valeur]
+    return valeur
+
+
+def variables_utilisees(etape):
+    texte = json.dumps([etape.get("endpoint", "")] + [etape.get(champ, {}) for champ in CHAMPS_REQUETE])
+    return set(_RE_VARIABLE.findall(texte))
+
+
+# ✅ Validation du plan : identifiants, dépendances explicites et implicites (variables), absence de cycle
+def verifier_plan(etapes, variables_initiales=None):
+    """Retourne {id étape: set(ids des étapes dont elle dépend)} ou lève PlanInvalide."""
+    if not isinstance(etapes, list) or not etapes:
+        raise PlanInvalide("Le plan doit contenir au moins une étape.")
+
+    if not all(isinstance(etape, dict) for etape in etapes):
+        raise PlanInvalide("Chaque étape doit être un objet.")
+    ids = [etape.get("id") for etape in etapes]
+    if any(not isinstance(i, str) or not i for i in ids) or len(set(ids)) != len(ids):
+        raise PlanInvalide("Chaque étape doit avoir un identifiant unique (id).")
+    for etape in etapes:
+        if not etape.get("method") or not etape.get("endpoint"):
+            raise PlanInvalide(f"Étape {etape['id']} : method et endpoint sont requis.")
+        if not isinstance(etape.get("extract") or {}, dict):
+            raise PlanInvalide(f"Étape {etape['id']} : extract doit être un objet {{variable: JSONPath}}.")
+        depends_on = etape.get("depends_on") or []
+        if not isinstance(depends_on, list) or not all(isinstance(d, str) for d in depends_on):
+            raise PlanInvalide(f"Étape {etape['id']} : depends_on doit être une liste d'identifiants d'étapes.")
+        for expression in (etape.get("extract") or {}).values():
+            try:
+                compiler_jsonpath(expression)
+            except JSONPathInvalide as e:
+                raise PlanInvalide(f"Étape {etape['id']} : {e}")
+
+    producteurs = {}
+    for etape in etapes:
+        for variable in etape.get("extract") or {}:
+            if variable in producteurs:
+                raise PlanInvalide(f"Variable {variable} extraite par plusieurs étapes.")
+            producteurs[variable] = etape["id"]
+
+    dependances = {}
+    for etape in etapes:
+        deps = set(etape.get("depends_on") or [])
+        inconnues = deps - set(ids)
+        if inconnues:
+            raise PlanInvalide(f"Étape {etape['id']} : dépendances inconnues {sorted(inconnues)}.")
+        for variable in variables_utilisees(etape):
+            if variable in producteurs:
+                deps.add(producteurs[variable])
+            elif variable not in (variables_initiales or {}):
+                raise PlanInvalide(f"Étape {etape['id']} : variable {{{{{variable}}}}} jamais extraite.")
+        dependances[etape["id"]] = deps
+
+    # Tri topologique (Kahn) pour détecter les cycles
+    restants = {i: set(d) for i, d in dependances.items()}
+    prets = [i for i, d in restants.items() if not d]
+    while prets:
+        courant = prets.pop()
+        del restants[courant]
+        for i, d in restants.items():
+            if courant in d:
+                d.discard(courant)
+                if not d:
+                    prets.append(i)
+    if restants:
+        raise PlanInvalide(f"Cycle de dépendances entre les étapes {sorted(restants)}.")
+    return dependances
+
+
+def _executer_etape(etape, modele, base_url, variables, timeout, contexte, projet_id, debut_plan):
+    debut_ms = round((time.perf_counter() - debut_plan) * 1000, 2)
+    payload = preparer_payload(modele or {"method": etape["method"], "endpoint": etape["endpoint"]}, base_url)
+    payload["url"] = f"{base_url.rstrip('/')}{substituer(etape['endpoint'], variables)}"
+    for champ in CHAMPS_REQUETE:
+        payload[champ].update(substituer(etape.get(champ) or {}, variables))
+
+    entry = executer_test(timeout=timeout, contexte=contexte, projet_id=projet_id, **payload)
+    resultat = {
+        "etape": etape["id"],
+        "endpoint": f"{payload['method']} {entry['url']}",
+        "status": entry["test_status"],
+        "status_code": entry["status_code"],
+        "debut_ms": debut_ms,
+        "duree_ms": entry["duree_ms"],
+        "details": entry["response"][:200],
+        "variables": {},
+    }
+    attendu = etape.get("expect_status")
+    if attendu is not None:
+        resultat["status"] = "passed" if entry["status_code"] == attendu else "failed"
+    if resultat["status"] == "failed" or not etape.get("extract"):
+        return resultat
+
+    try:
+        document = json.loads(entry["response"])
+        for variable, expression in etape["extract"].items():
+            resultat["variables"][variable] = extraire(document, expression)
+    except (ValueError, ValeurAbsente) as e:
+        resultat.update({"status": "failed", "erreur": f"Extraction impossible : {e}"})
+    return resultat
+
+
+# ✅ Exécution d'un plan : les branches indépendantes partent en parallèle
+def executer_plan(plan, base_url=None, concurrence=4, timeout=5):
+    """
+    Une étape démarre dès que toutes ses dépendances ont réussi ; si l'une échoue,
+    les étapes qui en dépendent (directement ou non) sont marquées "skipped".
+    """
+    projet = plan.project
+    base_url = base_url or url_base_projet(projet)
+    dependances = verifier_plan(plan.steps, plan.variables)
+    etapes = {etape["id"]: etape for etape in plan.steps}
+    catalogue = {(ep.get("method", "GET").upper(), ep.get("endpoint")): ep for ep in projet.swagger_json or []}
+
+    variables = dict(plan.variables or {})
+    resultats, echouees = {}, set()
+    restants = {i: set(d) for i, d in dependances.items()}
+    debut = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrence)) as executor:
+        en_cours = {}
+
+        def lancer_pretes():
+            for etape_id in [i for i, d in restants.items() if not d]:
+                del restants[etape_id]
+                etape = etapes[etape_id]
+                modele = catalogue.get((etape["method"].upper(), etape["endpoint"]))
+                contexte = {"source": "plan", "plan_id": plan.pk, "etape": etape_id}
+                futur = executor.submit(_executer_etape, etape, modele, base_url, dict(variables),
+                                        timeout, contexte, projet.pk, debut)
+                en_cours[futur] = etape_id
+
+        lancer_pretes()
+        while en_cours:
+            finis, _ = wait(en_cours, return_when=FIRST_COMPLETED)
+            for futur in finis:
+                etape_id = en_cours.pop(futur)
+                resultat = resultats[etape_id] = futur.result()
+                if resultat["status"] == "failed":
+                    echouees.add(etape_id)
+                    continue
+                variables.update(resultat["variables"])
+                for deps in restants.values():
+                    deps.discard(etape_id)
+
+            # Propagation des échecs aux étapes dépendantes
+            sautees = [i for i, d in restants.items() if d & echouees]
+            while sautees:
+                for etape_id in sautees:
+                    del restants[etape_id]
+                    echouees.add(etape_id)
+                    resultats[etape_id] = {
+                        "etape": etape_id,
+                        "endpoint": f"{etapes[etape_id]['method'].upper()} {etapes[etape_id]['endpoint']}",
+                        "status": "skipped", "status_code": None, "debut_ms": None, "duree_ms": 0,
+                        "details": "Dépendance en échec", "variables": {},
+                    }
+                sautees = [i for i, d in restants.items() if d & echouees]
+            lancer_pretes()
+
+    etapes_resultats = [resultats[etape["id"]] for etape in plan.steps]
+    return {
+        "plan": plan.pk,
+        "name": plan.name,
+        "status": "failed" if echouees else "passed",
+        "duree_ms": round((time.perf_counter() - debut) * 1000, 2),
+        "etapes": etapes_resultats,
+    }
@@ -0,0 +1,247 @@
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+
+import requests
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import Product
+from .ratelimit import planificateur
+
+# Configuration par défaut d'une source (complétée par PRODUCT_SOURCES[nom])
+DEFAUTS_SOURCE = {
+    "pagination": "none",        # none | page | offset | cursor
+    "page_size": 100,
+    "page_param": "page",
+    "size_param": "per_page",
+    "first_page": 1,
+    "offset_param": "offset",
+    "limit_param": "limit",
+    "cursor_param": "cursor",
+    "next_cursor_path": "next_cursor",
+    "items_path": "",            # chemin pointé des produits dans la réponse ("" : la réponse est la liste)
+    "total_path": None,          # nombre total de produits, s'il est annoncé
+    "fields": {"source_id": "id", "title": "title", "price": "price",
+               "description": "description", "category": "category"},
+    "headers": {},
+    "timeout": 10,
+}
+
+CHAMPS_MIS_A_JOUR = ['title', 'price', 'description', 'category', 'fetched_at']
+
+
+class SourceInconnue(LookupError):
+    pass
+
+
+class ErreurCollecte(Exception):
+    pass
+
+
+def config_source(nom):
+    sources = getattr(settings, "PRODUCT_SOURCES", {})
+    if nom not in sources:
+        raise SourceInconnue(f"Source de produits inconnue : {nom}")
+    return {**DEFAUTS_SOURCE, **sources[nom], "fields": {**DEFAUTS_SOURCE["fields"], **sources[nom].get("fields", {})}}
+
+
+def extraire(donnees, chemin):
+    """Valeur au chemin pointé "a.b.c" (None si absente)."""
+    for cle in (chemin.split(".") if chemin else []):
+        if not isinstance(donnees, dict):
+            return None
+        donnees = donnees.get(cle)
+    return donnees
+
+
+# ✅ Normalisation d'un enregistrement brut en Product (None s'il est inexploitable)
+def normaliser(brut, source, champs):
+    source_id, titre = extraire(brut, champs["source_id"]), extraire(brut, champs["title"])
+    try:
+        prix = Decimal(str(extraire(brut, champs["price"]))).quantize(Decimal("0.01"))
+    except (InvalidOperation, ValueError):
+        return None
+    if source_id in (None, "") or not titre or not prix.is_finite() or abs(prix) >= 10 ** 8:
+        return None
+    categorie = extraire(brut, champs["category"])
+    return Product(
+        source=source,
+        source_id=str(source_id),
+        title=str(titre)[:255],
+        price=prix,
+        description=extraire(brut, champs["description"]) or "",
+        category=str(categorie or "")[:255],
+    )
+
+
+class Collecteur:
+    """
+    Collecte d'une source paginée de produits vers Product.
+    - pages téléchargées en parallèle (pagination page / offset), consommées dans l'ordre ;
+      pagination par curseur : la page suivante est téléchargée pendant l'écriture de la courante ;
+    - écriture par lots de PRODUCT_BATCH_SIZE : bulk_create(update_conflicts=True) sur (source, source_id) ;
+    - incremental=True : arrêt à la première page dont tous les produits sont déjà connus
+      (sources triées du plus récent au plus ancien).
+    Les requêtes passent par le planificateur (limites par hôte, Retry-After, nouvel essai sur 429).
+    """
+
+    def __init__(self, nom, concurrence=None, taille_lot=None, incremental=False, max_pages=None, canal=None):
+        self.nom = nom
+        self.config = config_source(nom)
+        self.concurrence = max(1, concurrence or getattr(settings, "PRODUCT_CRAWL_CONCURRENCY", 8))
+        self.taille_lot = taille_lot or getattr(settings, "PRODUCT_BATCH_SIZE", 1000)
+        self.incremental = incremental
+        self.max_pages = max_pages
+        self.canal = canal
+        self.session = requests.Session()
+        self.tampon = {}
+        self.stats = {"source": nom, "pages": 0, "recus": 0, "ecrits": 0, "rejetes": 0, "arret": "fin"}
+
+    # ✅ Téléchargement d'une page (threads du pool : aucun accès à la base)
+    def page(self, numero=0, curseur=None):
+        """Retourne (produits bruts, curseur suivant, total annoncé)."""
+        config = self.config
+        params = {}
+        if config["pagination"] == "page":
+            params = {config["page_param"]: config["first_page"] + numero, config["size_param"]: config["page_size"]}
+        elif config["pagination"] == "offset":
+            params = {config["offset_param"]: numero * config["page_size"], config["limit_param"]: config["page_size"]}
+        elif config["pagination"] == "cursor":
+            params = {config["limit_param"]: config["page_size"], **({config["cursor_param"]: curseur} if curseur else {})}
+
+        try:
+            resp, _ = planificateur.envoyer(config["url"], lambda: self.session.get(
+                config["url"], params=params, headers=config["headers"], timeout=config["timeout"]))
+        except requests.RequestException as e:
+            raise ErreurCollecte(f"{config['url']} (page {numero}) : {e}")
+        if resp.status_code != 200:
+            raise ErreurCollecte(f"{config['url']} (page {numero}) : HTTP {resp.status_code}")
+        try:
+            donnees = resp.json()
+        except ValueError:
+            raise ErreurCollecte(f"{config['url']} (page {numero}) : réponse non JSON")
+        produits = extraire(donnees, config["items_path"]) if config["items_path"] else donnees
+        if not isinstance(produits, list):
+            raise ErreurCollecte(f"{config['url']} : liste de produits introuvable ({config['items_path'] or 'racine'})")
+        total = extraire(donnees, config["total_path"]) if config["total_path"] else None
+        if total is not None:
+            try:
+                total = int(total)
+            except (TypeError, ValueError):
+                raise ErreurCollecte(f"{config['url']} : total non numérique ({config['total_path']} = {total!r})")
+        suivant = extraire(donnees, config["next_cursor_path"]) if config["pagination"] == "cursor" else None
+        return produits, suivant, total
+
+    def vider(self):
+        if not self.tampon:
+            return
+        objets = list(self.tampon.values())
+        self.tampon = {}
+        # MySQL : ON DUPLICATE KEY UPDATE, sans cible explicite
+        cible = ['source', 'source_id'] if connection.features.supports_update_conflicts_with_target else None
+        Product.objects.bulk_create(objets, batch_size=self.taille_lot, update_conflicts=True,
+                                    unique_fields=cible, update_fields=CHAMPS_MIS_A_JOUR)
+        self.stats["ecrits"] += len(objets)
+        if self.canal:
+            self.canal.publier("lot", {k: self.stats[k] for k in ("pages", "recus", "ecrits", "rejetes")})
+
+    def ingerer(self, bruts):
+        """Normalise et met en tampon une page ; retourne (produits valides, produits encore inconnus en base)."""
+        self.stats["pages"] += 1
+        self.stats["recus"] += len(bruts)
+        produits = {}
+        for brut in bruts:
+            produit = normaliser(brut, self.nom, self.config["fields"]) if isinstance(brut, dict) else None
+            if produit is None:
+                self.stats["rejetes"] += 1
+            else:
+                produits[produit.source_id] = produit  # doublon dans la page : le dernier l'emporte
+        nouveaux = len(produits)
+        if self.incremental and produits:
+            nouveaux -= Product.objects.filter(source=self.nom, source_id__in=list(produits)).count()
+        self.tampon.update(produits)
+        if len(self.tampon) >= self.taille_lot:
+            self.vider()
+        return len(produits), nouveaux
+
+    def _deja_vu(self, valides, nouveaux):
+        # Page sans aucun produit exploitable : rien n'a été « vu », la collecte continue
+        if self.incremental and valides and nouveaux == 0:
+            self.stats["arret"] = "deja_vu"
+            return True
+        return False
+
+    def _pages_numerotees(self, executor):
+        taille = self.config["page_size"]
+        fin_source = math.inf  # première page au-delà de la dernière (total annoncé ou page incomplète)
+        en_cours, suivante, prochaine = {}, 0, 0
+
+        def limite():
+            return min(fin_source, self.max_pages if self.max_pages is not None else math.inf)
+
+        def soumettre():
+            nonlocal suivante
+            while len(en_cours) < self.concurrence * 2 and suivante < limite():
+                en_cours[suivante] = executor.submit(self.page, suivante)
+                suivante += 1
+
+        try:
+            soumettre()
+            while prochaine in en_cours and prochaine < limite():
+                bruts, _, total = en_cours.pop(prochaine).result()
+                if total is not None:
+                    fin_source = min(fin_source, math.ceil(total / taille))
+                if len(bruts) < taille:
+                    fin_source = min(fin_source, prochaine + 1)
+                if self._deja_vu(*self.ingerer(bruts)):
+                    return
+                prochaine += 1
+                soumettre()
+            if prochaine < fin_source:
+                self.stats["arret"] = "max_pages"
+        finally:
+            for futur in en_cours.values():  # pages au-delà de la fin ou de l'arrêt
+                futur.cancel()
+
+    def _pages_curseur(self, executor):
+        futur, numero = executor.submit(self.page, 0, None), 0
+        while futur is not None:
+            bruts, curseur, _ = futur.result()
+            numero += 1
+            fin = not curseur or not bruts or (self.max_pages is not None and numero >= self.max_pages)
+            futur = None if fin else executor.submit(self.page, numero, curseur)  # préchargement
+            if self._deja_vu(*self.ingerer(bruts)):
+                if futur:
+                    futur.cancel()
+                return
+            if fin and curseur and bruts:
+                self.stats["arret"] = "max_pages"
+
+    # ✅ Collecte complète
+    def executer(self):
+        debut = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrence) as executor:
+            if self.config["pagination"] in ("page", "offset"):
+                self._pages_numerotees(executor)
+            elif self.config["pagination"] == "cursor":
+                self._pages_curseur(executor)
+            else:
+                self.ingerer(self.page()[0])
+        self.vider()
+        duree = time.perf_counter() - debut
+        self.stats.update(duree_s=round(duree, 3),
+                          debit_par_s=round(self.stats["ecrits"] / duree, 1) if duree else None)
+        return self.stats
+
+
+def collecter_produits(nom, **options):
+    return Collecteur(nom, **options).executer()
+
+
+# ✅ Collecte en arrière-plan (API) : un événement "lot" par écriture, "fin" avec le bilan
+def collecte_en_direct(canal, nom, **options):
+    canal.publier("debut", {"source": nom, "debut": timezone.now().isoformat()})
+    canal.terminer("fin", Collecteur(nom, canal=canal, **options).executer())
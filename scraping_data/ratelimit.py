@@ -0,0 +1,231 @@
+import threading
+import time
+from collections.abc import Mapping
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+# Plafond des attentes imposées par un serveur (Retry-After, X-RateLimit-Reset)
+ATTENTE_MAX_S = 60.0
+FENETRE_BAISSE_S = 1.0
+
+
+class AttenteExcessive(Exception):
+    """Envoi refusé : l'attente imposée par les limites dépasse celle que l'appelant accepte (testeur interactif)."""
+
+    def __init__(self, attente):
+        super().__init__(f"Limite de débit atteinte : nouvel essai possible dans {attente:.1f} s")
+        self.attente = attente
+
+
+class SeauJetons:
+    """
+    Seau à jetons thread-safe. `debit` en requêtes/s ; None = illimité (seules les pauses s'appliquent).
+    Chaque appel à reserver() consomme un jeton, éventuellement à crédit : l'appelant attend le délai retourné.
+    """
+
+    def __init__(self, debit=None, capacite=None):
+        self.debit_max = debit
+        self.debit = debit
+        self.capacite = capacite or max(1.0, debit or 1.0)
+        self.jetons = self.capacite
+        self.maj = time.monotonic()
+        self.bloque_jusqua = 0.0
+        self._verrou = threading.Lock()
+
+    def reserver(self):
+        with self._verrou:
+            maintenant = time.monotonic()
+            attente = max(0.0, self.bloque_jusqua - maintenant)
+            if self.debit:
+                self.jetons = min(self.capacite, self.jetons + max(0.0, maintenant - self.maj) * self.debit)
+                self.maj = max(self.maj, maintenant)
+                self.jetons -= 1
+                if self.jetons < 0:
+                    attente = max(attente, -self.jetons / self.debit)
+            return attente
+
+    def rendre(self):
+        """Jeton réservé mais pas utilisé (envoi abandonné)."""
+        with self._verrou:
+            if self.debit:
+                self.jetons = min(self.capacite, self.jetons + 1)
+
+    def bloquer(self, secondes):
+        """Pause imposée par le serveur : aucun envoi avant `secondes`, puis reprise sans rafale."""
+        with self._verrou:
+            fin = time.monotonic() + min(secondes, ATTENTE_MAX_S)
+            self.bloque_jusqua = max(self.bloque_jusqua, fin)
+            self.jetons = min(self.jetons, 0.0)
+            self.maj = max(self.maj, self.bloque_jusqua)
+
+    def synchroniser(self, restants, reinitialisation_s):
+        """Aligne le seau sur le quota annoncé (X-RateLimit-Remaining / Reset)."""
+        if restants <= 0:
+            self.bloquer(reinitialisation_s)
+            return
+        with self._verrou:
+            debit = restants / max(reinitialisation_s, 1.0)
+            self.debit = min(debit, self.debit_max) if self.debit_max else debit
+            self.capacite = max(1.0, float(restants))
+            self.jetons = float(restants)  # le serveur fait foi (écart borné par la concurrence)
+            self.maj = max(self.maj, time.monotonic())
+
+
+class ConcurrenceAdaptative:
+    """
+    Nombre de requêtes simultanées vers un hôte, ajusté en AIMD :
+    +1 par « aller-retour » réussi (1/limite par réponse), division par 2 sur un 429 (une fois par fenêtre).
+    """
+
+    def __init__(self, initiale=4, minimum=1, maximum=32):
+        self.limite = float(min(initiale, maximum))
+        self.minimum = minimum
+        self.maximum = maximum
+        self.en_cours = 0
+        self._derniere_baisse = 0.0
+        self._condition = threading.Condition()
+
+    def acquerir(self):
+        with self._condition:
+            while self.en_cours >= int(self.limite):
+                self._condition.wait()
+            self.en_cours += 1
+
+    def liberer(self, limite_atteinte=False):
+        with self._condition:
+            self.en_cours -= 1
+            if limite_atteinte:
+                maintenant = time.monotonic()
+                if maintenant - self._derniere_baisse >= FENETRE_BAISSE_S:
+                    self.limite = max(float(self.minimum), self.limite / 2)
+                    self._derniere_baisse = maintenant
+            else:
+                self.limite = min(float(self.maximum), self.limite + 1 / self.limite)
+            self._condition.notify_all()
+
+
+def _nombre(valeur):
+    try:
+        return float(valeur)
+    except (TypeError, ValueError):
+        return None
+
+
+def delai_retry_after(valeur):
+    """Retry-After : nombre de secondes ou date HTTP."""
+    secondes = _nombre(valeur)
+    if secondes is not None:
+        return max(0.0, secondes)
+    try:
+        return max(0.0, parsedate_to_datetime(valeur).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _entete(headers, *noms):
+    for nom in noms:
+        if headers.get(nom) is not None:
+            return headers.get(nom)
+    return None
+
+
+class Planificateur:
+    """
+    Point de passage unique des requêtes de test sortantes : seau par hôte, seau par projet,
+    concurrence adaptative par hôte, respect de Retry-After / X-RateLimit-* et nouvel essai sur 429.
+    """
+
+    def __init__(self):
+        self._verrou = threading.Lock()
+        self._seaux = {}
+        self._concurrences = {}
+
+    def _seau(self, cle, debit):
+        with self._verrou:
+            if cle not in self._seaux:
+                self._seaux[cle] = SeauJetons(debit)
+            return self._seaux[cle]
+
+    def seau_hote(self, hote):
+        debit = getattr(settings, "RATE_LIMIT_HOSTS", {}).get(hote, getattr(settings, "RATE_LIMIT_HOST_RPS", None))
+        return self._seau(("hote", hote), debit)
+
+    def seau_projet(self, projet_id):
+        return self._seau(("projet", projet_id), getattr(settings, "RATE_LIMIT_PROJECT_RPS", None))
+
+    def concurrence(self, hote):
+        with self._verrou:
+            if hote not in self._concurrences:
+                maximum = getattr(settings, "RATE_LIMIT_MAX_CONCURRENCY", 32)
+                # Départ optimiste : la concurrence ne baisse qu'une fois la limite du serveur atteinte
+                self._concurrences[hote] = ConcurrenceAdaptative(initiale=maximum, maximum=maximum)
+            return self._concurrences[hote]
+
+    def observer(self, reponse, seau, tentative):
+        """Applique les en-têtes de limitation d'une réponse ; retourne True si la requête doit être rejouée."""
+        headers = getattr(reponse, "headers", None)
+        headers = headers if isinstance(headers, Mapping) else {}
+
+        restants = _nombre(_entete(headers, "X-RateLimit-Remaining", "RateLimit-Remaining"))
+        reset = _nombre(_entete(headers, "X-RateLimit-Reset", "RateLimit-Reset"))
+        if restants is not None and reset is not None:
+            if reset > 1e9:  # horodatage epoch plutôt qu'un délai
+                reset = max(0.0, reset - time.time())
+            seau.synchroniser(int(restants), reset)
+
+        limite = reponse.status_code == 429
+        retry_after = delai_retry_after(headers.get("Retry-After")) if headers.get("Retry-After") else None
+        if retry_after is not None and (limite or reponse.status_code == 503):
+            seau.bloquer(retry_after)
+            return True
+        if limite:
+            seau.bloquer(0.5 * 2 ** (tentative - 1))  # 429 sans indication : repli exponentiel
+            return True
+        return False
+
+    def envoyer(self, url, envoi, projet_id=None, tentatives=None, attente_max=None):
+        """
+        Appelle `envoi()` (qui émet la requête) en respectant les limites de l'hôte et du projet.
+        Retourne (réponse, nombre de tentatives). Les exceptions réseau sont propagées.
+        attente_max (secondes) : AttenteExcessive plutôt qu'une attente plus longue (appels interactifs).
+        """
+        tentatives = tentatives or getattr(settings, "RATE_LIMIT_RETRIES", 3)
+        hote = urlparse(url).netloc
+        seau = self.seau_hote(hote)
+        seaux = [seau] + ([self.seau_projet(projet_id)] if projet_id is not None else [])
+        concurrence = self.concurrence(hote)
+
+        for tentative in range(1, tentatives + 1):
+            attente = max(s.reserver() for s in seaux)
+            if attente_max is not None and attente > attente_max:
+                for s in seaux:
+                    s.rendre()
+                raise AttenteExcessive(attente)
+            if attente > 0:
+                time.sleep(attente)
+
+            concurrence.acquerir()
+            reponse = None
+            try:
+                reponse = envoi()
+            finally:
+                concurrence.liberer(limite_atteinte=reponse is not None and reponse.status_code == 429)
+
+            if not self.observer(reponse, seau, tentative) or tentative == tentatives:
+                return reponse, tentative
+
+    def etat(self):
+        with self._verrou:
+            return {
+                hote: {
+                    "concurrence": round(c.limite, 2),
+                    "en_cours": c.en_cours,
+                    "debit": self._seaux.get(("hote", hote)).debit if ("hote", hote) in self._seaux else None,
+                }
+                for hote, c in self._concurrences.items()
+            }
+
+
+planificateur = Planificateur()
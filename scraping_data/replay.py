@@ -0,0 +1,188 @@
+import json
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from urllib.parse import parse_qsl, urlparse, urlunparse
+
+from .catalogue import routage
+from .runner import executer_test, url_base_projet
+
+TAILLE_BLOC = 1024 * 1024
+_RE_ENTRIES = re.compile(r'"entries"\s*:\s*\[')
+_DECODEUR = json.JSONDecoder()
+
+# Champs d'une entrée de résultat écrits dans le fichier de sortie (une ligne NDJSON par requête rejouée)
+CHAMPS_SORTIE = ("timestamp", "method", "url", "endpoint_id", "status_code", "test_status", "duree_ms", "erreur")
+
+# En-têtes propres à la capture, jamais rejoués
+ENTETES_IGNORES = {"host", "content-length", "connection", "accept-encoding", "cookie", ":authority",
+                   ":method", ":path", ":scheme"}
+
+
+# ✅ Lecture en flux du tableau log.entries d'un fichier HAR (sans charger le fichier entier)
+def lire_har(fichier, taille_bloc=TAILLE_BLOC):
+    tampon = ""
+    # 1. Recherche du début du tableau "entries"
+    while True:
+        bloc = fichier.read(taille_bloc)
+        if not bloc:
+            return
+        tampon += bloc
+        debut = _RE_ENTRIES.search(tampon)
+        if debut:
+            tampon = tampon[debut.end():]
+            break
+        tampon = tampon[-64:]
+
+    # 2. Décodage des entrées une à une
+    position = 0
+    while True:
+        while position < len(tampon) and tampon[position] in " \t\r\n,":
+            position += 1
+        if position < len(tampon) and tampon[position] == "]":
+            return
+        try:
+            entree, fin = _DECODEUR.raw_decode(tampon, position)
+        except json.JSONDecodeError:
+            bloc = fichier.read(taille_bloc)
+            if not bloc:
+                return
+            tampon = tampon[position:] + bloc
+            position = 0
+            continue
+        yield entree
+        position = fin
+        if position > taille_bloc:
+            tampon, position = tampon[position:], 0
+
+
+# ✅ Lecture NDJSON : une entrée HAR ou {"method", "url", "headers", "body", "timestamp"} par ligne
+def lire_ndjson(fichier):
+    for ligne in fichier:
+        ligne = ligne.strip()
+        if ligne:
+            yield json.loads(ligne)
+
+
+def lire_capture(fichier, format=None):
+    nom = getattr(fichier, "name", "")
+    if format == "ndjson" or (format is None and str(nom).endswith((".ndjson", ".jsonl"))):
+        return lire_ndjson(fichier)
+    return lire_har(fichier)
+
+
+def _horodatage(valeur):
+    if valeur is None:
+        return None
+    if isinstance(valeur, (int, float)):
+        return float(valeur)
+    return datetime.fromisoformat(str(valeur).replace("Z", "+00:00")).timestamp()
+
+
+# ✅ Entrée HAR ou NDJSON -> requête normalisée
+def normaliser(entree):
+    requete = entree.get("request", entree)
+    url = urlparse(requete.get("url", ""))
+
+    headers = requete.get("headers", {})
+    if isinstance(headers, list):  # format HAR : [{"name", "value"}]
+        headers = {h.get("name"): h.get("value") for h in headers}
+    headers = {k: v for k, v in headers.items() if k and k.lower() not in ENTETES_IGNORES}
+
+    body = requete.get("body")
+    post_data = requete.get("postData")
+    if post_data and post_data.get("text"):
+        try:
+            body = json.loads(post_data["text"])
+        except ValueError:
+            body = None
+
+    return {
+        "method": requete.get("method", "GET").upper(),
+        "url": urlunparse(url._replace(query="", fragment="")),
+        "params": dict(parse_qsl(url.query, keep_blank_values=True)),
+        "headers": headers,
+        "body": body if isinstance(body, dict) else {},
+        "debut": _horodatage(entree.get("startedDateTime", entree.get("timestamp"))),
+    }
+
+
+class Rejeu:
+    """
+    Rejoue une capture sur les endpoints d'un projet.
+    mode "fast" : au plus vite ; "original" : avec les écarts d'origine ; "scaled" : écarts divisés par `vitesse`.
+    La concurrence est bornée et le nombre de requêtes en attente aussi (lecture en flux).
+    `sortie` (fichier texte) : chaque résultat y est écrit en NDJSON au lieu d'aller dans l'historique en mémoire.
+    """
+
+    def __init__(self, projet, mode="fast", vitesse=1.0, concurrence=8, base_url=None, timeout=5, sortie=None):
+        self.projet = projet
+        self.mode = mode
+        self.vitesse = vitesse if mode == "scaled" else 1.0
+        self.concurrence = concurrence
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.timeout = timeout
+        self.sortie = sortie
+        self.trie = routage.trie(projet)
+        self.base_path = urlparse(url_base_projet(projet)).path.rstrip("/")
+        self.stats = {"total": 0, "associes": 0, "non_associes": 0, "passed": 0, "failed": 0, "erreurs": 0}
+        self.erreurs = []  # exceptions des workers (au plus 10 messages)
+        self._verrou = threading.Lock()
+
+    def associer(self, requete):
+        chemin = urlparse(requete["url"]).path
+        if not chemin.startswith(self.base_path):
+            return None
+        return self.trie.trouver(requete["method"], chemin[len(self.base_path):])
+
+    def _executer(self, requete, association):
+        url = requete["url"]
+        if self.base_url:
+            url = self.base_url + urlparse(url).path[len(self.base_path):]
+        contexte = {"source": "replay", "endpoint_id": association[0] if association else None}
+        entry = executer_test(requete["method"], url, requete["params"], None, requete["body"],
+                              requete["headers"], timeout=self.timeout, contexte=contexte,
+                              projet_id=self.projet.pk, historiser=self.sortie is None)
+        with self._verrou:
+            self.stats["failed" if entry["test_status"] == "failed" else "passed"] += 1
+            if self.sortie is not None:
+                resultat = {champ: entry[champ] for champ in CHAMPS_SORTIE if champ in entry}
+                self.sortie.write(json.dumps(resultat, ensure_ascii=False, default=str) + "\n")
+
+    def _termine(self, futur):
+        erreur = futur.exception()
+        if erreur is not None:
+            with self._verrou:
+                self.stats["erreurs"] += 1
+                if len(self.erreurs) < 10:
+                    self.erreurs.append(f"{type(erreur).__name__}: {erreur}")
+
+    def executer(self, entrees):
+        places = threading.BoundedSemaphore(self.concurrence * 2)
+        debut_capture = debut_rejeu = None
+        debut = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.concurrence) as executor:
+            for entree in entrees:
+                requete = normaliser(entree)
+                association = self.associer(requete)
+                self.stats["total"] += 1
+                self.stats["associes" if association else "non_associes"] += 1
+
+                if self.mode != "fast" and requete["debut"] is not None:
+                    if debut_capture is None:
+                        debut_capture, debut_rejeu = requete["debut"], time.monotonic()
+                    attente = debut_rejeu + (requete["debut"] - debut_capture) / self.vitesse - time.monotonic()
+                    if attente > 0:
+                        time.sleep(attente)
+
+                places.acquire()
+                futur = executor.submit(self._executer, requete, association)
+                futur.add_done_callback(self._termine)
+                futur.add_done_callback(lambda _: places.release())
+
+        duree = time.perf_counter() - debut
+        return {**self.stats, "messages_erreurs": self.erreurs, "duree_s": round(duree, 3),
+                "debit_rps": round(self.stats["total"] / duree, 2) if duree else 0}
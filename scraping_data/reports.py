@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.utils import timezone
+
+# Un dossier par projet : <version>.json (compact) + index.json
+NOM_INDEX = "index.json"
+TAILLE_CACHE = 16
+
+_verrou_cache = threading.Lock()
+_cache = OrderedDict()  # chemin -> (mtime_ns, données)
+
+
+def dossier_rapports():
+    return Path(getattr(settings, "SWAGGER_REPORTS_DIR", Path(settings.BASE_DIR) / "reports"))
+
+
+# ✅ Clé de rapport pour un scraping sans projet en base : hôte + empreinte de l'URL
+def cle_depuis_url(url):
+    hote = re.sub(r"[^A-Za-z0-9.-]", "_", urlparse(url).netloc or "local")
+    return f"{hote}-{hashlib.sha1(url.encode('utf-8')).hexdigest()[:10]}"
+
+
+def cle_projet(projet_id):
+    return f"projet-{projet_id}"
+
+
+# ✅ Écriture atomique : fichier temporaire dans le même dossier puis os.replace
+def _mode_fichiers():
+    # umask lu une seule fois, à l'import : os.umask() le modifie le temps de la lecture
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+MODE_FICHIERS = _mode_fichiers()
+
+
+def ecrire_atomique(chemin, contenu):
+    chemin = Path(chemin)
+    chemin.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=chemin.parent, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(contenu)
+        os.chmod(tmp, MODE_FICHIERS)  # mkstemp crée en 0600 : mêmes droits qu'un open() classique
+        os.replace(tmp, chemin)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _lister_versions(dossier):
+    return sorted(p.stem for p in dossier.glob("*.json") if p.name != NOM_INDEX and not p.name.startswith("."))
+
+
+def _reconstruire_index(dossier):
+    """
+    Index d'un projet reconstruit depuis le dossier, sans verrou.
+    Si une écriture concurrente a eu lieu entre-temps, l'index est réécrit jusqu'à être à jour.
+    """
+    versions = _lister_versions(dossier)
+    while True:  # l'écrivain dont la vérification passe en dernier laisse un index à jour
+        index = {"versions": versions, "latest": versions[-1] if versions else None}
+        ecrire_atomique(dossier / NOM_INDEX, json.dumps(index).encode("utf-8"))
+        actuelles = _lister_versions(dossier)
+        if actuelles == versions:
+            return index
+        versions = actuelles
+
+
+# ✅ Rétention : seules les SWAGGER_REPORTS_KEEP dernières versions d'une clé sont conservées
+def elaguer(dossier, garder=None):
+    """Supprime les versions les plus anciennes au-delà de `garder` ; retourne les versions supprimées."""
+    garder = garder if garder is not None else getattr(settings, "SWAGGER_REPORTS_KEEP", 20)
+    if not garder:  # 0 ou None : pas de limite
+        return []
+    anciennes = _lister_versions(dossier)[:-garder]
+    for version in anciennes:
+        chemin = dossier / f"{version}.json"
+        chemin.unlink(missing_ok=True)  # déjà supprimée par un élagage concurrent
+        with _verrou_cache:
+            _cache.pop(chemin, None)
+    return anciennes
+
+
+# ✅ Enregistre une nouvelle version du rapport d'un projet
+def ecrire_rapport(cle, data):
+    """
+    Écrit data (liste d'endpoints) dans reports/<cle>/<version>.json en JSON compact.
+    Les versions sont horodatées et uniques : deux scrapings parallèles n'écrivent jamais le même fichier.
+    Les versions au-delà de SWAGGER_REPORTS_KEEP sont ensuite supprimées, des plus anciennes aux plus récentes.
+    """
+    dossier = dossier_rapports() / cle
+    version = f"{timezone.now():%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:6]}"
+    chemin = dossier / f"{version}.json"
+    ecrire_atomique(chemin, json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    elaguer(dossier)
+    _reconstruire_index(dossier)
+    return chemin
+
+
+def _lire_index(dossier):
+    try:
+        return json.loads((dossier / NOM_INDEX).read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return _reconstruire_index(dossier) if dossier.is_dir() else {"versions": [], "latest": None}
+
+
+def chemin_rapport(cle=None, version=None):
+    """Chemin d'un rapport ; sans clé, le plus récent tous projets confondus."""
+    racine = dossier_rapports()
+    if cle is None:
+        candidats = [
+            (index["latest"], d)
+            for d in (racine.iterdir() if racine.is_dir() else [])
+            if d.is_dir() and (index := _lire_index(d))["latest"]
+        ]
+        if not candidats:
+            return None
+        version, dossier = max(candidats)
+    else:
+        dossier = racine / cle
+        version = version or _lire_index(dossier)["latest"]
+        if not version:
+            return None
+
+    chemin = dossier / f"{version}.json"
+    if not chemin.exists():  # index en retard sur une écriture concurrente
+        index = _reconstruire_index(dossier)
+        if not index["latest"]:
+            return None
+        chemin = dossier / f"{index['latest']}.json"
+    return chemin
+
+
+# ✅ Lecture via un cache LRU invalidé par la date de modification du fichier
+def lire_rapport(cle=None, version=None):
+    """Les données retournées sont partagées par le cache : ne pas les modifier."""
+    chemin = chemin_rapport(cle, version)
+    if chemin is None:
+        raise FileNotFoundError("Aucun rapport Swagger disponible.")
+
+    mtime = chemin.stat().st_mtime_ns
+    with _verrou_cache:
+        en_cache = _cache.get(chemin)
+        if en_cache and en_cache[0] == mtime:
+            _cache.move_to_end(chemin)
+            return en_cache[1]
+
+    with open(chemin, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    with _verrou_cache:
+        _cache[chemin] = (mtime, data)
+        _cache.move_to_end(chemin)
+        while len(_cache) > TAILLE_CACHE:
+            _cache.popitem(last=False)
+    return data
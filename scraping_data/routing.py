@@ -0,0 +1,106 @@
+import re
+
+_RE_VARIABLE = re.compile(r"\{([^}/]+)\}")
+
+
+def segments(chemin):
+    return [s for s in chemin.split("/") if s]
+
+
+class _Noeud:
+    __slots__ = ("fixes", "variable", "motifs", "routes")
+
+    def __init__(self):
+        self.fixes = {}       # segment littéral -> _Noeud
+        self.variable = None  # segment {nom} entier -> _Noeud
+        self.motifs = {}      # segment mixte ("{id}.json") -> (regex, _Noeud)
+        self.routes = {}      # method -> (valeur, noms des variables, template)
+
+    def vide(self):
+        return not (self.fixes or self.variable or self.motifs or self.routes)
+
+
+class RoutingTrie:
+    """
+    Trie de templates de chemins (/users/{id}/posts) par segment.
+    La recherche d'un chemin concret coûte O(nombre de segments) ; les segments
+    littéraux sont prioritaires sur les variables, avec retour arrière si besoin.
+    """
+
+    def __init__(self):
+        self.racine = _Noeud()
+        self.taille = 0
+
+    def _enfant(self, noeud, segment, creer):
+        if segment.startswith("{") and segment.endswith("}") and segment.count("{") == 1:
+            if noeud.variable is None and creer:
+                noeud.variable = _Noeud()
+            return noeud.variable
+        if "{" in segment:
+            if segment not in noeud.motifs and creer:
+                morceaux = _RE_VARIABLE.split(segment)
+                regex = "".join("([^/]+?)" if i % 2 else re.escape(m) for i, m in enumerate(morceaux))
+                noeud.motifs[segment] = (re.compile(f"^{regex}$"), _Noeud())
+            return noeud.motifs.get(segment, (None, None))[1]
+        if segment not in noeud.fixes and creer:
+            noeud.fixes[segment] = _Noeud()
+        return noeud.fixes.get(segment)
+
+    def inserer(self, method, template, valeur):
+        noeud = self.racine
+        for segment in segments(template):
+            noeud = self._enfant(noeud, segment, creer=True)
+        if method.upper() not in noeud.routes:
+            self.taille += 1
+        noeud.routes[method.upper()] = (valeur, _RE_VARIABLE.findall(template), template)
+
+    def retirer(self, method, template):
+        chemin = [self.racine]
+        for segment in segments(template):
+            enfant = self._enfant(chemin[-1], segment, creer=False)
+            if enfant is None:
+                return
+            chemin.append(enfant)
+        if chemin[-1].routes.pop(method.upper(), None) is None:
+            return
+        self.taille -= 1
+
+        # Élagage des nœuds devenus vides
+        for parent, noeud, segment in reversed(list(zip(chemin, chemin[1:], segments(template)))):
+            if not noeud.vide():
+                break
+            if parent.variable is noeud:
+                parent.variable = None
+            elif segment in parent.motifs:
+                del parent.motifs[segment]
+            else:
+                parent.fixes.pop(segment, None)
+
+    def _chercher(self, noeud, morceaux, i, captures, method):
+        if i == len(morceaux):
+            route = noeud.routes.get(method)
+            return (route, captures) if route else None
+
+        segment = morceaux[i]
+        enfant = noeud.fixes.get(segment)
+        if enfant is not None:
+            trouve = self._chercher(enfant, morceaux, i + 1, captures, method)
+            if trouve:
+                return trouve
+        for regex, enfant in noeud.motifs.values():
+            correspondance = regex.match(segment)
+            if correspondance:
+                trouve = self._chercher(enfant, morceaux, i + 1, captures + list(correspondance.groups()), method)
+                if trouve:
+                    return trouve
+        if noeud.variable is not None:
+            return self._chercher(noeud.variable, morceaux, i + 1, captures + [segment], method)
+        return None
+
+    def trouver(self, method, chemin):
+        """Retourne (valeur, variables de chemin, template) ou None."""
+        trouve = self._chercher(self.racine, segments(chemin), 0, [], method.upper())
+        if trouve is None:
+            return None
+        (valeur, noms, template), captures = trouve
+        return valeur, dict(zip(noms, captures)), template
@@ -0,0 +1,328 @@
+import time
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+
+import requests
+from django.conf import settings
+from django.utils import timezone
+
+from .auth import gestionnaire_auth
+from .blobstore import lire_blob, stocker_blob
+from .generators import endpoint_fuzz
+from .golden import enregistrer_golden, index_goldens, verifier_golden
+from .http_cache import METHODES_CACHABLES, cache_http, cle_requete
+from .models import SpecBlob
+from .ratelimit import AttenteExcessive, delai_retry_after, planificateur
+from .validation import taux_violations, valider_reponse, validateur_reponse
+
+# 🧾 Historique partagé des tests (vue tester, tests en masse, export JSON) : les TEST_HISTORY_MAX plus récents
+test_history = deque(maxlen=getattr(settings, "TEST_HISTORY_MAX", 1000))
+
+# Au-delà de ce seuil, le corps de réponse est stocké compressé dans le blob store
+SEUIL_BLOB_REPONSE = 64 * 1024
+TAILLE_APERCU = 500
+
+
+# ✅ URL de base d'un projet (même nettoyage que le rapport Swagger)
+def url_base_projet(projet):
+    base_url = projet.swagger_url.rstrip('/')
+    if "/v3/api-docs" in base_url:
+        base_url = base_url.replace("/v3/api-docs", "")
+    return base_url
+
+
+def formater_url(url, path_vars=None):
+    for key, value in (path_vars or {}).items():
+        url = url.replace(f'{{{key}}}', str(value))
+    return url
+
+
+# ✅ Exécution d'une requête de test (logique commune à test_endpoint et aux tests en masse)
+def executer_test(method, url, params=None, path_vars=None, body=None, headers=None, timeout=5, contexte=None,
+                  projet_id=None, historiser=True, cache=False, interactif=False):
+    """
+    Envoie la requête, calcule le statut du test et l'ajoute à l'historique.
+    Retourne l'entrée d'historique ; en cas d'erreur réseau elle contient la clé "erreur".
+    `contexte` (dict) est ajouté tel quel à l'entrée (ex. endpoint_id, source).
+    L'envoi passe par le planificateur (limites par hôte et par projet, nouvel essai sur 429).
+    historiser=False : l'entrée n'est pas ajoutée à l'historique (contrôles périodiques de la supervision).
+    cache=True : GET / HEAD servis par le cache HTTP (fraîcheur, revalidation, requêtes identiques fusionnées) ;
+    l'entrée indique alors "cache" : hit, revalidated, coalesced ou miss.
+    L'authentification du projet (AuthProfile) est injectée sans écraser les en-têtes / paramètres fournis ;
+    elle n'apparaît pas dans l'historique (seul son type, "auth").
+    interactif=True (testeur) : pas de nouvel essai sur 429 et attente des limites bornée à `timeout` ;
+    un 429 est rendu tel quel avec "retry_after" (secondes).
+    """
+    params = params or {}
+    path_vars = path_vars or {}
+    body = body or {}
+    headers = headers or {}
+
+    formatted_url = formater_url(url, path_vars)
+
+    entry = {
+        'timestamp': timezone.now().isoformat(),
+        'method': method,
+        'url': formatted_url,
+        'params': params,
+        'path_vars': path_vars,
+        'body': body,
+        'headers': headers,
+    }
+
+    tentatives = 1
+    limites = {'tentatives': 1, 'attente_max': timeout} if interactif else {}
+
+    def envoyer(entetes_conditionnels=None, rejouer_si_401=True):
+        nonlocal tentatives
+        auth_entetes, auth_params, type_auth = gestionnaire_auth.authentification(projet_id)
+        if type_auth:
+            entry['auth'] = type_auth
+        resp, tentatives = planificateur.envoyer(formatted_url, lambda: requests.request(
+            method,
+            formatted_url,
+            params={**auth_params, **params},
+            json=body if body else None,
+            headers={**auth_entetes, **headers, **(entetes_conditionnels or {})},
+            timeout=timeout
+        ), projet_id=projet_id, **limites)
+        if resp.status_code == 401 and rejouer_si_401 and type_auth == 'oauth2_client_credentials':
+            # Jeton révoqué ou expiré côté serveur : nouveau jeton et un seul nouvel essai
+            gestionnaire_auth.invalider(projet_id, auth_entetes['Authorization'])
+            return envoyer(entetes_conditionnels, rejouer_si_401=False)
+        return resp
+
+    debut = time.perf_counter()
+    try:
+        if cache and method.upper() in METHODES_CACHABLES and not body:
+            cle = cle_requete(method, formatted_url, params, headers, projet_id=projet_id,
+                              auth=gestionnaire_auth.empreinte(projet_id))
+            resp, entry['cache'] = cache_http.obtenir(cle, envoyer, projet_id=projet_id, attente_max_s=timeout * 2)
+        else:
+            resp = envoyer()
+        if tentatives > 1:
+            entry['tentatives'] = tentatives
+
+        if 200 <= resp.status_code <= 299:
+            test_status = "succeeded" if resp.status_code == 201 else "passed"
+        else:
+            test_status = "failed"
+
+        entry.update({
+            'status_code': resp.status_code,
+            'response': resp.text,
+            'test_status': test_status,
+        })
+        retry_after = resp.headers.get('Retry-After') if isinstance(resp.headers, Mapping) else None
+        if resp.status_code == 429 and retry_after:
+            entry['retry_after'] = delai_retry_after(retry_after)
+    except AttenteExcessive as e:
+        # Limite locale (hôte / projet) : requête non envoyée
+        entry.update({
+            'status_code': 429,
+            'response': str(e),
+            'test_status': 'failed',
+            'retry_after': round(e.attente, 1),
+            'limite_locale': True,
+        })
+    except requests.RequestException as e:
+        entry.update({
+            'status_code': 500,
+            'response': str(e),
+            'test_status': 'failed',
+            'erreur': str(e),
+        })
+
+    entry['duree_ms'] = round((time.perf_counter() - debut) * 1000, 2)
+    if contexte:
+        entry.update(contexte)
+    if historiser:
+        test_history.append(archiver_entree(entry))
+    return entry
+
+
+# ✅ Corps volumineux : l'historique ne garde qu'un aperçu et la référence du blob
+def archiver_entree(entry):
+    texte = entry['response']
+    if len(texte) <= SEUIL_BLOB_REPONSE:
+        return entry
+    return {
+        **entry,
+        'response': texte[:TAILLE_APERCU],
+        'response_blob': stocker_blob(texte.encode('utf-8')),
+    }
+
+
+def entree_complete(entry):
+    if 'response_blob' not in entry:
+        return entry
+    complete = {k: v for k, v in entry.items() if k != 'response_blob'}
+    try:
+        complete['response'] = lire_blob(entry['response_blob']).decode('utf-8')
+    except SpecBlob.DoesNotExist:
+        # Blob purgé (gc_blobs lancé dans un autre processus, qui ne voit pas cet historique) : aperçu seul
+        complete['response_tronquee'] = True
+    return complete
+
+
+# ✅ Construction de la requête à partir d'un endpoint de swagger_json
+def preparer_payload(ep, base_url):
+    params, path_vars, body, headers = {}, {}, {}, {}
+
+    for param in ep.get("parameters", []):
+        name = param.get("name")
+        value = param.get("value", "valeur")
+        emplacement = param.get("in")
+        if emplacement == "query":
+            params[name] = value
+        elif emplacement == "path":
+            path_vars[name] = str(value)
+        elif emplacement == "body":
+            body[name] = value
+        elif emplacement == "header":
+            headers[name] = str(value)
+
+    return {
+        'method': ep.get("method", "GET").upper(),
+        'url': f"{base_url.rstrip('/')}{ep.get('endpoint', '')}",
+        'params': params,
+        'path_vars': path_vars,
+        'body': body,
+        'headers': headers,
+    }
+
+
+# ✅ Tests en masse des endpoints d'un projet
+def tester_endpoint(projet, ep, payload, timeout=5, goldens=None, enregistrer=False, historiser=True,
+                    validateurs=None):
+    """
+    Teste un endpoint (payload préparé) et valide la réponse contre le schéma documenté.
+    goldens : index des réponses de référence du projet (index_goldens) auquel comparer la réponse.
+    enregistrer=True : la réponse devient la référence de cet endpoint et de ce jeu de paramètres.
+    historiser=False : la requête n'est pas ajoutée à l'historique partagé (mode charge, CLI, campagnes).
+    validateurs : validateurs déjà résolus par l'exécution en cours (validateur_reponse), partagés par ses threads.
+    """
+    entry = executer_test(timeout=timeout, projet_id=projet.pk, historiser=historiser, **payload)
+    resultat = {
+        'endpoint': f"{payload['method']} {payload['url']}",
+        'status': entry['test_status'],
+        'status_code': entry['status_code'],
+        'duree_ms': entry['duree_ms'],
+        'details': entry['response'][:200],
+    }
+    if 'erreur' in entry:
+        resultat['erreur'] = entry['erreur']
+    # Validation de la réponse contre le schéma documenté (validateur compilé et partagé)
+    valider = None
+    if 'erreur' not in entry:
+        valider = validateur_reponse(ep, entry['status_code'], {} if validateurs is None else validateurs)
+    if valider:
+        violations = valider_reponse(valider, entry['response'])
+        resultat['schema_valide'] = not violations
+        if violations:
+            resultat['violations'] = violations
+    # Réponses de référence : enregistrement ou diff structurel
+    if 'erreur' not in entry and enregistrer:
+        enregistrer_golden(projet.pk, payload['method'], ep.get('endpoint', ''), payload,
+                           entry['status_code'], entry['response'])
+        resultat['golden'] = 'recorded'
+    elif 'erreur' not in entry and goldens:
+        verdict = verifier_golden(goldens, payload['method'], ep.get('endpoint', ''), payload,
+                                  entry['status_code'], entry['response'])
+        if verdict:
+            resultat['golden_ok'] = verdict['identical']
+            if verdict['differences']:
+                resultat['golden_differences'] = verdict['differences']
+    return resultat
+
+
+def en_echec(resultat):
+    # "succeeded" (201) compte comme un succès ; schéma non respecté ou écart à la référence : échec
+    return (resultat['status'] in ('failed', 'skipped') or resultat.get('schema_valide') is False
+            or resultat.get('golden_ok') is False)
+
+
+def _taches(projet, base_url, graine_fuzz, endpoints):
+    base_url = base_url or url_base_projet(projet)
+    endpoints = (projet.swagger_json or []) if endpoints is None else endpoints
+    if graine_fuzz is not None:
+        endpoints = [endpoint_fuzz(ep, graine_fuzz) for ep in endpoints]
+    return [(ep, preparer_payload(ep, base_url)) for ep in endpoints]
+
+
+def _options_execution(projet, enregistrer_goldens):
+    # Index chargé une fois par exécution (une requête), validateurs résolus une fois par (endpoint, code) :
+    # partagés par les threads
+    options = {'enregistrer': True} if enregistrer_goldens else {'goldens': index_goldens(projet.pk)}
+    options['validateurs'] = {}
+    return options
+
+
+def executer_tests(projet, base_url=None, concurrence=1, timeout=5, graine_fuzz=None, endpoints=None,
+                   enregistrer_goldens=False, historiser=True):
+    """
+    Teste tous les endpoints de projet.swagger_json (ou la liste `endpoints`), dans l'ordre.
+    base_url permet de cibler un autre serveur (ex. le serveur mock local).
+    graine_fuzz : les valeurs des paramètres sont régénérées (mode fuzz) à partir de leurs schémas.
+    Les réponses sont comparées aux réponses de référence ; enregistrer_goldens=True les (ré)enregistre.
+    """
+    taches = _taches(projet, base_url, graine_fuzz, endpoints)
+    options = _options_execution(projet, enregistrer_goldens)
+
+    def lancer(tache):
+        return tester_endpoint(projet, *tache, timeout=timeout, historiser=historiser, **options)
+
+    if concurrence <= 1:
+        return [lancer(t) for t in taches]
+
+    with ThreadPoolExecutor(max_workers=concurrence) as executor:
+        return list(executor.map(lancer, taches))
+
+
+# ✅ Variante en flux : résultats produits dès qu'ils arrivent (CLI, milliers d'endpoints)
+def iterer_tests(projet, base_url=None, concurrence=1, timeout=5, graine_fuzz=None, endpoints=None,
+                 enregistrer_goldens=False, historiser=True):
+    taches = iter(_taches(projet, base_url, graine_fuzz, endpoints))
+    options = _options_execution(projet, enregistrer_goldens)
+    concurrence = max(1, concurrence)
+    with ThreadPoolExecutor(max_workers=concurrence) as executor:
+        en_cours = set()
+        for tache in taches:
+            en_cours.add(executor.submit(tester_endpoint, projet, *tache, timeout=timeout,
+                                          historiser=historiser, **options))
+            if len(en_cours) >= concurrence * 2:  # soumissions bornées
+                finis, en_cours = wait(en_cours, return_when=FIRST_COMPLETED)
+                yield from (f.result() for f in finis)
+        for futur in as_completed(en_cours):
+            yield futur.result()
+
+
+# ✅ Mode charge : répète les tests en masse et mesure le débit
+def executer_charge(projet, base_url=None, repetitions=1, concurrence=1, timeout=5, graine_fuzz=None):
+    debut = time.perf_counter()
+    resultats = []
+    for repetition in range(repetitions):
+        # En mode fuzz, chaque répétition utilise une nouvelle graine
+        graine = graine_fuzz + repetition if graine_fuzz is not None else None
+        resultats.extend(executer_tests(projet, base_url=base_url, concurrence=concurrence, timeout=timeout,
+                                        graine_fuzz=graine, historiser=False))
+    duree = time.perf_counter() - debut
+
+    durees = sorted(r['duree_ms'] for r in resultats)
+    echecs = sum(1 for r in resultats if en_echec(r))  # même règle que run_endpoint_tests
+
+    def centile(p):
+        if not durees:
+            return 0
+        return durees[min(len(durees) - 1, int(len(durees) * p))]
+
+    return {
+        'requetes': len(resultats),
+        'echecs': echecs,
+        'duree_s': round(duree, 3),
+        'debit_rps': round(len(resultats) / duree, 2) if duree else 0,
+        'p50_ms': centile(0.50),
+        'p95_ms': centile(0.95),
+        'violations_schema': taux_violations(resultats),
+    }
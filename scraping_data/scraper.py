@@ -2,6 +2,10 @@ import requests
 import json
 import os
 
+from .auth import gestionnaire_auth
+from .reports import cle_depuis_url, ecrire_rapport, lire_rapport
+from .spec_loader import METHODES_HTTP, charger_spec
+
 # 📂 Chemin du fichier de produits local (utile pour tests CRUD)
 DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data.json")
 
@@ -21,43 +25,35 @@ def save_products(data):
         json.dump(data, f, ensure_ascii=False, indent=4)
 
 
-# ✅ Récupérer des produits depuis une fausse API (pour tests)
-def fetch_products():
-    url = "https://fakestoreapi.com/products"
-    response = requests.get(url)
-    if response.status_code == 200:
-        produits = response.json()
-        save_products(produits)
-        return produits
-    else:
-        return {"erreur": "Échec de la récupération depuis l'API."}
+# ✅ Récupérer des produits depuis une source configurée (PRODUCT_SOURCES) vers le modèle Product
+def fetch_products(source="fakestoreapi", **options):
+    """Collecte paginée et upsert en base (voir products.Collecteur) ; retourne le bilan de la collecte."""
+    from .products import collecter_produits
+
+    return collecter_produits(source, **options)
 
 
 # ✅ Scraper dynamique d’un fichier Swagger depuis une URL
-def scrape_swagger(url="http://127.0.0.1:8000/swagger.json", user_email=None):
+def scrape_swagger(url="http://127.0.0.1:8000/swagger.json", projet_id=None):
     """
-    Scrape un Swagger JSON donné par URL.
-    Si un email est donné, ajoute un token Bearer simulé dans les headers.
-    Résultat : fichier swagger_report.json avec les endpoints extraits.
+    Scrape un Swagger (JSON ou YAML) donné par URL.
+    Si un projet est donné, son profil d'authentification (AuthProfile) est utilisé pour la requête.
+    Résultat : rapport reports/<clé>/<version>.json avec les endpoints extraits.
     """
-    headers = {}
-
-    if user_email:
-        token = f"testtoken:{user_email}"
-        headers["Authorization"] = f"Bearer {token}"
+    headers, params, _ = gestionnaire_auth.authentification(projet_id)
 
-    response = requests.get(url, headers=headers)
+    response = requests.get(url, headers=headers, params=params)
 
     if response.status_code != 200:
         raise Exception(f"Swagger JSON introuvable. Code {response.status_code}")
 
-    swagger = response.json()
+    swagger = charger_spec(response.content, response.headers.get("Content-Type"), url)
     result = []
 
     # 🔁 Analyse des chemins du Swagger
     for path, methods in swagger.get("paths", {}).items():
         for method, details in methods.items():
-            if method == "parameters":  # Ignorer bloc global "parameters"
+            if method.lower() not in METHODES_HTTP:  # Ignorer bloc global "parameters", "summary"...
                 continue
 
             endpoint_info = {
@@ -77,23 +73,16 @@ def scrape_swagger(url="http://127.0.0.1:8000/swagger.json", user_email=None):
 
             result.append(endpoint_info)
 
-    # 💾 Sauvegarde dans swagger_report.json (au niveau du projet)
-    output_path = os.path.join(os.path.dirname(__file__), '..', 'swagger_report.json')
-    output_path = os.path.abspath(output_path)
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(result, f, indent=4, ensure_ascii=False)
+    # 💾 Sauvegarde atomique d'une nouvelle version du rapport (reports/<clé>/)
+    return ecrire_rapport(cle_depuis_url(url), result)
 
 
 # ✅ Extraction du fichier JSON généré pour l’affichage HTML
-def extract_full_swagger_data():
+def extract_full_swagger_data(cle=None):
     """
-    Lecture du fichier swagger_report.json pour affichage dans vue Django
+    Lecture du dernier rapport (d'une clé donnée ou tous projets confondus) pour affichage dans vue Django
     """
-    file_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'swagger_report.json'))
-
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return lire_rapport(cle)
     except FileNotFoundError:
-        return {"erreur": "Fichier swagger_report.json introuvable. Lancez d’abord /lancer-scraping."}
+        return {"erreur": "Aucun rapport Swagger trouvé. Lancez d’abord /lancer-scraping."}
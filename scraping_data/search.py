@@ -0,0 +1,218 @@
+import bisect
+import heapq
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.signals import post_delete, post_save
+
+from .blobstore import lire_json
+from .models import SwaggerProject
+
+_RE_CAMEL = re.compile(r"([a-z0-9])([A-Z])")
+_RE_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def tokeniser(texte):
+    """'getUserById /users/{id}' -> ['get', 'user', 'by', 'id', 'users', 'id']"""
+    return _RE_TOKEN.findall(_RE_CAMEL.sub(r"\1 \2", texte or "").lower())
+
+
+def _retirer(dictionnaire, cle, doc_id):
+    docs = dictionnaire.get(cle)
+    if docs is not None:
+        docs.discard(doc_id)
+        if not docs:
+            del dictionnaire[cle]
+
+
+class IndexRecherche:
+    """
+    Index inversé en mémoire de tous les endpoints scrapés.
+    Chaque projet est réindexé seul, uniquement quand son spec_blob change : à l'enregistrement du projet dans
+    ce processus (signaux), sinon par une resynchronisation en tâche de fond toutes les SEARCH_SYNC_SECONDS.
+    """
+
+    def __init__(self):
+        self._verrou = threading.RLock()
+        self._prochain_id = 0
+        self._docs = {}          # doc_id -> (projet_id, method, endpoint, summary)
+        self._tokens_doc = {}    # doc_id -> tokens indexés (pour le retrait)
+        self._postings = {}      # token -> set(doc_id)
+        self._chemins = {}       # endpoint en minuscules -> set(doc_id)
+        self._projets = {}       # projet_id -> (spec_blob_id, set(doc_id))
+        self._par_methode = {}   # method -> set(doc_id), pour filtres et facettes
+        self._tokens_tries = None
+        self._chemins_tries = None
+        self._synchronise_a = None  # time.monotonic() de la dernière synchronisation complète
+        self._en_fond = False
+
+    # ---------- Mise à jour ----------
+    def _retirer_projet(self, projet_id):
+        _, doc_ids = self._projets.pop(projet_id, (None, set()))
+        for doc_id in doc_ids:
+            _, method, endpoint, _ = self._docs.pop(doc_id)
+            _retirer(self._par_methode, method, doc_id)
+            _retirer(self._chemins, endpoint.lower(), doc_id)
+            for token in self._tokens_doc.pop(doc_id):
+                _retirer(self._postings, token, doc_id)
+        self._tokens_tries = self._chemins_tries = None
+
+    def indexer(self, projet_id, spec_blob_id, swagger_json):
+        with self._verrou:
+            self._retirer_projet(projet_id)
+            doc_ids = set()
+            for ep in swagger_json or []:
+                doc_id = self._prochain_id
+                self._prochain_id += 1
+                method = ep.get("method", "").upper()
+                endpoint = ep.get("endpoint", "")
+                summary = ep.get("summary", "") or ""
+
+                tokens = set(tokeniser(endpoint)) | set(tokeniser(summary))
+                tokens.update(t for p in ep.get("parameters", []) for t in tokeniser(p.get("name")))
+                tokens.update(t for tag in ep.get("tags", []) for t in tokeniser(tag))
+
+                self._docs[doc_id] = (projet_id, method, endpoint, summary)
+                self._tokens_doc[doc_id] = tokens
+                for token in tokens:
+                    self._postings.setdefault(token, set()).add(doc_id)
+                self._chemins.setdefault(endpoint.lower(), set()).add(doc_id)
+                self._par_methode.setdefault(method, set()).add(doc_id)
+                doc_ids.add(doc_id)
+
+            self._projets[projet_id] = (spec_blob_id, doc_ids)
+            self._tokens_tries = self._chemins_tries = None
+
+    def retirer(self, projet_id):
+        with self._verrou:
+            self._retirer_projet(projet_id)
+
+    def synchroniser(self):
+        """Réindexe les projets nouveaux ou modifiés et retire les projets supprimés."""
+        actuels = dict(SwaggerProject.objects.values_list("id", "spec_blob_id"))
+        with self._verrou:
+            self._synchronise_a = time.monotonic()
+            for projet_id in set(self._projets) - set(actuels):
+                self._retirer_projet(projet_id)
+            a_indexer = [
+                (projet_id, blob_id) for projet_id, blob_id in actuels.items()
+                if self._projets.get(projet_id, (False,))[0] != blob_id
+            ]
+        for projet_id, blob_id in a_indexer:
+            self.indexer(projet_id, blob_id, lire_json(blob_id) if blob_id else [])
+
+    def _synchroniser_en_fond(self):
+        try:
+            self.synchroniser()
+        finally:
+            self._en_fond = False
+            connection.close()
+
+    def preparer(self):
+        """
+        Avant une recherche : l'index est construit au premier appel du processus ; ensuite, les projets modifiés
+        par d'autres processus sont repris en tâche de fond, sans faire attendre la requête.
+        """
+        with self._verrou:
+            charge = self._synchronise_a is not None
+            if charge and not self._en_fond and (
+                    time.monotonic() - self._synchronise_a > getattr(settings, "SEARCH_SYNC_SECONDS", 60)):
+                self._en_fond = True
+                threading.Thread(target=self._synchroniser_en_fond, daemon=True).start()
+        if not charge:
+            self.synchroniser()
+
+    def vider(self):
+        """Index oublié : reconstruit entièrement à la prochaine recherche."""
+        self.__init__()
+
+    def projet_enregistre(self, projet):
+        """Signal post_save : réindexation immédiate si le spec a changé (index déjà construit)."""
+        if self._synchronise_a is None or "spec_blob_id" in projet.get_deferred_fields():
+            return
+        with self._verrou:
+            if self._projets.get(projet.pk, (False,))[0] == projet.spec_blob_id:
+                return
+        self.indexer(projet.pk, projet.spec_blob_id, projet.swagger_json)
+
+    # ---------- Recherche ----------
+    def _par_prefixe(self, tries, dictionnaire, prefixe):
+        resultat = set()
+        i = bisect.bisect_left(tries, prefixe)
+        while i < len(tries) and tries[i].startswith(prefixe):
+            resultat |= dictionnaire[tries[i]]
+            i += 1
+        return resultat
+
+    def rechercher(self, q="", methods=None, projets=None, prefixe=None, limit=50, offset=0):
+        """
+        Tous les termes doivent correspondre ; le dernier terme (ou un terme finissant par *)
+        est recherché par préfixe. `prefixe` filtre sur le début du chemin de l'endpoint.
+        """
+        with self._verrou:
+            if self._tokens_tries is None:
+                self._tokens_tries = sorted(self._postings)
+                self._chemins_tries = sorted(self._chemins)
+
+            termes = q.split()
+            ensembles = []
+            for i, terme in enumerate(termes):
+                par_prefixe = terme.endswith("*") or i == len(termes) - 1
+                tokens = tokeniser(terme)
+                for j, token in enumerate(tokens):
+                    if par_prefixe and j == len(tokens) - 1:
+                        ensembles.append(self._par_prefixe(self._tokens_tries, self._postings, token))
+                    else:
+                        ensembles.append(self._postings.get(token, set()))
+
+            if prefixe:
+                ensembles.append(self._par_prefixe(self._chemins_tries, self._chemins, prefixe.lower()))
+
+            if ensembles:
+                ensembles.sort(key=len)
+                trouves = ensembles[0].intersection(*ensembles[1:])
+            else:
+                trouves = set(self._docs)
+
+            # Filtres et facettes par intersections d'ensembles (sans parcourir les documents)
+            par_methode = set().union(*(self._par_methode.get(m, set()) for m in methods)) if methods else None
+            par_projet = set().union(*(self._projets.get(p, (None, set()))[1] for p in projets)) if projets else None
+
+            base_methodes = trouves & par_projet if par_projet is not None else trouves
+            base_projets = trouves & par_methode if par_methode is not None else trouves
+            facettes = {
+                "method": {m: n for m, docs in self._par_methode.items() if (n := len(base_methodes & docs))},
+                "project": {p: n for p, (_, docs) in self._projets.items() if (n := len(base_projets & docs))},
+            }
+
+            if par_methode is not None:
+                base_methodes = base_methodes & par_methode
+            # Ordre d'indexation (projet puis ordre du spec) : seule la page demandée est triée
+            page = heapq.nsmallest(offset + limit, base_methodes)[offset:]
+
+            return {
+                "total": len(base_methodes),
+                "facets": facettes,
+                "results": [
+                    dict(zip(("project_id", "method", "endpoint", "summary"), self._docs[d]))
+                    for d in page
+                ],
+            }
+
+
+index_recherche = IndexRecherche()
+
+
+def _projet_enregistre(sender, instance, **kwargs):
+    index_recherche.projet_enregistre(instance)
+
+
+def _projet_supprime(sender, instance, **kwargs):
+    index_recherche.retirer(instance.pk)
+
+
+post_save.connect(_projet_enregistre, sender=SwaggerProject, dispatch_uid="index_recherche_save")
+post_delete.connect(_projet_supprime, sender=SwaggerProject, dispatch_uid="index_recherche_delete")
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from urllib.parse import urlparse
+
+import yaml
+
+# libyaml (C) si disponible : 10 à 20 fois plus rapide que le chargeur Python
+_BaseLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+class _SpecLoader(_BaseLoader):
+    """Chargeur sûr produisant les mêmes types qu'un document JSON (dates et clés en chaînes)."""
+
+
+def _cle_json(cle):
+    if isinstance(cle, str):
+        return cle
+    return json.dumps(cle) if isinstance(cle, bool) or cle is None else str(cle)
+
+
+def _construire_mapping(loader, noeud):
+    """Clés toujours en chaînes, comme en JSON (ex. codes de réponse `200:`)."""
+    return {_cle_json(k): v for k, v in loader.construct_mapping(noeud, deep=True).items()}
+
+
+_SpecLoader.add_constructor("tag:yaml.org,2002:timestamp", _SpecLoader.construct_yaml_str)
+_SpecLoader.add_constructor("tag:yaml.org,2002:map", _construire_mapping)
+
+TAILLE_CACHE = 32
+METHODES_HTTP = {"get", "put", "post", "delete", "options", "head", "patch", "trace"}
+
+_verrou_cache = threading.Lock()
+_cache = OrderedDict()  # sha256 du contenu -> document
+
+
+class SpecInvalide(ValueError):
+    pass
+
+
+# ✅ Détection du format : Content-Type, puis extension de l'URL, puis premier caractère
+def detecter_format(contenu, content_type=None, url=None):
+    content_type = (content_type or "").lower()
+    if "yaml" in content_type or "yml" in content_type:
+        return "yaml"
+    if "json" in content_type:
+        return "json"
+    chemin = urlparse(url or "").path.lower()
+    if chemin.endswith((".yaml", ".yml")):
+        return "yaml"
+    if chemin.endswith(".json"):
+        return "json"
+    debut = contenu.lstrip()[:1]
+    return "json" if debut in (b"{", b"[") else "yaml"
+
+
+def _parser(contenu, format):
+    try:
+        if format == "json":
+            return json.loads(contenu)
+        return yaml.load(contenu, Loader=_SpecLoader)
+    except (ValueError, yaml.YAMLError) as e:
+        raise SpecInvalide(f"Spec {format.upper()} illisible : {e}") from e
+
+
+# ✅ Chargement d'un document JSON / YAML, mis en cache par empreinte du contenu
+def charger_document(contenu, content_type=None, url=None):
+    """
+    `contenu` : bytes (ou str) du document JSON ou YAML.
+    Un contenu déjà vu n'est pas re-parsé. Le document retourné est partagé : ne pas le modifier.
+    """
+    if isinstance(contenu, str):
+        contenu = contenu.encode("utf-8")
+    cle = hashlib.sha256(contenu).hexdigest()
+    with _verrou_cache:
+        if cle in _cache:
+            _cache.move_to_end(cle)
+            return _cache[cle]
+
+    format = detecter_format(contenu, content_type, url)
+    document = _parser(contenu, format)
+    if format == "json" and not isinstance(document, (dict, list)):
+        document = _parser(contenu, "yaml")  # JSON est un sous-ensemble de YAML
+
+    with _verrou_cache:
+        _cache[cle] = document
+        while len(_cache) > TAILLE_CACHE:
+            _cache.popitem(last=False)
+    return document
+
+
+# ✅ Chargement d'un document Swagger / OpenAPI
+def charger_spec(contenu, content_type=None, url=None):
+    document = charger_document(contenu, content_type, url)
+    if not isinstance(document, dict) or not ("paths" in document or "openapi" in document or "swagger" in document):
+        raise SpecInvalide("Le document n'est pas une spec Swagger / OpenAPI.")
+    return document
+
+
+# ✅ Résolution des références locales ("#/definitions/User", "#/components/schemas/User")
+def resoudre_ref(document, noeud, profondeur=20):
+    """Suit une chaîne de $ref jusqu'à un objet sans $ref (références externes laissées telles quelles)."""
+    while isinstance(noeud, dict) and isinstance(noeud.get("$ref"), str) and profondeur:
+        ref = noeud["$ref"]
+        if not ref.startswith("#/"):
+            return noeud
+        cible = document
+        for morceau in ref[2:].split("/"):
+            morceau = morceau.replace("~1", "/").replace("~0", "~")
+            if not isinstance(cible, dict) or morceau not in cible:
+                return noeud
+            cible = cible[morceau]
+        noeud = cible
+        profondeur -= 1
+    return noeud
+
+
+def dereferencer(document, noeud, _pile=()):
+    """Copie de `noeud` avec les $ref locales remplacées ; une référence cyclique est laissée en $ref."""
+    if isinstance(noeud, list):
+        return [dereferencer(document, n, _pile) for n in noeud]
+    if not isinstance(noeud, dict):
+        return noeud
+    ref = noeud.get("$ref")
+    if isinstance(ref, str) and ref.startswith("#/"):
+        if ref in _pile:
+            return {"$ref": ref}
+        cible = resoudre_ref(document, noeud, profondeur=1)
+        if cible is noeud:
+            return dict(noeud)
+        return dereferencer(document, cible, _pile + (ref,))
+    return {k: dereferencer(document, v, _pile) for k, v in noeud.items()}
+
+
+def schema_objet(document, schema):
+    """Propriétés et champs requis d'un schéma objet, allOf fusionné."""
+    schema = resoudre_ref(document, schema or {})
+    proprietes = dict(schema.get("properties", {}))
+    requis = list(schema.get("required", []))
+    for partie in schema.get("allOf", []):
+        sous_proprietes, sous_requis = schema_objet(document, partie)
+        proprietes.update(sous_proprietes)
+        requis.extend(sous_requis)
+    return proprietes, requis
+
+
+# ✅ Type et exemple d'un schéma, en OpenAPI 3.0 comme en 3.1
+def type_schema(schema):
+    """OpenAPI 3.1 autorise "type": ["string", "null"] : on retient le premier type non nul."""
+    type_ = (schema or {}).get("type", "")
+    if isinstance(type_, list):
+        type_ = next((t for t in type_ if t != "null"), "null" if type_ else "")
+    return type_
+
+
+def exemple_schema(noeud):
+    """`example` (2.0 / 3.0) ou premier élément de `examples` (3.1 dans un schéma)."""
+    noeud = noeud or {}
+    if noeud.get("example") is not None:
+        return noeud["example"]
+    exemples = noeud.get("examples")
+    if isinstance(exemples, list) and exemples:
+        return exemples[0]
+    return None
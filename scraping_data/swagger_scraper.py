@@ -1,12 +1,15 @@
 import requests
-import json
+
+from scraping_data.reports import cle_depuis_url, ecrire_rapport
+from scraping_data.spec_loader import SpecInvalide, charger_spec
+
 SWAGGER_URL = "http://127.0.0.1:8000/swagger/?format=openapi"
 
 def scrape_swagger(url=SWAGGER_URL):
     try:
         response = requests.get(url)
         response.raise_for_status()
-        swagger_data = response.json()
+        swagger_data = charger_spec(response.content, response.headers.get("Content-Type"), url)
 
         results = []
 
@@ -44,15 +47,14 @@ def scrape_swagger(url=SWAGGER_URL):
 
                 results.append(endpoint_info)
 
-        with open("swagger_report.json", "w", encoding="utf-8") as f:
-            json.dump(results, f, indent=4, ensure_ascii=False)
+        chemin = ecrire_rapport(cle_depuis_url(url), results)
 
-        print("✅ Rapport Swagger généré dans swagger_report.json")
+        print(f"✅ Rapport Swagger généré dans {chemin}")
 
     except requests.exceptions.RequestException as e:
         print(f"❌ Erreur de requête : {e}")
-    except json.JSONDecodeError as e:
-        print(f"❌ Erreur de décodage JSON : {e}")
+    except SpecInvalide as e:
+        print(f"❌ Erreur de décodage de la spec : {e}")
 
 if __name__ == "__main__":
     scrape_swagger()
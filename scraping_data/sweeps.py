@@ -0,0 +1,225 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connection, connections, transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .generators import endpoint_fuzz
+from .models import Sweep, WorkItem
+from .golden import index_goldens
+from .runner import preparer_payload, tester_endpoint, url_base_projet
+
+TAILLE_CREATION = 1000
+EN_COURS = ('pending', 'leased')
+
+
+def duree_bail():
+    return getattr(settings, "SWEEP_LEASE_SECONDS", 60)
+
+
+# ✅ Création d'une campagne : un WorkItem par endpoint
+def creer_sweep(projet, base_url=None, timeout=5, graine_fuzz=None, endpoints=None):
+    endpoints = (projet.swagger_json or []) if endpoints is None else endpoints
+    with transaction.atomic():
+        sweep = Sweep.objects.create(project=projet, base_url=base_url or url_base_projet(projet),
+                                     timeout=timeout, fuzz_seed=graine_fuzz, total=len(endpoints))
+        WorkItem.objects.bulk_create(
+            (WorkItem(sweep=sweep, position=i, endpoint=ep) for i, ep in enumerate(endpoints)),
+            batch_size=TAILLE_CREATION,
+        )
+    return sweep
+
+
+def _en_attente(sweep_id=None):
+    items = WorkItem.objects.filter(status='pending', sweep_id__in=Sweep.objects.filter(status='running').values('pk'))
+    return items.filter(sweep_id=sweep_id) if sweep_id else items
+
+
+# ✅ Bail sur un lot d'items, sûr entre plusieurs workers et plusieurs machines
+def louer(worker, taille=20, sweep_id=None, duree_s=None):
+    """
+    PostgreSQL / MySQL 8 : SELECT ... FOR UPDATE SKIP LOCKED, les workers ne se bloquent pas entre eux.
+    SQLite (pas de verrou de ligne) : UPDATE conditionnel sur status='pending', seul le premier worker le voit réussir.
+    Chaque bail porte un jeton : le worker ne récupère que les items dont l'UPDATE a abouti pour lui.
+    """
+    jeton = uuid.uuid4().hex
+    expiration = timezone.now() + timedelta(seconds=duree_s or duree_bail())
+    candidats = _en_attente(sweep_id).order_by('sweep_id', 'position')
+    verrou_ligne = connection.features.has_select_for_update_skip_locked
+    # Sans verrou de ligne, pas de transaction : un SELECT puis UPDATE différé bloquerait les autres écrivains SQLite
+    with transaction.atomic() if verrou_ligne else nullcontext():
+        if verrou_ligne:
+            candidats = candidats.select_for_update(skip_locked=True)
+        ids = list(candidats.values_list('pk', flat=True)[:taille])
+        if not ids:
+            return jeton, []
+        WorkItem.objects.filter(pk__in=ids, status='pending').update(
+            status='leased', lease_owner=worker, lease_token=jeton,
+            lease_expires_at=expiration, attempts=F('attempts') + 1,
+        )
+    return jeton, list(WorkItem.objects.filter(pk__in=ids, lease_token=jeton).select_related('sweep__project'))
+
+
+def battement(jeton, duree_s=None):
+    """Prolonge le bail d'un lot encore en cours ; retourne le nombre d'items toujours détenus."""
+    expiration = timezone.now() + timedelta(seconds=duree_s or duree_bail())
+    return WorkItem.objects.filter(lease_token=jeton, status='leased').update(lease_expires_at=expiration)
+
+
+# ✅ Reprise des baux expirés (worker arrêté ou machine perdue)
+def recuperer_baux_expires(sweep_id=None):
+    """Les items expirés repassent en attente ; au-delà de SWEEP_MAX_ATTEMPTS ils sont abandonnés."""
+    maintenant = timezone.now()
+    expires = WorkItem.objects.filter(status='leased', lease_expires_at__lt=maintenant)
+    if sweep_id:
+        expires = expires.filter(sweep_id=sweep_id)
+    epuises = expires.filter(attempts__gte=getattr(settings, "SWEEP_MAX_ATTEMPTS", 3))
+    sweeps = set(epuises.values_list('sweep_id', flat=True))
+    abandonnes = epuises.update(
+        status='failed', finished_at=maintenant,
+        result={'status': 'failed', 'erreur': "Bail expiré trop de fois (worker perdu ?)"},
+    )
+    repris = expires.update(status='pending', lease_owner='', lease_token='', lease_expires_at=None)
+    if abandonnes:
+        _terminer_sweeps(sweeps)
+    return repris, abandonnes
+
+
+# ✅ Écriture des résultats par lots
+def ecrire_resultats(jeton, resultats):
+    """
+    `resultats` : {pk de l'item: résultat}. Seuls les items dont ce bail est toujours titulaire sont écrits :
+    un worker dont le bail a expiré puis été repris n'écrase pas le travail de son successeur.
+    """
+    maintenant = timezone.now()
+    items = [
+        WorkItem(pk=pk, status='done', result=resultat, finished_at=maintenant, lease_expires_at=None)
+        for pk, resultat in resultats.items()
+    ]
+    # bulk_update sur un queryset filtré : la condition de bail s'ajoute à chaque UPDATE
+    ecrits = WorkItem.objects.filter(lease_token=jeton, status='leased').bulk_update(
+        items, ['status', 'result', 'finished_at', 'lease_expires_at'], batch_size=500
+    )
+    _terminer_sweeps(set(WorkItem.objects.filter(pk__in=resultats).values_list('sweep_id', flat=True)))
+    return ecrits
+
+
+def _terminer_sweeps(sweep_ids):
+    Sweep.objects.filter(pk__in=sweep_ids, status='running').exclude(items__status__in=EN_COURS).update(
+        status='done', finished_at=timezone.now()
+    )
+
+
+def bilan(sweep):
+    """Avancement d'une campagne : items par statut, tests en échec, débit."""
+    statuts = dict(sweep.items.values_list('status').annotate(n=Count('pk')).order_by())
+    echecs = sweep.items.filter(status='done').filter(Q(result__status='failed') | Q(result__schema_valide=False) | Q(result__golden_ok=False)).count()
+    termines = statuts.get('done', 0) + statuts.get('failed', 0)
+    fin = sweep.finished_at or timezone.now()
+    duree = max((fin - sweep.created_at).total_seconds(), 1e-6)
+    return {
+        'sweep': sweep.pk,
+        'status': sweep.status,
+        'total': sweep.total,
+        'items': statuts,
+        'echecs': echecs + statuts.get('failed', 0),
+        'debit_rps': round(termines / duree, 2),
+    }
+
+
+class Worker:
+    """
+    Boucle d'un worker : reprise des baux expirés, bail d'un lot, tests du lot en parallèle,
+    écriture groupée des résultats. Un thread prolonge le bail du lot en cours (battements).
+    Autant de workers que voulu peuvent tourner, sur une ou plusieurs machines.
+    """
+
+    def __init__(self, nom=None, taille_lot=20, concurrence=8, sweep_id=None, duree_bail_s=None):
+        self.nom = nom or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.taille_lot = taille_lot
+        self.concurrence = max(1, concurrence)
+        self.sweep_id = sweep_id
+        self.duree_bail_s = duree_bail_s or duree_bail()
+        self.traites = 0
+        self._jeton = None
+        self._arret = threading.Event()
+        self._connexions_pool = set()  # connexions ouvertes par les threads du pool, fermées à l'arrêt
+
+    def _battements(self):
+        try:
+            while not self._arret.wait(self.duree_bail_s / 3):
+                jeton = self._jeton
+                if jeton:
+                    battement(jeton, self.duree_bail_s)
+        finally:
+            connection.close()
+
+    def _tester(self, item, goldens, validateurs):
+        # Thread du pool : tester_endpoint lit la base (profil d'authentification, limites du projet)
+        sweep = item.sweep
+        ep = endpoint_fuzz(item.endpoint, sweep.fuzz_seed + item.position) if sweep.fuzz_seed is not None else item.endpoint
+        try:
+            close_old_connections()  # connexion réutilisée entre items, dans la limite de CONN_MAX_AGE
+            self._connexions_pool.add(connections[DEFAULT_DB_ALIAS])
+            return tester_endpoint(sweep.project, ep, preparer_payload(ep, sweep.base_url), timeout=sweep.timeout,
+                                   goldens=goldens[sweep.project_id], historiser=False,
+                                   validateurs=validateurs[sweep.project_id])
+        except Exception as e:  # un item en erreur ne doit pas faire perdre le lot
+            return {'endpoint': f"{ep.get('method', 'GET').upper()} {ep.get('endpoint', '')}",
+                    'status': 'failed', 'status_code': None, 'duree_ms': None, 'details': '', 'erreur': str(e)}
+
+    def _fermer_connexions_pool(self):
+        # Threads du pool terminés : leurs connexions sont fermées depuis ce thread, une fois chacune
+        for connexion in self._connexions_pool:
+            connexion.inc_thread_sharing()
+            try:
+                connexion.close()
+            finally:
+                connexion.dec_thread_sharing()
+        self._connexions_pool.clear()
+
+    def traiter_lot(self, executor):
+        jeton, items = louer(self.nom, self.taille_lot, self.sweep_id, self.duree_bail_s)
+        if not items:
+            return 0
+        self._jeton = jeton
+        projets = {item.sweep.project_id for item in items}
+        goldens = {projet_id: index_goldens(projet_id) for projet_id in projets}
+        validateurs = {projet_id: {} for projet_id in projets}  # résolus une fois par (endpoint, code) dans le lot
+        try:
+            resultats = dict(zip((item.pk for item in items),
+                                 executor.map(lambda item: self._tester(item, goldens, validateurs), items)))
+            self.traites += ecrire_resultats(jeton, resultats)
+        finally:
+            self._jeton = None
+        return len(items)
+
+    def executer(self, jusqua_fin=True, pause_s=1.0):
+        """Traite les lots jusqu'à ce qu'il n'y ait plus rien à louer (ni bail en cours ailleurs si jusqua_fin)."""
+        coeur = threading.Thread(target=self._battements, daemon=True)
+        coeur.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrence) as executor:
+                while True:
+                    recuperer_baux_expires(self.sweep_id)
+                    if self.traiter_lot(executor):
+                        continue
+                    restants = WorkItem.objects.filter(status='leased', sweep__status='running')
+                    if self.sweep_id:
+                        restants = restants.filter(sweep_id=self.sweep_id)
+                    if not jusqua_fin or not restants.exists():
+                        break
+                    time.sleep(pause_s)  # d'autres workers détiennent encore des baux : attendre leur fin ou expiration
+        finally:
+            self._arret.set()
+            coeur.join()
+            self._fermer_connexions_pool()
+        return self.traites
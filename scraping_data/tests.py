@@ -19,6 +19,26 @@ class ProductAPITest(TestCase):
             # Ton API renvoie un champ 'title' et pas 'name'
             self.assertIn('title', data[0])
 
+    def test_produits_en_base(self):
+        from scraping_data.models import Product
+
+        collecte = Product.objects.create(title="Clavier", price=25, category="info", source="dummyjson", source_id="9")
+        url = reverse('scraping_data:product-list')
+        reponse = self.client.post(url, {"title": "Souris", "price": 12.5, "category": "info"},
+                                   content_type='application/json')
+        self.assertEqual(reponse.status_code, 201)
+        self.assertEqual(Product.objects.get(pk=reponse.json()["id"]).title, "Souris")
+        data = self.client.get(url, {"category": "INFO", "max_price": 20}).json()
+        self.assertEqual([p["title"] for p in data], ["Souris"])
+        self.assertEqual(self.client.get(url, {"min_price": "abc"}).status_code, 400)
+
+        detail = reverse('scraping_data:product-detail', args=[collecte.pk])
+        reponse = self.client.put(detail, {"title": "Clavier pro", "price": 30, "category": "info"},
+                                  content_type='application/json')
+        self.assertEqual((reponse.status_code, reponse.json()["price"]), (200, 30.0))
+        self.assertEqual(self.client.delete(detail).status_code, 204)
+        self.assertEqual(self.client.delete(detail).status_code, 404)
+
 
 # ✅ Tests pour les nouvelles routes test_endpoint et download_history
 class APITestCase(TestCase):
@@ -132,3 +152,1672 @@ class APITestCase(TestCase):
             response.headers['Content-Disposition'].startswith('attachment; filename=test_history.json'),
             "Le header Content-Disposition doit contenir un fichier test_history.json"
         )
+
+
+# ✅ Tests du serveur mock et des tests en masse hors ligne
+class MockServerTest(TestCase):
+    def setUp(self):
+        import threading
+        from scraping_data.mock_server import MockAPI, creer_serveur
+        from scraping_data.models import SwaggerProject
+
+        self.projet = SwaggerProject.objects.create(
+            swagger_url="https://api.example.com/v3/api-docs",
+            swagger_json=[
+                {"method": "GET", "endpoint": "/users/{id}", "parameters": [
+                    {"name": "id", "in": "path", "type": "integer", "value": 42}],
+                 "responses": {"200": {"type": "object", "properties": {
+                     "id": {"type": "integer"}, "email": {"type": "string", "format": "email"}}}}},
+                {"method": "POST", "endpoint": "/users", "parameters": [
+                    {"name": "name", "in": "body", "type": "string", "value": "bob"}]},
+            ],
+        )
+        self.api = MockAPI(self.projet.swagger_json, seed=1)
+        self.serveur = creer_serveur(self.api, port=0)
+        threading.Thread(target=self.serveur.serve_forever, daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self.serveur.server_port}"
+
+    def tearDown(self):
+        self.serveur.shutdown()
+        self.serveur.server_close()
+
+    def test_exemple_depuis_schema(self):
+        status, corps = self.api.repondre("GET", "/users/7")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(corps), {"id": 1, "email": "user@example.com"})
+        self.assertEqual(self.api.repondre("DELETE", "/users/7")[0], 404)
+
+    def test_tests_en_masse_vers_mock(self):
+        from scraping_data.runner import executer_tests
+
+        results = executer_tests(self.projet, base_url=self.base_url, concurrence=2)
+        self.assertEqual([r['status_code'] for r in results], [200, 200])
+
+    def test_options_invalides(self):
+        for vue in ('scraping_data:run-tests', 'scraping_data:tester-tous'):
+            for options in ({"concurrency": "abc"}, {"fuzz": "x"}):
+                reponse = self.client.get(reverse(vue), {"id": self.projet.pk, "base_url": self.base_url, **options})
+                self.assertEqual(reponse.status_code, 400)
+        reponse = self.client.get(reverse('scraping_data:run-tests'),
+                                  {"id": self.projet.pk, "base_url": self.base_url, "concurrency": "-3"})
+        self.assertEqual(len(reponse.json()["results"]), 2)  # bornée à 1
+
+    def test_concurrence_et_historique_bornes(self):
+        from django.test import RequestFactory, override_settings
+        from scraping_data.runner import executer_charge, test_history
+        from scraping_data.views import options_tests
+
+        with override_settings(TESTS_MAX_CONCURRENCY=8):
+            requete = RequestFactory().get("/", {"concurrency": "100000"})
+            self.assertEqual(options_tests(requete)["concurrence"], 8)
+        self.assertIsNotNone(test_history.maxlen)
+        taille = len(test_history)
+        stats = executer_charge(self.projet, base_url=self.base_url, repetitions=3)
+        self.assertEqual((stats["requetes"], len(test_history)), (6, taille))  # mode charge : hors historique
+
+    def test_injection_erreurs(self):
+        self.api.taux_erreur = 1.0
+        status, _ = self.api.repondre("GET", "/users/7")
+        self.assertIn(status, (500, 503))
+
+
+# ✅ Tests du benchmark du pipeline
+class BenchmarkTest(TestCase):
+    def test_mesure_pipeline(self):
+        from scraping_data.benchmarks import mesurer_pipeline
+        from scraping_data.models import SwaggerProject
+
+        mesures = mesurer_pipeline(20)
+        self.assertEqual(mesures["endpoints"], 20)
+        self.assertGreater(mesures["taille_api_octets"], 0)
+        # Taille de l'API : seul le projet de bench compte, quels que soient les projets en base
+        SwaggerProject.objects.create(swagger_url="https://autre.test", swagger_json=[{"method": "GET"}] * 500)
+        self.assertEqual(mesurer_pipeline(20)["taille_api_octets"], mesures["taille_api_octets"])
+        # Chemin complet d'un scraping (version, Endpoint...), écritures annulées ensuite
+        with patch('scraping_data.views.synchroniser_endpoints') as synchroniser:
+            mesurer_pipeline(20)
+        synchroniser.assert_called_once()
+        self.assertFalse(SwaggerProject.objects.filter(swagger_url__startswith="https://bench.example.com").exists())
+
+    def test_comparer_baseline(self):
+        from scraping_data.benchmarks import comparer_baseline
+
+        baseline = {"100": {"parse_s": 1.0, "ecriture_db_s": 1.0}}
+        resultats = {"100": {"parse_s": 1.5, "ecriture_db_s": 1.1}}
+        regressions = comparer_baseline(resultats, baseline, seuil=0.2)
+        self.assertEqual([r["metrique"] for r in regressions], ["parse_s"])
+
+
+# ✅ Tests du middleware de profilage
+class ProfilingMiddlewareTest(TestCase):
+    def setUp(self):
+        from scraping_data.middleware import reinitialiser
+        reinitialiser()
+
+    def test_agregats_par_vue(self):
+        from django.test import override_settings
+        from scraping_data.models import SwaggerProject
+
+        SwaggerProject.objects.create(swagger_url="https://api.example.com", swagger_json=[])
+        with override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1.0, PROFILING_SLOW_MS=0, DEBUG=True):
+            self.client.get(reverse('scraping_data:list-projects'))
+            data = self.client.get(reverse('scraping_data:profiling-stats')).json()
+
+        stats = data['vues']['scraping_data:list-projects']
+        self.assertEqual(stats['requetes'], 1)
+        self.assertGreater(stats['sql_count'], 0)
+        self.assertGreater(stats['template_ms'], 0)
+        self.assertTrue(data['echantillons_lents'])
+
+    def test_desactive_par_defaut(self):
+        self.client.get(reverse('scraping_data:list-projects'))
+        from scraping_data.middleware import statistiques
+        self.assertEqual(statistiques()['vues'], {})
+
+
+# ✅ Tests de la liste des projets (projection légère, curseur, recherche)
+class ProjectListingTest(TestCase):
+    def setUp(self):
+        from scraping_data.models import SwaggerProject
+        for i in range(7):
+            SwaggerProject.objects.create(
+                name=f"projet {i}",
+                swagger_url=f"https://api{i}.example.com/v3/api-docs",
+                swagger_json=[{"method": "GET", "endpoint": f"/e{j}", "parameters": []} for j in range(i)],
+            )
+
+    def test_resume_denormalise(self):
+        from scraping_data.models import SwaggerProject
+        projet = SwaggerProject.objects.get(name="projet 3")
+        self.assertEqual(projet.endpoint_count, 3)
+        self.assertGreater(projet.spec_size, 0)
+
+        # Sauvegarde sans lire swagger_json : le résumé est conservé
+        autre = SwaggerProject.objects.get(pk=projet.pk)
+        autre.name = "renommé"
+        autre.save()
+        projet.refresh_from_db()
+        self.assertEqual(projet.endpoint_count, 3)
+
+    def test_pagination_curseur_et_recherche(self):
+        url = reverse('scraping_data:project-list-api')
+        page1 = self.client.get(url, {'limit': 4}).json()
+        self.assertEqual([p['name'] for p in page1['results']], [f"projet {i}" for i in (6, 5, 4, 3)])
+        page2 = self.client.get(url, {'limit': 4, 'after': page1['next']}).json()
+        self.assertEqual([p['name'] for p in page2['results']], [f"projet {i}" for i in (2, 1, 0)])
+        self.assertIsNone(page2['next'])
+        retour = self.client.get(url, {'limit': 4, 'before': page2['previous']}).json()
+        self.assertEqual(retour['results'], page1['results'])
+
+        self.assertEqual(self.client.get(url, {'limit': 'x'}).status_code, 400)
+        self.assertEqual(len(self.client.get(url, {'limit': -1}).json()['results']), 1)
+        for curseur in ({'after': 'pas-un-curseur'}, {'before': '2024-13-01T00:00:00_3'}, {'after': '2024-01-01_x'}):
+            self.assertEqual(self.client.get(url, curseur).status_code, 400)
+        self.assertEqual(self.client.get(reverse('scraping_data:list-projects'), {'after': 'x_1'}).status_code, 400)
+
+        recherche = self.client.get(url, {'q': 'api5'}).json()
+        self.assertEqual([p['endpoint_count'] for p in recherche['results']], [5])
+
+    def test_liste_html(self):
+        response = self.client.get(reverse('scraping_data:list-projects'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "This project contains 6 endpoints")
+
+
+# ✅ Tests du blob store compressé
+class BlobStoreTest(TestCase):
+    def test_deduplication_et_lecture_transparente(self):
+        from scraping_data.models import SpecBlob, SwaggerProject
+
+        endpoints = [{"method": "GET", "endpoint": f"/e{i}", "parameters": []} for i in range(200)]
+        p1 = SwaggerProject.objects.create(swagger_url="https://a.example.com", swagger_json=endpoints)
+        p2 = SwaggerProject.objects.create(swagger_url="https://b.example.com", swagger_json=endpoints)
+
+        self.assertEqual(p1.spec_blob_id, p2.spec_blob_id)
+        self.assertEqual(SpecBlob.objects.count(), 1)
+        blob = SpecBlob.objects.get()
+        self.assertLess(len(bytes(blob.data)), blob.size)
+
+        self.assertEqual(SwaggerProject.objects.get(pk=p1.pk).swagger_json, endpoints)
+        self.assertEqual(SwaggerProject.objects.select_related('spec_blob').get(pk=p2.pk).swagger_json, endpoints)
+
+    def test_corps_volumineux_dans_historique(self):
+        from scraping_data import blobstore
+        from scraping_data.models import SpecBlob
+        from scraping_data.runner import archiver_entree, entree_complete, SEUIL_BLOB_REPONSE
+
+        entry = {'response': 'x' * (SEUIL_BLOB_REPONSE + 1)}
+        archive = archiver_entree(entry)
+        self.assertIn('response_blob', archive)
+        self.assertEqual(entree_complete(archive), entry)
+
+        # Blob purgé par un autre processus : l'export garde l'aperçu au lieu d'échouer
+        SpecBlob.objects.filter(pk=archive['response_blob']).delete()
+        blobstore.vider_cache()
+        self.assertEqual(entree_complete(archive)['response'], archive['response'])
+        self.assertTrue(entree_complete(archive)['response_tronquee'])
+
+    def test_cache_borne_et_ramasse_miettes(self):
+        from datetime import timedelta
+        from django.test import override_settings
+        from scraping_data import blobstore
+        from scraping_data.models import SpecBlob, SwaggerProject
+
+        blobstore.vider_cache()
+        petits = [blobstore.stocker_blob(bytes([i]) * 400) for i in range(4)]
+        gros = blobstore.stocker_blob(b"g" * 2000)
+        with override_settings(BLOB_CACHE_MAX_BYTES=1000, BLOB_CACHE_MAX_ENTRY_BYTES=1000):
+            for sha in petits + [gros]:
+                blobstore.lire_blob(sha)
+        # Budget en octets : les deux derniers petits blobs seulement, le gros n'est jamais caché
+        self.assertEqual(list(blobstore._cache), petits[2:])
+        self.assertEqual(blobstore._octets_cache, 800)
+
+        projet = SwaggerProject.objects.create(swagger_url="https://gc.test", swagger_json=[{"method": "GET"}])
+        SpecBlob.objects.update(created_at=SpecBlob.objects.get(pk=gros).created_at - timedelta(days=1))
+        self.assertEqual(blobstore.purger_blobs(simulation=True), {"supprimes": 5, "octets": 3600})
+        self.assertEqual(blobstore.purger_blobs()["supprimes"], 5)
+        self.assertEqual(list(SpecBlob.objects.values_list('pk', flat=True)), [projet.spec_blob_id])
+        self.assertEqual(list(blobstore._cache), [])
+
+
+# ✅ Tests des rapports versionnés (écriture atomique, index, cache)
+class ReportsTest(TestCase):
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.override = override_settings(SWAGGER_REPORTS_DIR=self.tmp.name)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+        self.tmp.cleanup()
+
+    def test_ecritures_paralleles(self):
+        from concurrent.futures import ThreadPoolExecutor
+        from scraping_data.reports import ecrire_rapport, lire_rapport, _lire_index
+        from pathlib import Path
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda i: ecrire_rapport("projet-1", [{"n": i}]), range(16)))
+
+        index = _lire_index(Path(self.tmp.name) / "projet-1")
+        self.assertEqual(len(index["versions"]), 16)
+        self.assertEqual(lire_rapport("projet-1"), json.loads((Path(self.tmp.name) / "projet-1" / f"{index['latest']}.json").read_text()))
+
+    def test_retention_des_versions(self):
+        from pathlib import Path
+        from django.test import override_settings
+        from scraping_data.reports import _lire_index, ecrire_rapport, lire_rapport
+
+        with override_settings(SWAGGER_REPORTS_KEEP=3):
+            chemins = [ecrire_rapport("projet-3", [{"n": i}]) for i in range(5)]
+        dossier = Path(self.tmp.name) / "projet-3"
+        self.assertEqual(sorted(p.name for p in dossier.glob("*.json")),
+                         sorted([p.name for p in chemins[2:]] + ["index.json"]))
+        self.assertEqual(_lire_index(dossier)["versions"], [p.stem for p in chemins[2:]])
+        self.assertEqual(lire_rapport("projet-3"), [{"n": 4}])
+
+    def test_droits_des_fichiers(self):
+        import os
+        import stat
+        from scraping_data.reports import ecrire_rapport
+
+        umask = os.umask(0o022)
+        os.umask(umask)
+        chemin = ecrire_rapport("projet-4", [{"n": 1}])
+        self.assertEqual(stat.S_IMODE(chemin.stat().st_mode), 0o666 & ~umask)
+        self.assertEqual(stat.S_IMODE((chemin.parent / "index.json").stat().st_mode), 0o666 & ~umask)
+
+    def test_lecture_via_cache(self):
+        from scraping_data.reports import ecrire_rapport, lire_rapport
+        from scraping_data.scraper import extract_full_swagger_data
+
+        self.assertIn("erreur", extract_full_swagger_data())
+        ecrire_rapport("projet-2", [{"method": "GET"}])
+        self.assertIs(lire_rapport("projet-2"), lire_rapport("projet-2"))
+        self.assertEqual(extract_full_swagger_data(), [{"method": "GET"}])
+
+
+# ✅ Tests de la recherche plein texte d'endpoints
+class SearchTest(TestCase):
+    def setUp(self):
+        from scraping_data.models import SwaggerProject
+        from scraping_data.search import index_recherche
+
+        index_recherche.vider()
+        self.p1 = SwaggerProject.objects.create(swagger_url="https://a.example.com", swagger_json=[
+            {"method": "GET", "endpoint": "/users/{userId}", "summary": "Get a user", "parameters": [{"name": "userId"}]},
+            {"method": "POST", "endpoint": "/users", "summary": "Create user", "parameters": [], "tags": ["Accounts"]},
+        ])
+        self.p2 = SwaggerProject.objects.create(swagger_url="https://b.example.com", swagger_json=[
+            {"method": "GET", "endpoint": "/orders", "summary": "List orders", "parameters": [{"name": "limit"}]},
+        ])
+
+    def rechercher(self, **params):
+        return self.client.get(reverse('scraping_data:search-endpoints'), params).json()
+
+    def test_termes_prefixe_et_facettes(self):
+        data = self.rechercher(q="use")
+        self.assertEqual(data['total'], 2)
+        self.assertEqual(data['facets']['method'], {'GET': 1, 'POST': 1})
+
+        self.assertEqual(self.rechercher(q="accounts")['results'][0]['endpoint'], "/users")
+        self.assertEqual(self.rechercher(prefix="/ord")['total'], 1)
+        filtre = self.rechercher(q="user", method="GET")
+        self.assertEqual([r['endpoint'] for r in filtre['results']], ["/users/{userId}"])
+        self.assertEqual(filtre['facets']['method'], {'GET': 1, 'POST': 1})
+        par_projet = self.rechercher(project=self.p2.pk)
+        self.assertEqual(par_projet['total'], 1)
+        # La facette projet ignore son propre filtre pour proposer les autres projets
+        self.assertEqual(par_projet['facets']['project'], {str(self.p1.pk): 2, str(self.p2.pk): 1})
+
+    def test_reindexation_incrementale(self):
+        self.assertEqual(self.rechercher(q="orders")['total'], 1)
+        self.p2.swagger_json = [{"method": "GET", "endpoint": "/invoices", "summary": "", "parameters": []}]
+        self.p2.save()
+        self.assertEqual(self.rechercher(q="orders")['total'], 0)
+        self.assertEqual(self.rechercher(q="invoices")['total'], 1)
+        self.p1.delete()
+        self.assertEqual(self.rechercher(q="user")['total'], 0)
+
+    def test_index_hors_de_la_requete(self):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+        from scraping_data.models import SwaggerProject
+
+        self.assertEqual(self.rechercher(q="orders")['total'], 1)  # construit au premier appel
+        SwaggerProject.objects.create(swagger_url="https://c.example.com", swagger_json=[
+            {"method": "GET", "endpoint": "/invoices", "summary": "", "parameters": []}])
+        with CaptureQueriesContext(connection) as requetes:
+            self.assertEqual(self.rechercher(q="invoices")['total'], 1)  # indexé à l'enregistrement
+        self.assertEqual(len(requetes), 0)
+        for params in ({"limit": -1}, {"offset": -5}):
+            reponse = self.client.get(reverse('scraping_data:search-endpoints'), params)
+            self.assertEqual(reponse.status_code, 400)
+
+
+# ✅ Tests du trie de routage et du pré-remplissage du testeur
+class RoutingTest(TestCase):
+    def test_trie(self):
+        from scraping_data.routing import RoutingTrie
+
+        trie = RoutingTrie()
+        trie.inserer("GET", "/users/{id}", 1)
+        trie.inserer("GET", "/users/me", 2)
+        trie.inserer("GET", "/users/{userId}/posts/{postId}", 3)
+        trie.inserer("GET", "/files/{name}.json", 4)
+
+        self.assertEqual(trie.trouver("GET", "/users/42"), (1, {"id": "42"}, "/users/{id}"))
+        self.assertEqual(trie.trouver("GET", "/users/me")[0], 2)
+        self.assertEqual(trie.trouver("GET", "/users/me/posts/7")[1], {"userId": "me", "postId": "7"})
+        self.assertEqual(trie.trouver("GET", "/files/rapport.json")[1], {"name": "rapport"})
+        self.assertIsNone(trie.trouver("POST", "/users/42"))
+
+        trie.retirer("GET", "/users/{userId}/posts/{postId}")
+        self.assertIsNone(trie.trouver("GET", "/users/me/posts/7"))
+        self.assertEqual(trie.taille, 3)
+
+    def test_tester_page_prerempli(self):
+        from scraping_data.catalogue import synchroniser_endpoints
+        from scraping_data.models import SwaggerProject
+
+        projet = SwaggerProject.objects.create(
+            swagger_url="https://api.example.com/v1/v3/api-docs",
+            swagger_json=[{"method": "GET", "endpoint": "/users/{id}", "parameters": [
+                {"name": "id", "in": "path", "value": "valeur"},
+                {"name": "expand", "in": "query", "value": "profile"}]}],
+        )
+        synchroniser_endpoints(projet)
+
+        response = self.client.get(reverse('scraping_data:tester-page'),
+                                   {"method": "GET", "url": "https://api.example.com/v1/users/42"})
+        self.assertEqual(response.context["default_url"], "https://api.example.com/v1/users/{id}")
+        self.assertEqual(json.loads(response.context["default_path_vars"]), {"id": "42"})
+        self.assertEqual(json.loads(response.context["default_params"]), {"expand": "profile"})
+
+        # Re-scraping : le trie est mis à jour de façon incrémentale
+        projet.swagger_json = [{"method": "GET", "endpoint": "/accounts/{id}", "parameters": []}]
+        projet.save()
+        synchroniser_endpoints(projet)
+        response = self.client.get(reverse('scraping_data:tester-page'),
+                                   {"method": "GET", "url": "https://api.example.com/v1/accounts/7"})
+        self.assertEqual(response.context["default_url"], "https://api.example.com/v1/accounts/{id}")
+        self.assertEqual(projet.endpoints.count(), 1)
+
+    def test_endpoints_supprimes_et_prefixe(self):
+        from scraping_data.catalogue import synchroniser_endpoints, trouver_endpoint
+        from scraping_data.models import Endpoint, SwaggerProject
+
+        projet = SwaggerProject.objects.create(swagger_url="https://api.example.com/api/v3/api-docs",
+                                               swagger_json=[{"method": "GET", "endpoint": "/users/{id}"}])
+        synchroniser_endpoints(projet)
+        self.assertIsNotNone(trouver_endpoint("GET", "https://api.example.com/api/users/1")[0])
+        self.assertIsNone(trouver_endpoint("GET", "https://api.example.com/apiv2/users/1")[0])
+
+        # Lignes supprimées sans changement de spec : le trie en cache est reconstruit, pas de DoesNotExist
+        Endpoint.objects.filter(project=projet).delete()
+        endpoint, variables = trouver_endpoint("GET", "https://api.example.com/api/users/1")
+        self.assertEqual((endpoint.endpoint, variables), ("/users/{id}", {"id": "1"}))
+        self.client.post(reverse('scraping_data:clean_tests'), {'project_id': projet.pk})
+        response = self.client.get(reverse('scraping_data:tester-page'),
+                                   {"method": "GET", "url": "https://api.example.com/api/users/1"})
+        self.assertEqual(response.status_code, 200)
+
+
+# ✅ Tests de l'import et du rejeu de trafic HAR / NDJSON
+class ReplayTest(TestCase):
+    HAR = {"log": {"version": "1.2", "creator": {"name": "test"}, "entries": [
+        {"startedDateTime": "2025-01-01T00:00:00.000Z", "request": {
+            "method": "GET", "url": "https://api.example.com/users/42?expand=profile",
+            "headers": [{"name": "Accept", "value": "application/json"}, {"name": "Host", "value": "x"}]}},
+        {"startedDateTime": "2025-01-01T00:00:00.100Z", "request": {
+            "method": "POST", "url": "https://api.example.com/users", "headers": [],
+            "postData": {"mimeType": "application/json", "text": "{\"name\": \"bob\"}"}}},
+        {"startedDateTime": "2025-01-01T00:00:00.200Z", "request": {
+            "method": "GET", "url": "https://api.example.com/unknown", "headers": []}},
+    ]}}
+
+    def test_lecture_en_flux(self):
+        import io
+        from scraping_data.replay import lire_har, normaliser
+
+        # Blocs minuscules : les entrées sont reconstituées à cheval sur plusieurs lectures
+        entrees = list(lire_har(io.StringIO(json.dumps(self.HAR)), taille_bloc=7))
+        self.assertEqual(len(entrees), 3)
+        requete = normaliser(entrees[0])
+        self.assertEqual(requete["url"], "https://api.example.com/users/42")
+        self.assertEqual(requete["params"], {"expand": "profile"})
+        self.assertEqual(requete["headers"], {"Accept": "application/json"})
+        self.assertEqual(normaliser(entrees[1])["body"], {"name": "bob"})
+
+    @patch('requests.request')
+    def test_rejeu(self, mock_request):
+        import io
+        from scraping_data.catalogue import synchroniser_endpoints
+        from scraping_data.models import SwaggerProject
+        from scraping_data.replay import Rejeu, lire_har
+        from scraping_data.runner import test_history
+
+        mock_request.return_value = Mock(status_code=200, text="{}")
+        projet = SwaggerProject.objects.create(swagger_url="https://api.example.com", swagger_json=[
+            {"method": "GET", "endpoint": "/users/{id}", "parameters": []},
+            {"method": "POST", "endpoint": "/users", "parameters": []},
+        ])
+        synchroniser_endpoints(projet)
+
+        stats = Rejeu(projet, mode="scaled", vitesse=10, concurrence=2, base_url="http://127.0.0.1:9").executer(
+            lire_har(io.StringIO(json.dumps(self.HAR))))
+        self.assertEqual((stats["total"], stats["associes"], stats["passed"]), (3, 2, 3))
+        self.assertGreaterEqual(stats["duree_s"], 0.02)
+        urls = sorted(c.args[1] for c in mock_request.call_args_list)
+        self.assertEqual(urls, ["http://127.0.0.1:9/unknown", "http://127.0.0.1:9/users", "http://127.0.0.1:9/users/42"])
+        self.assertEqual(test_history[-1]["source"], "replay")
+
+    @patch('requests.request')
+    def test_rejeu_vers_fichier_et_erreurs(self, mock_request):
+        import io
+        import tempfile
+        from pathlib import Path
+        from django.core.management import CommandError, call_command
+        from scraping_data.catalogue import synchroniser_endpoints
+        from scraping_data.models import SwaggerProject
+
+        projet = SwaggerProject.objects.create(swagger_url="https://api.example.com", swagger_json=[
+            {"method": "GET", "endpoint": "/users/{id}", "parameters": []}])
+        synchroniser_endpoints(projet)
+        with tempfile.TemporaryDirectory() as dossier:
+            capture, sortie = Path(dossier) / "capture.har", Path(dossier) / "resultats.ndjson"
+            capture.write_text(json.dumps(self.HAR), encoding="utf-8")
+            mock_request.return_value = Mock(status_code=200, text="{}")
+            call_command("replay_traffic", projet.pk, str(capture), "--output", str(sortie), stdout=io.StringIO())
+            lignes = [json.loads(ligne) for ligne in sortie.read_text(encoding="utf-8").splitlines()]
+            self.assertEqual(len(lignes), 3)
+            self.assertEqual({ligne["test_status"] for ligne in lignes}, {"passed"})
+
+            mock_request.side_effect = RuntimeError("boum")
+            stderr = io.StringIO()
+            with self.assertRaisesMessage(CommandError, "3 requête(s)"):
+                call_command("replay_traffic", projet.pk, str(capture), stdout=io.StringIO(), stderr=stderr)
+            self.assertIn("RuntimeError: boum", stderr.getvalue())
+
+
+# ✅ Tests du chargement des specs YAML / OpenAPI 3.1 / Swagger 2.0
+class SpecLoaderTest(TestCase):
+    YAML_31 = b"""
+openapi: 3.1.0
+info: {title: Boutique, version: "1.0"}
+paths:
+  /users/{id}:
+    parameters:
+      - {name: id, in: path, required: true, schema: {type: [integer, "null"], examples: [7]}}
+    get:
+      summary: Lire un utilisateur
+      responses:
+        200:
+          content:
+            application/json:
+              schema: {$ref: '#/components/schemas/User'}
+components:
+  schemas:
+    User:
+      type: object
+      properties:
+        created: {type: string, example: 2024-01-01}
+        parent: {$ref: '#/components/schemas/User'}
+"""
+
+    def test_yaml_openapi_31(self):
+        from scraping_data.spec_loader import charger_spec
+        from scraping_data.views import extraire_endpoints
+
+        document = charger_spec(self.YAML_31, "application/x-yaml")
+        self.assertIs(charger_spec(self.YAML_31), document)  # même contenu : pas de nouveau parsing
+        [endpoint] = extraire_endpoints(document)
+        self.assertEqual(endpoint["parameters"], [
+            {"name": "id", "in": "path", "type": "integer", "required": True, "value": 7}])
+        schema = endpoint["responses"]["200"]
+        self.assertEqual(schema["properties"]["created"]["example"], "2024-01-01")
+        self.assertEqual(schema["properties"]["parent"], {"$ref": "#/components/schemas/User"})
+        json.dumps(document)  # les dates YAML restent des chaînes
+
+    def test_swagger_20_definitions(self):
+        from scraping_data.spec_loader import SpecInvalide, charger_spec, detecter_format
+        from scraping_data.views import extraire_endpoints
+
+        spec = {"swagger": "2.0", "paths": {"/users": {"post": {"parameters": [
+            {"name": "corps", "in": "body", "schema": {"$ref": "#/definitions/NewUser"}}]}}},
+            "definitions": {"NewUser": {"required": ["name"], "properties": {
+                "name": {"type": "string", "example": "bob"}, "age": {"type": "integer"}}}}}
+        [endpoint] = extraire_endpoints(charger_spec(json.dumps(spec), url="https://x/spec.yaml"))
+        self.assertEqual([(p["name"], p["in"], p["required"], p["value"]) for p in endpoint["parameters"]],
+                         [("name", "body", True, "bob"), ("age", "body", False, endpoint["parameters"][1]["value"])])
+        self.assertIsInstance(endpoint["parameters"][1]["value"], int)  # générée selon le type, plus "valeur"
+
+        self.assertEqual(detecter_format(b"openapi: 3.0.0", None, "https://x/openapi"), "yaml")
+        self.assertEqual(detecter_format(b"{}", "text/plain", "https://x/spec.json"), "json")
+        with self.assertRaises(SpecInvalide):
+            charger_spec(b"- juste\n- une liste\n")
+
+
+# ✅ Tests de l'assemblage des specs multi-fichiers ($ref externes)
+class BundlerTest(TestCase):
+    FICHIERS = {
+        "openapi.yaml": """
+openapi: 3.0.0
+paths:
+  /users:
+    get:
+      responses:
+        200: {content: {application/json: {schema: {$ref: './schemas/user.yaml'}}}}
+    post:
+      requestBody: {content: {application/json: {schema: {$ref: 'schemas/user.yaml'}}}}
+  /orders:
+    get:
+      responses:
+        200: {content: {application/json: {schema: {$ref: 'common.json#/Order'}}}}
+""",
+        "schemas/user.yaml": """
+type: object
+required: [name]
+properties:
+  name: {type: string, example: alice}
+  friend: {$ref: '#'}
+""",
+        "common.json": json.dumps({"Order": {"type": "object", "properties": {
+            "client": {"$ref": "schemas/user.yaml"}, "total": {"type": "number"}}}}),
+    }
+
+    def setUp(self):
+        import http.server
+        import tempfile
+        import threading
+        from collections import Counter
+        from functools import partial
+        from pathlib import Path
+
+        self.tmp = tempfile.TemporaryDirectory()
+        racine = Path(self.tmp.name) / "www"
+        for nom, contenu in self.FICHIERS.items():
+            (racine / nom).parent.mkdir(parents=True, exist_ok=True)
+            (racine / nom).write_text(contenu)
+
+        self.requetes = requetes = Counter()
+
+        class Handler(http.server.SimpleHTTPRequestHandler):
+            def send_response(self, code, message=None):
+                requetes[(self.path, code)] += 1
+                super().send_response(code, message)
+
+            def log_message(self, *args):
+                pass
+
+        self.serveur = http.server.ThreadingHTTPServer(("127.0.0.1", 0), partial(Handler, directory=str(racine)))
+        threading.Thread(target=self.serveur.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.serveur.server_address[1]}/openapi.yaml"
+
+    def tearDown(self):
+        self.serveur.shutdown()
+        self.serveur.server_close()
+        self.tmp.cleanup()
+
+    def test_assemblage(self):
+        from scraping_data.bundler import AssembleurSpec
+        from scraping_data.spec_loader import resoudre_ref
+        from scraping_data.views import extraire_endpoints
+
+        cache = f"{self.tmp.name}/cache"
+        document = AssembleurSpec(dossier_cache=cache).assembler(self.url)
+        # Chaque document n'est téléchargé qu'une fois, même référencé plusieurs fois
+        self.assertEqual(sorted(p for p, code in self.requetes if code == 200),
+                         ["/common.json", "/openapi.yaml", "/schemas/user.yaml"])
+        self.assertEqual(sum(self.requetes.values()), 3)
+
+        endpoints = {(e["method"], e["endpoint"]): e for e in extraire_endpoints(document)}
+        self.assertEqual([(p["name"], p["required"], p["value"]) for p in endpoints[("POST", "/users")]["parameters"]],
+                         [("name", True, "alice"), ("friend", False, {"name": "alice", "friend": None})])
+        user = endpoints[("GET", "/users")]["responses"]["200"]
+        self.assertEqual(user["properties"]["name"]["type"], "string")
+        # Référence cyclique réécrite en référence locale vers la première copie du schéma
+        ami = document["paths"]["/users"]["get"]["responses"]["200"]["content"]["application/json"]["schema"]
+        self.assertIs(resoudre_ref(document, ami["properties"]["friend"]), ami)
+        client = endpoints[("GET", "/orders")]["responses"]["200"]["properties"]["client"]
+        self.assertEqual(resoudre_ref(document, client)["required"], ["name"])
+
+        # Second assemblage : revalidation conditionnelle depuis le cache disque
+        self.requetes.clear()
+        self.assertEqual(AssembleurSpec(dossier_cache=cache).assembler(self.url), document)
+        self.assertEqual({code for _, code in self.requetes}, {304})
+
+    def test_fichiers_locaux_refuses(self):
+        from pathlib import Path
+
+        from scraping_data.bundler import AssembleurSpec
+        from scraping_data.spec_loader import SpecInvalide
+
+        secret = Path(self.tmp.name) / "secret.yaml"
+        secret.write_text("motdepasse: s3cret\n")
+        racine = Path(self.tmp.name) / "www" / "openapi.yaml"
+        racine.write_text(f"openapi: 3.0.0\npaths: {{/x: {{get: {{responses: {{$ref: 'file://{secret}'}}}}}}}}\n")
+
+        # Spec servie en http : la référence file:// n'est jamais lue, même avec fichiers_locaux
+        for locaux in (False, True):
+            with self.assertRaises(SpecInvalide):
+                AssembleurSpec(dossier_cache=f"{self.tmp.name}/cache", fichiers_locaux=locaux).assembler(self.url)
+        with self.assertRaises(SpecInvalide):
+            AssembleurSpec(dossier_cache=f"{self.tmp.name}/cache").assembler(str(racine))
+        # Racine locale (CLI, tests) : autorisée explicitement
+        document = AssembleurSpec(dossier_cache=f"{self.tmp.name}/cache", fichiers_locaux=True).assembler(str(racine))
+        self.assertEqual(document["paths"]["/x"]["get"]["responses"], {"motdepasse": "s3cret"})
+
+        reponse = self.client.post(reverse('scraping_data:lancer-scraping'), {'swagger_url': str(racine), 'live': '1'})
+        self.assertEqual(reponse.status_code, 400)
+
+
+# ✅ Tests du planificateur de requêtes sortantes (seaux à jetons, AIMD, 429)
+class RateLimitTest(TestCase):
+    def test_seau_et_aimd(self):
+        from scraping_data.ratelimit import ConcurrenceAdaptative, SeauJetons
+
+        seau = SeauJetons(debit=20, capacite=1)
+        attentes = [seau.reserver() for _ in range(3)]
+        self.assertEqual(attentes[0], 0)
+        self.assertAlmostEqual(attentes[2], 0.1, delta=0.01)
+
+        seau.synchroniser(0, 2)  # quota épuisé : pause jusqu'à la réinitialisation
+        self.assertAlmostEqual(seau.reserver(), 2, delta=0.05)
+
+        concurrence = ConcurrenceAdaptative(initiale=8, maximum=10)
+        concurrence.acquerir()
+        concurrence.liberer(limite_atteinte=True)
+        self.assertEqual(concurrence.limite, 4)
+        for _ in range(4):
+            concurrence.acquerir()
+            concurrence.liberer()
+        self.assertAlmostEqual(concurrence.limite, 5, delta=0.1)
+
+    @patch('requests.request')
+    def test_429_rejoue_apres_retry_after(self, mock_request):
+        import time
+        from scraping_data.ratelimit import planificateur
+        from scraping_data.runner import executer_test
+
+        limite = Mock(status_code=429, text="", headers={"Retry-After": "0.2"})
+        ok = Mock(status_code=200, text="{}", headers={"X-RateLimit-Remaining": "50", "X-RateLimit-Reset": "10"})
+        mock_request.side_effect = [limite, ok]
+
+        debut = time.monotonic()
+        entry = executer_test("GET", "http://limite.test/items")
+        self.assertGreaterEqual(time.monotonic() - debut, 0.2)
+        self.assertEqual((entry["test_status"], entry["tentatives"]), ("passed", 2))
+        self.assertEqual(planificateur.seau_hote("limite.test").debit, 5)
+        self.assertAlmostEqual(planificateur.concurrence("limite.test").limite, 16, delta=0.1)  # 32 / 2, puis +1/16
+
+    @patch('requests.request')
+    def test_testeur_interactif_sans_attente(self, mock_request):
+        import time
+
+        mock_request.return_value = Mock(status_code=429, text="lent", headers={"Retry-After": "30"})
+        debut = time.monotonic()
+        reponse = self.client.post(reverse('scraping_data:test-endpoint'), json.dumps(
+            {"method": "GET", "url": "http://interactif.test/items"}), content_type='application/json').json()
+        # 429 amont rendu tel quel, sans nouvel essai ni attente
+        self.assertEqual((reponse["status_code"], reponse["retry_after"], mock_request.call_count), (429, 30, 1))
+
+        # Hôte bloqué par ce 429 : la requête suivante n'attend pas 30 s, elle est refusée localement
+        reponse = self.client.post(reverse('scraping_data:test-endpoint'), json.dumps(
+            {"method": "GET", "url": "http://interactif.test/items"}), content_type='application/json')
+        self.assertLess(time.monotonic() - debut, 1)
+        self.assertEqual((reponse.status_code, reponse["Retry-After"], mock_request.call_count), (429, "30", 1))
+
+
+# ✅ Tests des plans de test (DAG d'appels avec extraction de variables)
+class TestPlanTest(TestCase):
+    def setUp(self):
+        from scraping_data.models import SwaggerProject
+
+        self.projet = SwaggerProject.objects.create(swagger_url="https://plan.test/api", swagger_json=[
+            {"method": "POST", "endpoint": "/users", "parameters": [
+                {"name": "name", "in": "body", "value": "valeur"}, {"name": "age", "in": "body", "value": 1}]},
+            {"method": "GET", "endpoint": "/users/{id}", "parameters": [{"name": "id", "in": "path", "value": "valeur"}]},
+        ])
+        self.steps = [
+            {"id": "creer", "method": "POST", "endpoint": "/users", "body": {"name": "bob"},
+             "extract": {"user_id": "$.data.id", "tags": "$..tag"}},
+            {"id": "lire", "method": "GET", "endpoint": "/users/{id}", "path_vars": {"id": "{{user_id}}"}},
+            {"id": "commandes", "method": "GET", "endpoint": "/orders", "params": {"user": "{{user_id}}"}},
+            {"id": "casse", "method": "GET", "endpoint": "/fail", "depends_on": ["creer"]},
+            {"id": "apres_casse", "method": "GET", "endpoint": "/users/{id}", "depends_on": ["casse"]},
+        ]
+
+    def test_validation(self):
+        from scraping_data.plans import PlanInvalide, extraire, verifier_plan
+
+        self.assertEqual(verifier_plan(self.steps)["lire"], {"creer"})
+        cycle = [{"id": "a", "method": "GET", "endpoint": "/a", "depends_on": ["b"]},
+                 {"id": "b", "method": "GET", "endpoint": "/b", "depends_on": ["a"]}]
+        with self.assertRaisesMessage(PlanInvalide, "Cycle"):
+            verifier_plan(cycle)
+
+        url = reverse('scraping_data:test-plans', args=[self.projet.pk])
+        erreur = self.client.post(url, {"name": "x", "steps": [self.steps[1]]}, content_type="application/json")
+        self.assertEqual((erreur.status_code, erreur.json()["status"]), (400, "error"))
+
+        document = {"data": {"items": [{"id": 1}, {"id": 2}]}}
+        self.assertEqual(extraire(document, "$.data.items[1].id"), 2)
+        self.assertEqual(extraire(document, "$.data.items[*].id"), [1, 2])
+        self.assertEqual(extraire(document, "$..id"), [1, 2])
+
+        mal_types = [
+            ["creer"],
+            [{**self.steps[0], "extract": ["$.data.id"]}],
+            [self.steps[0], {"id": "a", "method": "GET", "endpoint": "/a", "depends_on": "creer"}],
+            [{**self.steps[0], "extract": {"user_id": 3}}],
+        ]
+        for etapes in mal_types:
+            with self.assertRaises(PlanInvalide):
+                verifier_plan(etapes)
+
+    @patch('requests.request')
+    def test_plan_demande_en_masse(self, mock_request):
+        from scraping_data.models import TestPlan
+
+        mock_request.return_value = Mock(status_code=200, text="{}")
+        for plan in ("999", "abc"):
+            reponse = self.client.get(reverse('scraping_data:run-tests'), {"id": self.projet.pk, "plan": plan})
+            self.assertEqual(reponse.status_code, 404)
+        plan = TestPlan.objects.create(project=self.projet, name="p", steps=[self.steps[2]], variables={"user_id": 1})
+        with patch('scraping_data.views.executer_plan', return_value={"etapes": []}) as executer:
+            self.client.get(reverse('scraping_data:run-tests'), {"plan": plan.pk, "concurrency": 2})
+        self.assertEqual(executer.call_count, 1)  # seul le projet du plan
+        self.assertEqual(executer.call_args.kwargs["concurrence"], 2)
+
+    @patch('requests.request')
+    def test_execution_parallele(self, mock_request):
+        import threading
+        import time
+
+        actives, max_actives, verrou = [0], [0], threading.Lock()
+
+        def repondre(method, url, **kwargs):
+            with verrou:
+                actives[0] += 1
+                max_actives[0] = max(max_actives[0], actives[0])
+            time.sleep(0.05)
+            with verrou:
+                actives[0] -= 1
+            if method == "POST":
+                self.assertEqual(kwargs["json"], {"name": "bob", "age": 1})
+                return Mock(status_code=201, text=json.dumps({"data": {"id": 42, "tags": [{"tag": "vip"}]}}))
+            if url.endswith("/fail"):
+                return Mock(status_code=500, text="boom")
+            return Mock(status_code=200, text=json.dumps({"url": url, "params": kwargs["params"]}))
+
+        mock_request.side_effect = repondre
+        url = reverse('scraping_data:test-plans', args=[self.projet.pk])
+        plan = self.client.post(url, {"name": "Parcours", "steps": self.steps}, content_type="application/json").json()
+
+        resultat = self.client.post(reverse('scraping_data:test-plan-run', args=[plan["id"]])).json()
+        etapes = {e["etape"]: e for e in resultat["etapes"]}
+        self.assertEqual(resultat["status"], "failed")
+        self.assertEqual(etapes["creer"]["variables"], {"user_id": 42, "tags": ["vip"]})
+        self.assertEqual(etapes["lire"]["endpoint"], "GET https://plan.test/api/users/42")
+        self.assertIn('"user": 42', etapes["commandes"]["details"])
+        self.assertEqual([etapes[i]["status"] for i in ("lire", "casse", "apres_casse")], ["passed", "failed", "skipped"])
+        self.assertEqual(max_actives[0], 3)  # lire, commandes et casse en parallèle
+        self.assertGreaterEqual(etapes["lire"]["debut_ms"], etapes["creer"]["duree_ms"])
+
+
+# ✅ Tests du générateur de valeurs à partir des schémas
+class GenerateurTest(TestCase):
+    def test_valeurs_valides_et_reproductibles(self):
+        import re
+        from scraping_data.generators import generer_valeur
+
+        schema = {"type": "object", "required": ["code"], "properties": {
+            "code": {"type": "string", "pattern": r"^[A-Z]{3}-\d{2,4}$"},
+            "age": {"type": "integer", "minimum": 18, "maximum": 20},
+            "prix": {"type": "number", "exclusiveMinimum": 0, "maximum": 5, "multipleOf": 0.5},
+            "statut": {"enum": ["actif", "inactif"]},
+            "email": {"type": "string", "format": "email"},
+            "id": {"type": "string", "format": "uuid"},
+            "nom": {"type": "string", "minLength": 12, "maxLength": 15},
+            "tags": {"type": "array", "items": {"type": "string"}, "minItems": 2},
+        }}
+        for graine in range(20):
+            valeur = generer_valeur(schema, graine)
+            self.assertRegex(valeur["code"], r"^[A-Z]{3}-\d{2,4}$")
+            self.assertIn(valeur["age"], (18, 19, 20))
+            self.assertTrue(0 < valeur["prix"] <= 5 and valeur["prix"] % 0.5 == 0)
+            self.assertIn(valeur["statut"], ("actif", "inactif"))
+            self.assertRegex(valeur["email"], r"^[a-z0-9]+@example\.com$")
+            self.assertRegex(valeur["id"], r"^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}$")
+            self.assertTrue(12 <= len(valeur["nom"]) <= 15)
+            self.assertGreaterEqual(len(valeur["tags"]), 2)
+        # Même graine : même valeur ; la copie retournée peut être modifiée sans toucher au cache
+        premiere = generer_valeur(schema, 3)
+        premiere["code"] = "modifie"
+        self.assertEqual(generer_valeur(schema, 3), generer_valeur(schema, 3))
+        self.assertNotEqual(generer_valeur(schema, 3)["code"], "modifie")
+        self.assertTrue(re.fullmatch(r"[A-Z]{3}-\d{2,4}", generer_valeur(schema, 3)["code"]))
+
+    def test_extraction_et_fuzz(self):
+        from scraping_data.generators import endpoint_fuzz, generer_valeur
+        from scraping_data.views import extraire_endpoints
+
+        [endpoint] = extraire_endpoints({"openapi": "3.0.0", "paths": {"/items": {"get": {"parameters": [
+            {"name": "limit", "in": "query", "schema": {"type": "integer", "minimum": 1, "maximum": 100}},
+            {"name": "sort", "in": "query", "schema": {"type": "string", "enum": ["asc", "desc"], "default": "asc"}},
+        ]}}}})
+        limit, sort = endpoint["parameters"]
+        self.assertTrue(1 <= limit["value"] <= 100)
+        self.assertEqual(limit["schema"], {"type": "integer", "minimum": 1, "maximum": 100})
+        self.assertEqual(sort["value"], "asc")  # valeur documentée prioritaire
+
+        valeurs = {endpoint_fuzz(endpoint, graine)["parameters"][0]["value"] for graine in range(30)}
+        self.assertTrue(valeurs <= set(range(1, 101)))
+        self.assertTrue({1, 100} <= valeurs)  # le fuzz explore les bornes
+        # Paramètres de même schéma : valeurs indépendantes
+        jumeaux = {**endpoint, "parameters": [{"name": n, "in": "query", "schema": {"type": "string"}} for n in "ab"]}
+        paires = [[p["value"] for p in endpoint_fuzz(jumeaux, graine)["parameters"]] for graine in range(10)]
+        self.assertTrue(any(a != b for a, b in paires))
+        nullable = [generer_valeur({"type": ["string", "null"]}, graine, fuzz=True) for graine in range(50)]
+        self.assertIn(None, nullable)
+        self.assertIsInstance(generer_valeur({"type": ["string", "null"]}), str)
+
+    def test_bornes_contradictoires(self):
+        from scraping_data.generators import generer_valeur
+
+        schemas = [
+            {"type": "integer", "minimum": 5, "maximum": 5, "exclusiveMaximum": True},
+            {"type": "integer", "minimum": 10, "maximum": 3},
+            {"type": "number", "minimum": 2, "exclusiveMaximum": 2},
+            {"type": "string", "minLength": 10, "maxLength": 4},
+            {"type": "array", "items": {"type": "integer"}, "minItems": 3, "maxItems": 1},
+        ]
+        for schema in schemas:
+            for graine in range(10):
+                generer_valeur(schema, graine, fuzz=True)  # pas d'exception randint
+        self.assertEqual(generer_valeur(schemas[1]), 10)
+        self.assertEqual(len(generer_valeur(schemas[3])), 10)
+        self.assertEqual(len(generer_valeur(schemas[4])), 3)
+
+
+# ✅ Tests de la validation des réponses contre les schémas documentés
+class ValidationTest(TestCase):
+    SCHEMA = {"type": "object", "required": ["id", "email"], "additionalProperties": False, "properties": {
+        "id": {"type": "integer", "minimum": 1},
+        "email": {"type": "string", "format": "email"},
+        "roles": {"type": "array", "items": {"enum": ["admin", "user"]}},
+        "parent": {"type": ["object", "null"], "properties": {"id": {"type": "integer"}}},
+    }}
+
+    def test_violations_par_champ(self):
+        from scraping_data.validation import validateur, valider_reponse
+
+        valider = validateur(self.SCHEMA)
+        self.assertIs(validateur(json.loads(json.dumps(self.SCHEMA))), valider)  # compilé une seule fois
+        self.assertEqual(valider_reponse(valider, json.dumps({"id": 3, "email": "a@b.io", "parent": None})), [])
+        violations = valider_reponse(valider, json.dumps(
+            {"id": 0, "roles": ["admin", "root"], "parent": {"id": "x"}, "extra": 1}))
+        self.assertEqual({v["champ"] for v in violations},
+                         {"$.email", "$.id", "$.roles[1]", "$.parent.id", "$.extra"})
+        self.assertEqual(valider_reponse(valider, "<html>"), [{"champ": "$", "erreur": "réponse non JSON"}])
+
+    @patch('requests.request')
+    def test_taux_par_endpoint(self, mock_request):
+        from scraping_data.models import SwaggerProject
+        from scraping_data.runner import executer_charge
+
+        projet = SwaggerProject.objects.create(swagger_url="https://valid.test", swagger_json=[
+            {"method": "GET", "endpoint": "/users/1", "parameters": [], "responses": {"200": self.SCHEMA}},
+            {"method": "GET", "endpoint": "/ping", "parameters": []},
+        ])
+        reponses = iter([{"id": 1, "email": "a@b.io"}, {}, {"id": 2, "email": "x"}, {}])
+        mock_request.side_effect = lambda *a, **k: Mock(status_code=200, text=json.dumps(next(reponses)))
+
+        stats = executer_charge(projet, repetitions=2)
+        self.assertEqual(stats["violations_schema"], {"GET https://valid.test/users/1": {
+            "reponses": 2, "invalides": 1, "taux": 0.5, "champs": {"$.email": 1}}})
+        self.assertEqual(stats["echecs"], 1)  # statut 200 mais schéma non respecté : échec, comme en CLI
+
+    @patch('requests.request')
+    def test_validateur_resolu_une_fois_par_endpoint(self, mock_request):
+        from scraping_data import validation
+        from scraping_data.models import SwaggerProject
+        from scraping_data.runner import executer_tests
+
+        projet = SwaggerProject.objects.create(swagger_url="https://valid.test", swagger_json=[
+            {"method": "GET", "endpoint": f"/users/{i}", "parameters": [], "responses": {"200": self.SCHEMA}}
+            for i in range(2)] * 5)
+        mock_request.return_value = Mock(status_code=200, text=json.dumps({"id": 1, "email": "a@b.io"}))
+        with patch('scraping_data.validation.validateur', wraps=validation.validateur) as resoudre:
+            resultats = executer_tests(projet)
+        self.assertEqual([r["schema_valide"] for r in resultats], [True] * 10)
+        self.assertEqual(resoudre.call_count, 2)  # pas de json.dumps du schéma à chaque réponse
+
+
+# ✅ Tests du document OpenAPI mis en cache (/swagger/?format=openapi)
+class SchemaCacheTest(TestCase):
+    def setUp(self):
+        import tempfile
+        from django.test import override_settings
+        from myproject.schema import schema_en_cache
+
+        self.tmp = tempfile.TemporaryDirectory()
+        self.reglages = override_settings(SCHEMA_CACHE_DIR=self.tmp.name, SCHEMA_CACHE_VERSION="build-1")
+        self.reglages.enable()
+        schema_en_cache.invalider()
+        schema_en_cache.generations = 0
+
+    def tearDown(self):
+        from myproject.schema import schema_en_cache
+
+        self.reglages.disable()
+        schema_en_cache.invalider()
+        self.tmp.cleanup()
+
+    def test_etag_gzip_et_generation_unique(self):
+        import gzip
+        from myproject.schema import SchemaEnCache, schema_en_cache
+
+        premiere = self.client.get('/swagger/?format=openapi')
+        self.assertEqual(premiere.status_code, 200)
+        self.assertIn("paths", json.loads(premiere.content))
+        etag = premiere["ETag"]
+
+        self.assertEqual(self.client.get('/swagger/?format=openapi', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        compresse = self.client.get('/swagger.json', HTTP_ACCEPT_ENCODING="gzip, br")
+        self.assertEqual(compresse["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(compresse.content), premiere.content)
+        # Un ETag par représentation : celui du JSON brut ne valide pas la version gzip
+        self.assertEqual(compresse["ETag"], f'{etag[:-1]}-gz"')
+        self.assertIn("Accept-Encoding", compresse["Vary"])
+        self.assertEqual(self.client.get('/swagger.json', HTTP_ACCEPT_ENCODING="gzip",
+                                         HTTP_IF_NONE_MATCH=etag).status_code, 200)
+        self.assertEqual(self.client.get('/swagger.json', HTTP_ACCEPT_ENCODING="gzip",
+                                         HTTP_IF_NONE_MATCH=compresse["ETag"]).status_code, 304)
+        self.assertEqual(schema_en_cache.generations, 1)
+
+        # Autre processus, même déploiement : relu depuis le disque sans régénération
+        autre = SchemaEnCache()
+        self.assertEqual(autre.obtenir()[3], etag)
+        self.assertEqual(autre.generations, 0)
+
+    def test_invalidation_au_deploiement(self):
+        from django.test import override_settings
+        from myproject.schema import empreinte_deploiement, schema_en_cache
+
+        schema_en_cache.obtenir()
+        with override_settings(SCHEMA_CACHE_VERSION="build-2"):
+            empreinte_deploiement.cache_clear()
+            schema_en_cache.obtenir()
+        self.assertEqual(schema_en_cache.generations, 2)
+        empreinte_deploiement.cache_clear()
+
+
+# ✅ Tests de la commande run_endpoint_tests (CI : shards, NDJSON, JUnit)
+class RunEndpointTestsCommandTest(TestCase):
+    def setUp(self):
+        from scraping_data.models import SwaggerProject
+
+        self.projet = SwaggerProject.objects.create(name="ci", swagger_url="https://ci.test", swagger_json=[
+            {"method": "GET" if i % 3 else "POST", "endpoint": f"/items/{i}", "parameters": []} for i in range(30)
+        ])
+
+    def test_shards_partition_complete(self):
+        from scraping_data.management.commands.run_endpoint_tests import filtrer
+
+        endpoints = self.projet.swagger_json
+        shards = [list(filtrer(endpoints, shard=(i, 4))) for i in range(1, 5)]
+        cles = [ep["endpoint"] for shard in shards for ep in shard]
+        self.assertEqual(sorted(cles), sorted(ep["endpoint"] for ep in endpoints))  # ni doublon ni oubli
+        self.assertEqual(shards[1], list(filtrer(endpoints, shard=(2, 4))))  # déterministe
+        self.assertTrue(all(ep["method"] == "POST" for ep in filtrer(endpoints, methodes=["post"])))
+
+    @patch('requests.request')
+    def test_ndjson_et_junit(self, mock_request):
+        import io
+        import os
+        import tempfile
+        import xml.etree.ElementTree as ET
+        from django.core.management import CommandError, call_command
+
+        mock_request.side_effect = lambda method, url, **k: Mock(
+            status_code=500 if url.endswith("/items/3") else 200, text="{}")
+        with tempfile.TemporaryDirectory() as dossier:
+            ndjson, junit = os.path.join(dossier, "r.ndjson"), os.path.join(dossier, "r.xml")
+            with self.assertRaises(CommandError) as erreur:
+                call_command("run_endpoint_tests", self.projet.pk, "--method", "POST", "--concurrency", "4",
+                             "--ndjson", ndjson, "--junit", junit, stderr=io.StringIO())
+            self.assertEqual(erreur.exception.returncode, 1)
+
+            with open(ndjson, encoding="utf-8") as f:
+                lignes = [json.loads(ligne) for ligne in f]
+            self.assertEqual(len(lignes), 10)
+            suite = ET.parse(junit).getroot()
+            self.assertEqual((suite.get("tests"), suite.get("failures"), suite.get("errors")), ("10", "1", "0"))
+            self.assertEqual([c.get("name") for c in suite.iter("testcase") if c.find("failure") is not None],
+                             ["POST https://ci.test/items/3"])
+
+
+# ✅ Tests des campagnes distribuées (baux, reprise, écriture groupée)
+class SweepTest(TestCase):
+    def setUp(self):
+        from scraping_data.models import SwaggerProject
+        from scraping_data.sweeps import creer_sweep
+
+        projet = SwaggerProject.objects.create(swagger_url="https://sweep.test", swagger_json=[
+            {"method": "GET", "endpoint": f"/items/{i}", "parameters": []} for i in range(25)
+        ])
+        self.sweep = creer_sweep(projet)
+
+    def test_baux_disjoints_reprise_et_ecriture_perimee(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from scraping_data.models import WorkItem
+        from scraping_data.sweeps import ecrire_resultats, louer, recuperer_baux_expires
+
+        jeton_a, lot_a = louer("a", taille=10)
+        jeton_b, lot_b = louer("b", taille=10)
+        self.assertEqual(len(lot_a), 10)
+        self.assertFalse({i.pk for i in lot_a} & {i.pk for i in lot_b})
+
+        # Le worker "a" disparaît : son bail expire, les items sont repris par "c"
+        WorkItem.objects.filter(lease_token=jeton_a).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(recuperer_baux_expires(), (10, 0))
+        jeton_c, lot_c = louer("c", taille=30)
+        self.assertEqual(len(lot_c), 15)
+        self.assertEqual(ecrire_resultats(jeton_a, {i.pk: {"status": "passed"} for i in lot_a}), 0)  # bail perdu
+        self.assertEqual(ecrire_resultats(jeton_c, {i.pk: {"status": "passed"} for i in lot_c}), 15)
+
+    @patch('requests.request')
+    def test_worker_jusqua_la_fin(self, mock_request):
+        from django.db import close_old_connections
+        from scraping_data.sweeps import Worker, bilan
+
+        mock_request.side_effect = lambda method, url, **k: Mock(
+            status_code=404 if url.endswith("/items/7") else 200, text="{}")
+        worker = Worker(taille_lot=6, concurrence=3)
+        fermees = []
+        fermer = worker._fermer_connexions_pool
+
+        def fermer_et_compter():
+            fermees.append(len(worker._connexions_pool))
+            fermer()
+
+        with patch('scraping_data.sweeps.close_old_connections', wraps=close_old_connections) as recycler, \
+                patch.object(worker, '_fermer_connexions_pool', fermer_et_compter):
+            self.assertEqual(worker.executer(), 25)
+        self.assertEqual(recycler.call_count, 25)  # par item : connexion recyclée selon CONN_MAX_AGE
+        self.assertEqual(len(fermees), 1)  # à l'arrêt : une fermeture par thread du pool
+        self.assertTrue(1 <= fermees[0] <= 3)
+        self.assertEqual(worker._connexions_pool, set())
+        self.sweep.refresh_from_db()
+        rapport = bilan(self.sweep)
+        self.assertEqual((rapport["status"], rapport["items"], rapport["echecs"]), ("done", {"done": 25}, 1))
+
+
+# ✅ Tests du flux d'événements SSE (reprise, contre-pression, tests en direct)
+class EvenementsTest(TestCase):
+    def test_reprise_et_evenements_perdus(self):
+        from scraping_data.events import Canal
+
+        canal = Canal(taille=3, attente_max_s=0)
+        for i in range(5):
+            canal.publier("resultat", {"i": i})
+        evenements, perdus = canal.lire("client", 3, timeout=0)
+        self.assertEqual(([e[0] for e in evenements], perdus), ([4, 5], 0))
+        evenements, perdus = canal.lire("retard", 0, timeout=0)
+        self.assertEqual(([e[0] for e in evenements], perdus), ([3, 4, 5], 2))
+
+    def test_contre_pression(self):
+        import threading
+        from scraping_data.events import Canal
+
+        canal = Canal(taille=2, attente_max_s=5)
+        canal.lire("client", 0, timeout=0)
+        canal.publier("a")
+        canal.publier("b")
+        producteur = threading.Thread(target=canal.publier, args=("c",))
+        producteur.start()
+        producteur.join(0.2)
+        self.assertTrue(producteur.is_alive())  # tampon plein, non lu : le producteur attend
+        canal.lire("client", 0, timeout=0)
+        producteur.join(1)
+        self.assertFalse(producteur.is_alive())
+        self.assertEqual(canal.dernier_id, 3)
+
+    def test_abonne_bloque_decroche(self):
+        import time
+        from scraping_data.events import Canal
+
+        canal = Canal(taille=2, attente_max_s=0.2)
+        canal.lire("client", 0, timeout=0)
+        canal.publier("a")
+        canal.publier("b")
+        canal.publier("c")  # attend 0,2 s puis décroche l'abonné qui ne lit plus
+        debut = time.monotonic()
+        for i in range(5):
+            canal.publier("suite", {"i": i})
+        self.assertLess(time.monotonic() - debut, 0.1)
+        evenements, perdus = canal.lire("client", 0, timeout=0)
+        self.assertEqual(([e[0] for e in evenements], perdus), ([7, 8], 6))
+
+    @patch('requests.request')
+    def test_tests_en_direct(self, mock_request):
+        from scraping_data.models import SwaggerProject
+
+        projet = SwaggerProject.objects.create(swagger_url="https://live.test", swagger_json=[
+            {"method": "GET", "endpoint": f"/items/{i}", "parameters": []} for i in range(3)
+        ])
+        mock_request.return_value = Mock(status_code=200, text="{}")
+        reponse = self.client.get(reverse("scraping_data:tester-tous"), {"id": projet.pk, "live": 1},
+                                  HTTP_ACCEPT="application/json")
+        self.assertEqual(reponse.status_code, 202)
+        events_url = reponse.json()["events_url"]
+
+        flux = self.client.get(events_url)
+        self.assertEqual(flux["Content-Type"], "text/event-stream; charset=utf-8")
+        texte = b"".join(flux.streaming_content).decode()
+        self.assertEqual(texte.count("event: resultat"), 3)
+        self.assertIn('"faits": 3, "echecs": 0', texte)
+
+        # Reconnexion : seuls les événements postérieurs à Last-Event-ID sont renvoyés
+        reprise = b"".join(self.client.get(events_url, HTTP_LAST_EVENT_ID="4").streaming_content).decode()
+        self.assertEqual(reprise.count("event: "), 1)
+        self.assertIn("event: fin", reprise)
+
+
+# ✅ Tests de la supervision synthétique (agrégats, rétention, planification)
+class MonitoringTest(TestCase):
+    def setUp(self):
+        from scraping_data.models import Endpoint, Monitor, SwaggerProject
+
+        projet = SwaggerProject.objects.create(swagger_url="https://mon.test")
+        self.monitors = [
+            Monitor.objects.create(endpoint=Endpoint.objects.create(
+                project=projet, method="GET", endpoint=f"/health/{i}", url_complete=f"https://mon.test/health/{i}",
+                cleaned_url=f"https://mon.test/health/{i}"), interval_seconds=60)
+            for i in range(3)
+        ]
+
+    def test_agregats_serie_et_retention(self):
+        from datetime import datetime, timedelta, timezone
+        from scraping_data.models import CheckResult, CheckRollup
+        from scraping_data.monitoring import enregistrer, purger, serie
+
+        monitor = self.monitors[0]
+        debut = datetime(2026, 1, 1, 10, 0, tzinfo=timezone.utc)
+        for secondes, ok, duree in [(0, True, 10), (30, True, 30), (70, False, 50), (100, True, 20)]:
+            enregistrer(monitor.pk, debut + timedelta(seconds=secondes), ok, 200 if ok else 503, duree)
+
+        minutes = list(CheckRollup.objects.filter(resolution=60).order_by('bucket').values_list(
+            'count', 'failures', 'duration_min', 'duration_max'))
+        self.assertEqual(minutes, [(2, 0, 10, 30), (2, 1, 20, 50)])
+        heure = CheckRollup.objects.get(resolution=3600)
+        self.assertEqual((heure.count, heure.failures, heure.duration_sum), (4, 1, 110))
+
+        jour = serie(monitor, debut - timedelta(hours=12), debut + timedelta(hours=12))
+        self.assertEqual((jour["resolution"], jour["availability"], len(jour["points"])), (60, 0.75, 2))
+        self.assertEqual(serie(monitor, debut, debut + timedelta(hours=1))["resolution"], 0)
+
+        # Rétention : les mesures brutes partent avant les agrégats
+        purges = purger(debut + timedelta(days=3))
+        self.assertEqual(purges, {"raw": 4, "1m": 0, "1h": 0})
+        self.assertFalse(CheckResult.objects.exists())
+        self.assertEqual(serie(monitor, debut - timedelta(days=3), debut + timedelta(days=3))["points"][0]["count"], 4)
+
+    def test_executions_manquees_et_plafond_par_projet(self):
+        from datetime import timedelta
+        from django.utils import timezone
+        from scraping_data.models import Monitor
+        from scraping_data.monitoring import Ordonnanceur
+
+        maintenant = timezone.now()
+        Monitor.objects.update(next_run_at=maintenant - timedelta(seconds=330))  # 5 exécutions manquées
+        soumis = []
+        executor = Mock(submit=lambda *args: soumis.append(args))
+
+        ordonnanceur = Ordonnanceur(concurrence=10, par_projet=2, gigue=0)
+        self.assertEqual(ordonnanceur.tour(executor, maintenant), 2)  # plafond par projet
+        lance = Monitor.objects.get(pk=soumis[0][1].pk)
+        self.assertEqual(lance.missed_runs, 5)
+        self.assertEqual(lance.next_run_at, maintenant + timedelta(seconds=30))  # cadence conservée, sans rafale
+
+        # Un autre processus a déjà réclamé le monitor : la réclamation échoue
+        self.assertFalse(Ordonnanceur(gigue=0).reclamer(soumis[0][1], maintenant))
+
+    def test_creation_monitor_valide_les_champs(self):
+        from django.urls import reverse
+        from scraping_data.models import Monitor
+
+        monitor = self.monitors[0]
+        url = reverse('scraping_data:monitors', args=[monitor.endpoint.project_id])
+        for donnees in ({"endpoint": "abc"}, {"endpoint": None}, {"endpoint": monitor.endpoint_id, "expect_status": "ok"},
+                        {"endpoint": monitor.endpoint_id, "expect_status": 42}):
+            self.assertEqual(self.client.post(url, donnees, content_type="application/json").status_code, 400, donnees)
+        self.assertEqual(Monitor.objects.count(), 3)
+
+        reponse = self.client.post(url, {"endpoint": str(monitor.endpoint_id), "expect_status": "204"},
+                                   content_type="application/json")
+        self.assertEqual(reponse.status_code, 201)
+        self.assertEqual(reponse.json()["expect_status"], 204)
+
+    @patch('scraping_data.monitoring.controler', side_effect=RuntimeError("panne"))
+    def test_exception_du_controle_enregistree_en_echec(self, mock_controler):
+        from scraping_data.models import CheckResult
+        from scraping_data.monitoring import Ordonnanceur
+
+        ordonnanceur = Ordonnanceur(gigue=0)
+        projet_id = self.monitors[0].endpoint.project_id
+        ordonnanceur.en_cours[projet_id] = 1
+        with self.assertLogs('scraping_data.monitoring', level='ERROR'):
+            ordonnanceur._controler(self.monitors[0], projet_id)
+        resultat = CheckResult.objects.get(monitor=self.monitors[0])
+        self.assertEqual((resultat.ok, resultat.status_code), (False, None))
+        self.assertEqual(ordonnanceur.en_cours[projet_id], 0)
+
+
+# ✅ Tests de l'historique des versions de spec (instantanés + deltas)
+class SpecVersionTest(TestCase):
+    def spec(self, n, modifies=(), retires=()):
+        return [
+            {"method": "GET", "endpoint": f"/r/{i}", "summary": "v2" if i in modifies else "",
+             "parameters": [{"name": "id", "in": "path"}] + ([{"name": "q", "in": "query"}] if i in modifies else [])}
+            for i in range(n) if i not in retires
+        ]
+
+    def test_versions_deltas_et_diff(self):
+        from django.test import override_settings
+        from scraping_data.models import SwaggerProject
+        from scraping_data.versions import contenu_version, diff_versions, enregistrer_version
+
+        projet = SwaggerProject.objects.create(swagger_url="https://v.test", swagger_json=self.spec(50))
+        specs = [self.spec(50), self.spec(51), self.spec(51, modifies={3}), self.spec(51, modifies={3}, retires={7})]
+        with override_settings(SPEC_SNAPSHOT_INTERVAL=3):
+            for i, spec in enumerate(specs):
+                if i:
+                    projet.swagger_json = spec
+                    projet.save()
+                enregistrer_version(projet)
+            self.assertEqual(enregistrer_version(projet).number, 4)  # contenu identique : pas de nouvelle version
+
+        versions = list(projet.spec_versions.order_by('number').values_list('number', 'snapshot_blob_id', 'delta_blob_id'))
+        self.assertEqual([(n, s is not None, d is not None) for n, s, d in versions],
+                         [(1, True, False), (2, False, True), (3, False, True), (4, True, True)])
+        for numero, spec in enumerate(specs, start=1):
+            self.assertEqual(contenu_version(projet, numero), spec)
+
+        diff = diff_versions(projet, 1, 4)
+        self.assertEqual((diff["added"], diff["removed"]), (["GET /r/50"], ["GET /r/7"]))
+        self.assertEqual(diff["changed"], {"GET /r/3": {
+            "parameters": {"added": ["query:q"], "removed": [], "changed": []}, "fields": ["summary"]}})
+        inverse = diff_versions(projet, 4, 1)
+        self.assertEqual((inverse["added"], inverse["removed"]), (["GET /r/7"], ["GET /r/50"]))
+
+    @patch('scraping_data.views.scrape_swagger')
+    def test_rescraping_reutilise_le_projet(self, mock_scrape):
+        import tempfile
+        from django.test import override_settings
+        from scraping_data.models import SwaggerProject
+
+        url = "https://rescrape.test/v3/api-docs"
+        with tempfile.TemporaryDirectory() as dossier, override_settings(SWAGGER_REPORTS_DIR=dossier):
+            for spec in (self.spec(3), self.spec(4)):
+                mock_scrape.return_value = spec
+                self.client.post(reverse('scraping_data:lancer-scraping'), {'swagger_url': url})
+        projet = SwaggerProject.objects.get(swagger_url=url)
+        self.assertEqual(projet.endpoint_count, 4)
+        diff = self.client.get(reverse('scraping_data:spec-version-diff', args=[projet.pk]), {'from': 1, 'to': 2}).json()
+        self.assertEqual(diff["added"], ["GET /r/3"])
+
+
+# ✅ Tests des réponses de référence (golden) et du diff structurel
+class GoldenResponseTest(TestCase):
+    def test_diff_structurel_et_chemins_ignores(self):
+        from scraping_data.golden import arbre, comparer, compiler_motifs, differences
+
+        reference = {"data": [{"id": 1, "nom": "a", "maj": "t1"}, {"id": 2, "nom": "b", "maj": "t1"}],
+                     "meta": {"total": 2, "genere": "t1"}}
+        nouvelle = {"data": [{"id": 1, "nom": "a", "maj": "t2"}, {"id": 2, "nom": "B", "maj": "t2"}],
+                    "meta": {"total": 2, "genere": "t2"}, "suivant": None}
+        ignores = ["$..maj", "$.meta.genere"]
+        self.assertEqual(comparer(json.dumps(reference), json.dumps(nouvelle), ignores), [
+            {"path": "$.data[1].nom", "change": "changed", "before": "b", "after": "B"},
+            {"path": "$.suivant", "change": "added", "after": None},
+        ])
+
+        # Sous-arbres inchangés (hors chemins ignorés) : même empreinte, le diff ne les parcourt pas
+        motifs = compiler_motifs(tuple(ignores))
+        a, b = arbre(reference, motifs), arbre(nouvelle, motifs)
+        self.assertEqual(a[1]["data"][1][0][0], b[1]["data"][1][0][0])
+        self.assertEqual(a[1]["meta"][0], b[1]["meta"][0])
+        self.assertEqual(differences(a, a), [])
+
+    @patch('requests.request')
+    def test_regression_detectee_en_masse(self, mock_request):
+        from scraping_data.models import GoldenResponse, SwaggerProject
+        from scraping_data.runner import en_echec, executer_tests
+
+        projet = SwaggerProject.objects.create(swagger_url="https://golden.test", swagger_json=[
+            {"method": "GET", "endpoint": "/items/{id}", "parameters": [{"name": "id", "in": "path", "value": 1}]},
+        ])
+        mock_request.return_value = Mock(status_code=200, text='{"id": 1, "prix": 10, "vu": "lundi"}')
+        executer_tests(projet, enregistrer_goldens=True)
+        golden = GoldenResponse.objects.get()
+        self.assertEqual((golden.endpoint, golden.parameters["path_vars"]), ("/items/{id}", {"id": "1"}))
+        GoldenResponse.objects.update(ignore_paths=["$.vu"])
+
+        mock_request.return_value = Mock(status_code=200, text='{"id": 1, "prix": 10, "vu": "mardi"}')
+        self.assertIs(executer_tests(projet)[0]["golden_ok"], True)
+
+        mock_request.return_value = Mock(status_code=200, text='{"id": 1, "prix": 12, "vu": "mardi"}')
+        resultat = executer_tests(projet)[0]
+        self.assertTrue(en_echec(resultat))
+        self.assertEqual(resultat["golden_differences"], [{"path": "$.prix", "change": "changed", "before": 10, "after": 12}])
+
+    @patch('requests.request')
+    def test_chemins_ignores_valides_avant_appel(self, mock_request):
+        from scraping_data.models import GoldenResponse, SwaggerProject
+
+        projet = SwaggerProject.objects.create(swagger_url="https://golden.test", swagger_json=[
+            {"method": "GET", "endpoint": "/items", "parameters": []}])
+        url = reverse('scraping_data:goldens', args=[projet.pk])
+        for ignore_paths in (["$.ok", 3], ["$.ok", {"a": 1}], ["sans-dollar"], "$.vu"):
+            reponse = self.client.post(url, {"method": "GET", "endpoint": "/items", "ignore_paths": ignore_paths},
+                                       content_type='application/json')
+            self.assertEqual(reponse.status_code, 400)
+        mock_request.assert_not_called()
+        self.assertFalse(GoldenResponse.objects.exists())
+
+    def test_cache_des_arbres_borne_en_octets(self):
+        from collections import OrderedDict
+        from django.test import override_settings
+        from scraping_data import golden
+        from scraping_data.blobstore import stocker_blob
+
+        blobs = [stocker_blob(json.dumps({"i": i, "texte": "x" * 300}).encode("utf-8")) for i in range(10)]
+        with override_settings(GOLDEN_TREE_CACHE_MAX_BYTES=2000), \
+                patch.object(golden, '_arbres', OrderedDict()), patch.object(golden, '_octets_arbres', 0):
+            for blob in blobs:
+                self.assertIn("i", golden.arbre_golden(blob, ())[1])
+            self.assertLessEqual(golden._octets_arbres, 2000)
+            self.assertEqual(list(golden._arbres), [(blob, ()) for blob in blobs[-6:]])
+
+
+# ✅ Tests du cache HTTP du testeur (fraîcheur, revalidation, fusion des requêtes)
+class HttpCacheTest(TestCase):
+    @patch('requests.request')
+    def test_fraicheur_et_revalidation(self, mock_request):
+        from scraping_data.http_cache import CacheHTTP
+        from scraping_data.runner import executer_test
+
+        cache = CacheHTTP(budget=10_000)
+        mock_request.return_value = Mock(status_code=200, text='{"id": 1}',
+                                         headers={"Cache-Control": "max-age=60", "ETag": '"v1"'})
+        with patch('scraping_data.runner.cache_http', cache):
+            statuts = [executer_test("GET", "https://cache.test/items/1", cache=True, historiser=False)["cache"]
+                       for _ in range(3)]
+            self.assertEqual(statuts, ["miss", "hit", "hit"])
+            self.assertEqual(mock_request.call_count, 1)
+
+            # Entrée périmée : requête conditionnelle, 304 → corps servi depuis le cache
+            next(iter(cache.entrees.values())).expire_a = 0
+            mock_request.return_value = Mock(status_code=304, text="", headers={"Cache-Control": "max-age=60"})
+            entry = executer_test("GET", "https://cache.test/items/1", cache=True, historiser=False)
+        self.assertEqual((entry["cache"], entry["status_code"], entry["response"]), ("revalidated", 200, '{"id": 1}'))
+        self.assertEqual(mock_request.call_args.kwargs["headers"], {"If-None-Match": '"v1"'})
+        self.assertEqual(cache.statistiques()["hit_rate"], 0.75)
+
+    @patch('requests.request')
+    def test_cle_par_projet_et_identifiants(self, mock_request):
+        from scraping_data.auth import GestionnaireAuth
+        from scraping_data.http_cache import CacheHTTP
+        from scraping_data.models import AuthProfile, SwaggerProject
+        from scraping_data.runner import executer_test
+
+        projet_a = SwaggerProject.objects.create(swagger_url="https://cache.test")
+        projet_b = SwaggerProject.objects.create(swagger_url="https://cache.test")
+        AuthProfile.objects.create(project=projet_a, kind='bearer', token="secret-a")
+        cache, gestionnaire = CacheHTTP(budget=10_000), GestionnaireAuth()
+        mock_request.return_value = Mock(status_code=200, text='{"a": 1}', headers={"Cache-Control": "max-age=60"})
+
+        def tester(projet_id):
+            return executer_test("GET", "https://cache.test/moi", cache=True, historiser=False, projet_id=projet_id)["cache"]
+
+        with patch('scraping_data.runner.cache_http', cache), patch('scraping_data.views.cache_http', cache), \
+                patch('scraping_data.runner.gestionnaire_auth', gestionnaire), \
+                patch('scraping_data.views.gestionnaire_auth', gestionnaire):
+            # Réponse obtenue avec les identifiants de A : jamais servie à B ni à un appel sans projet
+            self.assertEqual([tester(projet_a.pk), tester(projet_a.pk), tester(projet_b.pk), tester(None)],
+                             ["miss", "hit", "miss", "miss"])
+            # Nouveaux identifiants : les réponses du projet sont purgées
+            self.client.put(reverse('scraping_data:auth-profile', args=[projet_a.pk]),
+                            {'kind': 'bearer', 'token': 'secret-a2'}, content_type='application/json')
+            self.assertEqual(cache.statistiques(projet_a.pk)["entries"], 0)
+            self.assertEqual(tester(projet_a.pk), "miss")
+        self.assertEqual(mock_request.call_args.kwargs["headers"], {"Authorization": "Bearer secret-a2"})
+
+    def test_requetes_identiques_fusionnees_et_budget(self):
+        import threading
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+        from scraping_data.http_cache import CacheHTTP
+
+        cache = CacheHTTP(budget=1500)
+        appels, libere = [], threading.Event()
+
+        def envoyer(entetes):
+            appels.append(entetes)
+            libere.wait(2)
+            return Mock(status_code=200, text="x" * 300, headers={"Cache-Control": "no-store"})
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futurs = [executor.submit(cache.obtenir, "cle", envoyer) for _ in range(5)]
+            while not cache.en_vol:
+                time.sleep(0.01)
+            time.sleep(0.2)  # les autres appelants attendent le vol en cours
+            libere.set()
+            statuts = sorted(f.result()[1] for f in futurs)
+        self.assertEqual(len(appels), 1)
+        self.assertEqual(statuts.count("miss"), 1)
+        self.assertEqual(cache.statistiques()["entries"], 0)  # no-store
+
+        # Budget mémoire : les entrées les moins récemment utilisées sont évincées
+        reponse = Mock(status_code=200, text="y" * 200, headers={"Cache-Control": "max-age=60"})
+        for cle in ("a", "b", "c", "a", "d"):
+            cache.obtenir(cle, lambda entetes: reponse)
+        self.assertEqual(list(cache.entrees), ["c", "a", "d"])
+        self.assertEqual(cache.statistiques()["evicted"], 1)
+
+
+# ✅ Tests de l'authentification des requêtes de test (profils, jetons OAuth2)
+class AuthProfileTest(TestCase):
+    def test_oauth2_jeton_partage_et_renouvele(self):
+        import threading
+        from scraping_data.auth import GestionnaireAuth
+        from scraping_data.mock_server import MockAPI, creer_serveur
+        from scraping_data.models import AuthProfile, SwaggerProject
+        from scraping_data.runner import executer_tests
+
+        projet = SwaggerProject.objects.create(swagger_url="https://auth.test", swagger_json=[
+            {"method": "GET", "endpoint": f"/items/{i}", "parameters": []} for i in range(12)])
+        api = MockAPI(projet.swagger_json, oauth=("client", "secret"))
+        serveur = creer_serveur(api, port=0)
+        threading.Thread(target=serveur.serve_forever, daemon=True).start()
+        self.addCleanup(serveur.server_close)
+        self.addCleanup(serveur.shutdown)
+        base_url = f"http://127.0.0.1:{serveur.server_port}"
+        AuthProfile.objects.create(project=projet, kind='oauth2_client_credentials', token_url=f"{base_url}/oauth/token",
+                                   client_id="client", client_secret="secret")
+
+        gestionnaire = GestionnaireAuth()
+        gestionnaire.profil(projet.pk)  # profil lu une fois, partagé par les threads
+        with patch('scraping_data.runner.gestionnaire_auth', gestionnaire):
+            resultats = executer_tests(projet, base_url=base_url, concurrence=4)
+            self.assertEqual({r["status_code"] for r in resultats}, {200})
+            self.assertEqual(api.jetons_emis, 1)  # un seul jeton pour tous les threads
+
+            api.jetons.clear()  # jeton révoqué : 401, nouveau jeton, requête rejouée
+            resultats = executer_tests(projet, base_url=base_url, concurrence=4)
+        self.assertEqual({r["status_code"] for r in resultats}, {200})
+        self.assertGreaterEqual(api.jetons_emis, 2)
+
+    def test_renouvellement_anticipe(self):
+        import time
+        from django.test import override_settings
+        from scraping_data.auth import GestionnaireAuth, Jeton
+        from scraping_data.models import AuthProfile, SwaggerProject
+
+        projet = SwaggerProject.objects.create(swagger_url="https://auth.test")
+        profil = AuthProfile.objects.create(project=projet, kind='oauth2_client_credentials',
+                                            token_url="https://auth.test/token")
+        gestionnaire = GestionnaireAuth()
+        jetons = [Jeton("a", time.monotonic() + 30), Jeton("b", time.monotonic() + 3600)]
+        with override_settings(AUTH_REFRESH_AHEAD_SECONDS=60), \
+                patch('scraping_data.auth.demander_jeton', side_effect=jetons) as demander:
+            self.assertEqual(gestionnaire.jeton(profil), "a")
+            self.assertEqual(gestionnaire.jeton(profil), "a")  # proche de l'expiration : servi, renouvelé en fond
+            for _ in range(100):
+                if demander.call_count == 2 and not gestionnaire._en_renouvellement:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(gestionnaire.jeton(profil), "b")
+        self.assertEqual(gestionnaire.authentification(projet.pk)[0], {"Authorization": "Bearer b"})
+
+    def test_profil_valide_avant_enregistrement(self):
+        from scraping_data.models import AuthProfile, SwaggerProject
+
+        projet = SwaggerProject.objects.create(swagger_url="https://auth.test")
+        url = reverse('scraping_data:auth-profile', args=[projet.pk])
+        for invalide in ({'kind': 'api_key', 'enabled': 'peut-être'}, {'kind': 'api_key', 'api_key_location': 'cookie'}):
+            reponse = self.client.put(url, invalide, content_type='application/json')
+            self.assertEqual(reponse.status_code, 400)
+        self.assertFalse(AuthProfile.objects.filter(project=projet).exists())
+        reponse = self.client.put(url, {'kind': 'api_key', 'enabled': 'false', 'api_key_location': 'query'},
+                                  content_type='application/json')
+        self.assertEqual((reponse.status_code, reponse.json()['enabled']), (200, False))
+
+    @patch('scraping_data.views.assembler_spec')
+    def test_rescraping_authentifie(self, mock_assembler):
+        import requests
+        from scraping_data.models import AuthProfile, SwaggerProject
+        from scraping_data.views import scraper_projet
+
+        url = "https://auth.test/v3/api-docs"
+        projet = SwaggerProject.objects.create(swagger_url=url)
+        AuthProfile.objects.create(project=projet, kind='bearer', token='secret')
+        mock_assembler.return_value = {"openapi": "3.0.0", "paths": {}}
+        with patch('scraping_data.views.ecrire_rapport'):
+            self.assertEqual(scraper_projet(url).pk, projet.pk)
+        session = mock_assembler.call_args.kwargs["session"]
+        requete = session.prepare_request(requests.Request("GET", url))
+        self.assertEqual(requete.headers["Authorization"], "Bearer secret")
+        requete = session.prepare_request(requests.Request("GET", "https://schemas.example.com/user.json"))
+        self.assertNotIn("Authorization", requete.headers)  # autre hôte : pas d'identifiants
+
+
+# ✅ Tests de la collecte paginée de produits (upsert par lots, arrêt incrémental)
+class ProductCrawlTest(TestCase):
+    def setUp(self):
+        import threading
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import parse_qs, urlparse
+
+        # Source locale triée du plus récent au plus ancien, pagination offset / limit
+        self.catalogue = [{"id": i, "title": f"Produit {i}", "price": i + 0.5, "category": {"name": "cat"}}
+                          for i in range(250, 0, -1)]
+        self.requetes = []
+        test = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                q = parse_qs(urlparse(self.path).query)
+                debut, taille = int(q["skip"][0]), int(q["limit"][0])
+                test.requetes.append(debut)
+                corps = json.dumps({"products": test.catalogue[debut:debut + taille],
+                                    "total": len(test.catalogue)}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(corps)))
+                self.end_headers()
+                self.wfile.write(corps)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.serveur = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.serveur.serve_forever, daemon=True).start()
+        self.sources = {"local": {
+            "url": f"http://127.0.0.1:{self.serveur.server_port}/products", "pagination": "offset", "page_size": 40,
+            "offset_param": "skip", "limit_param": "limit", "items_path": "products", "total_path": "total",
+            "fields": {"category": "category.name"},
+        }}
+
+    def tearDown(self):
+        self.serveur.shutdown()
+        self.serveur.server_close()
+
+    def test_collecte_complete_puis_incrementale(self):
+        from django.test import override_settings
+        from scraping_data.models import Product
+        from scraping_data.products import collecter_produits
+
+        with override_settings(PRODUCT_SOURCES=self.sources):
+            bilan = collecter_produits("local", concurrence=4, taille_lot=100)
+            self.assertEqual((bilan["pages"], bilan["ecrits"], bilan["arret"]), (7, 250, "fin"))
+            self.assertEqual(Product.objects.filter(source="local").count(), 250)
+            self.assertEqual(Product.objects.get(source_id="7").category, "cat")
+
+            # 30 nouveaux produits en tête, un prix modifié : seules les premières pages sont relues
+            self.catalogue[0]["price"] = 999
+            self.catalogue[:0] = [{"id": i, "title": f"Nouveau {i}", "price": 1, "category": {"name": "neuf"}}
+                                  for i in range(280, 250, -1)]
+            self.requetes.clear()
+            bilan = collecter_produits("local", concurrence=1, incremental=True)
+        self.assertEqual((bilan["pages"], bilan["arret"]), (2, "deja_vu"))
+        self.assertEqual(Product.objects.filter(source="local").count(), 280)
+        self.assertEqual(Product.objects.get(source="local", source_id="250").price, 999)
+        self.assertLessEqual(len(self.requetes), 3)  # au plus une page d'avance par thread
+
+    def test_page_inexploitable_et_option_incremental(self):
+        from django.test import override_settings
+        from scraping_data.models import Product
+        from scraping_data.products import collecter_produits
+
+        # Première page entièrement rejetée (sans titre) : la collecte incrémentale continue
+        for produit in self.catalogue[:40]:
+            produit["title"] = ""
+        with override_settings(PRODUCT_SOURCES=self.sources):
+            bilan = collecter_produits("local", concurrence=1, incremental=True)
+        self.assertEqual((bilan["pages"], bilan["rejetes"], bilan["arret"]), (7, 40, "fin"))
+        self.assertEqual(Product.objects.filter(source="local").count(), 210)
+
+        with override_settings(PRODUCT_SOURCES=self.sources), patch('scraping_data.views.lancer_tache') as lancer:
+            lancer.return_value = "tache"
+            for valeur, attendu in (("false", False), ("1", True), ("", False)):
+                self.client.post(reverse('scraping_data:product-fetch'), {"source": "local", "incremental": valeur})
+                self.assertIs(lancer.call_args.kwargs["incremental"], attendu)
+            reponse = self.client.post(reverse('scraping_data:product-fetch'), {"source": "local", "incremental": "peut-être"})
+        self.assertEqual(reponse.status_code, 400)
+
+    def test_erreurs_de_source(self):
+        from django.core.management import CommandError, call_command
+        from django.test import override_settings
+
+        local = self.sources["local"]
+        sources = {
+            "total_invalide": {**local, "total_path": "products"},
+            "hors_ligne": {**local, "url": "http://127.0.0.1:1/products", "timeout": 1},
+        }
+        with override_settings(PRODUCT_SOURCES=sources):
+            with self.assertRaisesMessage(CommandError, "total non numérique"):
+                call_command("crawl_products", "total_invalide")
+            with self.assertRaisesMessage(CommandError, "(page 0)"):
+                call_command("crawl_products", "hors_ligne")
+            with patch('requests.Session.get', return_value=Mock(status_code=200, json=Mock(side_effect=ValueError))), \
+                    self.assertRaisesMessage(CommandError, "réponse non JSON"):
+                call_command("crawl_products", "total_invalide")
@@ -14,9 +14,11 @@ urlpatterns = [
     path('rapport-swagger/pdf/', views.rapport_swagger_pdf, name='rapport-swagger-pdf'),
     path('swagger/endpoints/', views.SwaggerScrapeAPIView.as_view(), name='swagger-endpoints'),
     path('lancer-scraping/', views.lancer_scraping, name='lancer-scraping'),
+    path('search/', views.search_endpoints, name='search-endpoints'),
 
     # --- Gestion des projets Swagger ---
     path('list-projects/', views.list_projects, name='list-projects'),
+    path('projects/', views.ProjectListAPIView.as_view(), name='project-list-api'),
     path('projects/add/', views.add_project, name='add-project'),
     path('projects/<int:pk>/edit/', views.edit_project, name='edit-project'),
     path('projects/<int:pk>/delete/', views.delete_project, name='delete-project'),
@@ -29,13 +31,39 @@ urlpatterns = [
     path('test-endpoint/', views.test_endpoint, name='test-endpoint'),
     path('download_history/', views.download_history, name='download-history'),
     path('tester-tous/', views.tester_tous_endpoints, name='tester-tous'),
+    path('events/<str:cle>/', views.evenements, name='events'),
 
     # --- Génération des tests automatiques ---
     path('generate-test/', views.generate_test, name='generate_test'),
     path('run-tests/', views.run_tests, name='run-tests'),
     path('generate_report/', views.generate_test_report, name='generate-report'),
 
+    # --- Plans de test (scénarios enchaînés) ---
+    path('projects/<int:pk>/plans/', views.TestPlanListAPIView.as_view(), name='test-plans'),
+    path('plans/<int:pk>/run/', views.TestPlanRunAPIView.as_view(), name='test-plan-run'),
+
+    # --- Versions de la spec ---
+    path('projects/<int:pk>/versions/', views.SpecVersionListAPIView.as_view(), name='spec-versions'),
+    path('projects/<int:pk>/versions/diff/', views.SpecVersionDiffAPIView.as_view(), name='spec-version-diff'),
+    path('projects/<int:pk>/versions/<int:number>/', views.SpecVersionDetailAPIView.as_view(), name='spec-version'),
+
+    # --- Réponses de référence (golden) ---
+    path('projects/<int:pk>/goldens/', views.GoldenListAPIView.as_view(), name='goldens'),
+
+    # --- Authentification des requêtes de test ---
+    path('projects/<int:pk>/auth/', views.AuthProfileAPIView.as_view(), name='auth-profile'),
+
+    # --- Cache HTTP du testeur ---
+    path('projects/<int:pk>/http-cache/', views.HttpCacheAPIView.as_view(), name='http-cache'),
+
+    # --- Supervision synthétique ---
+    path('projects/<int:pk>/monitors/', views.MonitorListAPIView.as_view(), name='monitors'),
+    path('monitors/<int:pk>/series/', views.MonitorSeriesAPIView.as_view(), name='monitor-series'),
+
     # --- Page générée après test ---
     path('generate-test-page/', views.generate_test_page, name='generate_test_page'),
     path('clean-tests/', views.clean_tests, name='clean_tests'),
+
+    # --- Debug : profilage des vues ---
+    path('debug/profiling/', views.profiling_stats, name='profiling-stats'),
 ]
@@ -0,0 +1,250 @@
+import json
+import re
+from collections import Counter
+from functools import lru_cache
+
+MAX_VIOLATIONS = 20
+
+TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool) or isinstance(v, float) and v.is_integer(),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+FORMATS = {
+    "date": re.compile(r"^\d{4}-\d{2}-\d{2}$"),
+    "date-time": re.compile(r"^\d{4}-\d{2}-\d{2}[Tt ]\d{2}:\d{2}:\d{2}(\.\d+)?([Zz]|[+-]\d{2}:?\d{2})?$"),
+    "email": re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$"),
+    "uuid": re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$"),
+}
+
+
+def _accepter(valeur, chemin, erreurs):
+    pass
+
+
+# ✅ Compilation d'un schéma en une chaîne de fonctions de vérification
+def _compiler(schema):
+    """
+    Chaque mot-clé du schéma devient une fonction (valeur, chemin, erreurs) ; les regex, ensembles d'enum
+    et sous-validateurs sont préparés une seule fois. Une $ref non résolue (cycle) accepte tout.
+    """
+    if not isinstance(schema, dict) or "$ref" in schema or not schema:
+        return _accepter
+    verifications = []
+
+    type_ = schema.get("type")
+    if type_:
+        types = type_ if isinstance(type_, list) else [type_]
+        if schema.get("nullable"):
+            types = types + ["null"]
+        tests = [TYPES[t] for t in types if t in TYPES]
+        nom_types = "|".join(types)
+        if tests:
+            def verifier_type(valeur, chemin, erreurs):
+                if not any(test(valeur) for test in tests):
+                    erreurs.append((chemin, f"type attendu {nom_types}, reçu {type(valeur).__name__}"))
+                    return False
+                return True
+            verifications.append(verifier_type)
+
+    if "enum" in schema:
+        valeurs = schema["enum"]
+        autorisees = {json.dumps(v, sort_keys=True) for v in valeurs}
+
+        def verifier_enum(valeur, chemin, erreurs):
+            if json.dumps(valeur, sort_keys=True) not in autorisees:
+                erreurs.append((chemin, f"valeur hors enum {valeurs}"))
+        verifications.append(verifier_enum)
+
+    if "const" in schema:
+        constante = schema["const"]
+
+        def verifier_const(valeur, chemin, erreurs):
+            if valeur != constante:
+                erreurs.append((chemin, f"valeur attendue {constante!r}"))
+        verifications.append(verifier_const)
+
+    # Objets
+    proprietes = {nom: _compiler(prop) for nom, prop in (schema.get("properties") or {}).items()}
+    requis = list(schema.get("required") or [])
+    supplementaires = schema.get("additionalProperties", True)
+    valider_supplementaires = _compiler(supplementaires) if isinstance(supplementaires, dict) else None
+    if proprietes or requis or supplementaires is not True:
+        def verifier_objet(valeur, chemin, erreurs):
+            if not isinstance(valeur, dict):
+                return
+            for nom in requis:
+                if nom not in valeur:
+                    erreurs.append((f"{chemin}.{nom}", "champ requis absent"))
+            for nom, contenu in valeur.items():
+                sous_validateur = proprietes.get(nom)
+                if sous_validateur is not None:
+                    sous_validateur(contenu, f"{chemin}.{nom}", erreurs)
+                elif supplementaires is False:
+                    erreurs.append((f"{chemin}.{nom}", "champ non documenté"))
+                elif valider_supplementaires is not None:
+                    valider_supplementaires(contenu, f"{chemin}.{nom}", erreurs)
+        verifications.append(verifier_objet)
+
+    # Tableaux
+    if "items" in schema or "minItems" in schema or "maxItems" in schema:
+        elements = _compiler(schema.get("items"))
+        min_items, max_items = schema.get("minItems"), schema.get("maxItems")
+
+        def verifier_tableau(valeur, chemin, erreurs):
+            if not isinstance(valeur, list):
+                return
+            if min_items is not None and len(valeur) < min_items:
+                erreurs.append((chemin, f"au moins {min_items} éléments attendus"))
+            if max_items is not None and len(valeur) > max_items:
+                erreurs.append((chemin, f"au plus {max_items} éléments attendus"))
+            if elements is not _accepter:
+                for i, element in enumerate(valeur):
+                    elements(element, f"{chemin}[{i}]", erreurs)
+        verifications.append(verifier_tableau)
+
+    # Chaînes
+    min_len, max_len = schema.get("minLength"), schema.get("maxLength")
+    motif = schema.get("pattern")
+    try:
+        motif_compile = re.compile(motif) if motif else None
+    except re.error:
+        motif_compile = None
+    format_ = FORMATS.get(schema.get("format"))
+    if min_len is not None or max_len is not None or motif_compile or format_:
+        def verifier_chaine(valeur, chemin, erreurs):
+            if not isinstance(valeur, str):
+                return
+            if min_len is not None and len(valeur) < min_len:
+                erreurs.append((chemin, f"longueur < {min_len}"))
+            if max_len is not None and len(valeur) > max_len:
+                erreurs.append((chemin, f"longueur > {max_len}"))
+            if motif_compile and not motif_compile.search(valeur):
+                erreurs.append((chemin, f"ne respecte pas le pattern {motif}"))
+            if format_ and not format_.match(valeur):
+                erreurs.append((chemin, f"format {schema['format']} invalide"))
+        verifications.append(verifier_chaine)
+
+    # Nombres
+    bornes = []
+    for cle, exclusive_cle, comparer, texte in (
+        ("minimum", "exclusiveMinimum", lambda v, b, ex: v > b if ex else v >= b, ">"),
+        ("maximum", "exclusiveMaximum", lambda v, b, ex: v < b if ex else v <= b, "<"),
+    ):
+        borne, exclusive = schema.get(cle), schema.get(exclusive_cle)
+        if isinstance(exclusive, (int, float)) and not isinstance(exclusive, bool):  # OpenAPI 3.1
+            bornes.append((exclusive, True, comparer, f"{texte} {exclusive}"))
+        if borne is not None:
+            bornes.append((borne, bool(exclusive is True), comparer, f"{texte}{'' if exclusive is True else '='} {borne}"))
+    multiple = schema.get("multipleOf")
+    if bornes or multiple:
+        def verifier_nombre(valeur, chemin, erreurs):
+            if not TYPES["number"](valeur):
+                return
+            for borne, exclusive, comparer, texte in bornes:
+                if not comparer(valeur, borne, exclusive):
+                    erreurs.append((chemin, f"valeur attendue {texte}"))
+            if multiple and abs(valeur / multiple - round(valeur / multiple)) > 1e-9:
+                erreurs.append((chemin, f"multiple de {multiple} attendu"))
+        verifications.append(verifier_nombre)
+
+    # Composition
+    for partie in schema.get("allOf") or []:
+        verifications.append(_compiler(partie))
+    for cle in ("anyOf", "oneOf"):
+        if schema.get(cle):
+            alternatives = [_compiler(s) for s in schema[cle]]
+            exactement_un = cle == "oneOf"
+
+            def verifier_alternatives(valeur, chemin, erreurs, alternatives=alternatives,
+                                      exactement_un=exactement_un, cle=cle):
+                valides = 0
+                for alternative in alternatives:
+                    sous_erreurs = []
+                    alternative(valeur, chemin, sous_erreurs)
+                    valides += not sous_erreurs
+                if valides == 0 or (exactement_un and valides > 1):
+                    erreurs.append((chemin, f"ne correspond à aucune alternative {cle}" if not valides
+                                    else "correspond à plusieurs alternatives oneOf"))
+            verifications.append(verifier_alternatives)
+
+    if not verifications:
+        return _accepter
+
+    def valider(valeur, chemin, erreurs):
+        # Un type invalide rend les autres vérifications sans objet
+        for verification in verifications:
+            if verification(valeur, chemin, erreurs) is False:
+                return
+    return valider
+
+
+@lru_cache(maxsize=1024)
+def _validateur_en_cache(cle_schema):
+    return _compiler(json.loads(cle_schema))
+
+
+def validateur(schema):
+    """Validateur compilé de `schema`, partagé par tous les appels avec le même schéma."""
+    return _validateur_en_cache(json.dumps(schema, sort_keys=True))
+
+
+def schema_reponse(ep, status_code):
+    """Schéma documenté pour ce code : exact, puis 2XX, puis default."""
+    responses = ep.get("responses") or {}
+    code = str(status_code)
+    for cle in (code, f"{code[:1]}XX", f"{code[:1]}xx", "default"):
+        if cle in responses:
+            return responses[cle]
+    return None
+
+
+def validateur_reponse(ep, status_code, validateurs):
+    """
+    Validateur du schéma documenté de `ep` pour ce code (None s'il n'y en a pas).
+    `validateurs` : dict propre à une exécution ; chaque (endpoint, code) n'y est résolu qu'une fois.
+    """
+    cle = (ep.get("method"), ep.get("endpoint"), status_code)
+    if cle not in validateurs:
+        schema = schema_reponse(ep, status_code)
+        validateurs[cle] = validateur(schema) if schema else None
+    return validateurs[cle]
+
+
+# ✅ Validation d'une réponse de test
+def valider_reponse(valider, texte):
+    """Retourne la liste des violations [{"champ", "erreur"}] (vide si la réponse est conforme)."""
+    try:
+        document = json.loads(texte)
+    except (TypeError, ValueError):
+        return [{"champ": "$", "erreur": "réponse non JSON"}]
+    erreurs = []
+    valider(document, "$", erreurs)
+    return [{"champ": champ, "erreur": message} for champ, message in erreurs[:MAX_VIOLATIONS]]
+
+
+# ✅ Taux de violation du schéma par endpoint, sur un ensemble de résultats de tests en masse
+def taux_violations(resultats):
+    rapport = {}
+    for resultat in resultats:
+        if resultat.get("schema_valide") is None:
+            continue
+        ligne = rapport.setdefault(resultat["endpoint"], {"reponses": 0, "invalides": 0, "champs": Counter()})
+        ligne["reponses"] += 1
+        if not resultat["schema_valide"]:
+            ligne["invalides"] += 1
+            ligne["champs"].update({v["champ"] for v in resultat.get("violations", [])})
+    return {
+        endpoint: {
+            "reponses": ligne["reponses"],
+            "invalides": ligne["invalides"],
+            "taux": round(ligne["invalides"] / ligne["reponses"], 4),
+            "champs": dict(ligne["champs"].most_common(10)),
+        }
+        for endpoint, ligne in rapport.items()
+    }
@@ -0,0 +1,160 @@
+from django.conf import settings
+from django.db import transaction
+
+from .blobstore import encoder_json, lire_json, stocker_blob
+from .models import SpecVersion, SwaggerProject
+
+
+class VersionIntrouvable(LookupError):
+    pass
+
+
+def cle_endpoint(ep):
+    return f"{ep.get('method', 'GET').upper()} {ep.get('endpoint', '')}"
+
+
+def _par_cle(endpoints):
+    return {cle_endpoint(ep): ep for ep in endpoints or []}
+
+
+# ✅ Delta structurel réversible entre deux listes d'endpoints
+def calculer_delta(ancien, nouveau):
+    """
+    {"added": {clé: ep}, "removed": {clé: ep}, "changed": {clé: [avant, après]}, "order": [...]?}
+    Les valeurs « avant » rendent le delta réversible : un diff entre versions se lit dans les seuls deltas.
+    "order" n'est présent que si l'ordre des endpoints ne se déduit pas de l'application du delta.
+    """
+    avant, apres = _par_cle(ancien), _par_cle(nouveau)
+    delta = {
+        "added": {cle: ep for cle, ep in apres.items() if cle not in avant},
+        "removed": {cle: ep for cle, ep in avant.items() if cle not in apres},
+        "changed": {cle: [avant[cle], ep] for cle, ep in apres.items() if cle in avant and avant[cle] != ep},
+    }
+    if list(appliquer_delta(dict(avant), delta)) != list(apres):
+        delta["order"] = list(apres)
+    return delta
+
+
+def appliquer_delta(endpoints, delta):
+    """Applique `delta` à {clé: ep} (modifié en place) et le retourne."""
+    for cle in delta["removed"]:
+        endpoints.pop(cle, None)
+    for cle, (_, ep) in delta["changed"].items():
+        endpoints[cle] = ep
+    endpoints.update(delta["added"])
+    if "order" in delta:
+        endpoints = {cle: endpoints[cle] for cle in delta["order"]}
+    return endpoints
+
+
+# ✅ Nouvelle version après un scraping
+def enregistrer_version(projet, ancien=None):
+    """
+    Enregistre projet.swagger_json (déjà sauvegardé) comme nouvelle version, sauf s'il est identique à la dernière.
+    `ancien` : contenu précédent du projet, pour un projet scrapé avant l'historique des versions.
+    L'instantané complet réutilise le blob du projet (adressé par contenu) : il ne coûte qu'une référence.
+    """
+    nouveau = projet.swagger_json or []
+    intervalle = getattr(settings, "SPEC_SNAPSHOT_INTERVAL", 10)
+    with transaction.atomic():
+        list(SwaggerProject.objects.select_for_update().filter(pk=projet.pk).values_list('pk'))  # sérialise la numérotation
+        derniere = projet.spec_versions.order_by('-number').first()
+        if derniere is None and ancien:
+            derniere = SpecVersion.objects.create(project=projet, number=1, snapshot_blob_id=stocker_blob(encoder_json(ancien)),
+                                                  endpoint_count=len(ancien), added=len(ancien))
+        if derniere is None:
+            return SpecVersion.objects.create(project=projet, number=1, snapshot_blob_id=projet.spec_blob_id,
+                                              endpoint_count=len(nouveau), added=len(nouveau))
+
+        precedent = contenu_version(projet, derniere.number) if ancien is None else ancien
+        delta = calculer_delta(precedent, nouveau)
+        if not (delta["added"] or delta["removed"] or delta["changed"] or "order" in delta):
+            return derniere
+
+        dernier_instantane = (projet.spec_versions.filter(snapshot_blob__isnull=False)
+                              .order_by('-number').values_list('number', flat=True).first()) or 0
+        donnees_delta = encoder_json(delta)
+        instantane = (derniere.number + 1 - dernier_instantane >= intervalle
+                      or len(donnees_delta) * 2 > projet.spec_size)  # delta presque aussi gros que la spec
+        return SpecVersion.objects.create(
+            project=projet,
+            number=derniere.number + 1,
+            snapshot_blob_id=projet.spec_blob_id if instantane else None,
+            delta_blob_id=stocker_blob(donnees_delta),
+            endpoint_count=len(nouveau),
+            added=len(delta["added"]),
+            removed=len(delta["removed"]),
+            changed=len(delta["changed"]),
+        )
+
+
+def _version(projet, numero):
+    version = projet.spec_versions.filter(number=numero).first()
+    if version is None:
+        raise VersionIntrouvable(f"Version {numero} introuvable pour le projet {projet.pk}.")
+    return version
+
+
+# ✅ Contenu d'une version : dernier instantané, puis deltas jusqu'à elle
+def contenu_version(projet, numero):
+    _version(projet, numero)
+    versions = projet.spec_versions.filter(number__lte=numero)
+    depart = versions.filter(snapshot_blob__isnull=False).order_by('-number').first()
+    endpoints = _par_cle(lire_json(depart.snapshot_blob_id)) if depart else {}  # sans instantané : spec vide
+    for delta_blob_id in (versions.filter(number__gt=depart.number if depart else 0).order_by('number')
+                          .values_list('delta_blob_id', flat=True)):
+        if delta_blob_id:
+            endpoints = appliquer_delta(endpoints, lire_json(delta_blob_id))
+    return list(endpoints.values())
+
+
+def _cle_parametre(param):
+    return f"{param.get('in', '')}:{param.get('name', '')}"
+
+
+def diff_endpoint(avant, apres):
+    """Paramètres ajoutés / retirés / modifiés, et autres champs modifiés d'un endpoint."""
+    p_avant = {_cle_parametre(p): p for p in avant.get("parameters") or []}
+    p_apres = {_cle_parametre(p): p for p in apres.get("parameters") or []}
+    return {
+        "parameters": {
+            "added": sorted(p_apres.keys() - p_avant.keys()),
+            "removed": sorted(p_avant.keys() - p_apres.keys()),
+            "changed": sorted(c for c in p_avant.keys() & p_apres.keys() if p_avant[c] != p_apres[c]),
+        },
+        "fields": sorted(c for c in (avant.keys() | apres.keys()) - {"parameters"} if avant.get(c) != apres.get(c)),
+    }
+
+
+# ✅ Diff entre deux versions, en lisant uniquement les deltas qui les séparent
+def diff_versions(projet, depuis, vers):
+    """Coût proportionnel aux changements entre les deux versions, pas à la taille de la spec."""
+    _version(projet, depuis)
+    _version(projet, vers)
+    bas, haut = sorted((depuis, vers))
+    avant, apres = {}, {}
+    for delta_blob_id in (projet.spec_versions.filter(number__gt=bas, number__lte=haut).order_by('number')
+                          .values_list('delta_blob_id', flat=True)):
+        delta = lire_json(delta_blob_id)
+        for cle, ep in delta["added"].items():
+            avant.setdefault(cle, None)
+            apres[cle] = ep
+        for cle, ep in delta["removed"].items():
+            avant.setdefault(cle, ep)
+            apres[cle] = None
+        for cle, (ep_avant, ep_apres) in delta["changed"].items():
+            avant.setdefault(cle, ep_avant)
+            apres[cle] = ep_apres
+    if depuis > vers:
+        avant, apres = apres, avant
+
+    resultat = {"from": depuis, "to": vers, "added": [], "removed": [], "changed": {}}
+    for cle in sorted(avant):
+        a, b = avant[cle], apres[cle]
+        if a is None and b is not None:
+            resultat["added"].append(cle)
+        elif a is not None and b is None:
+            resultat["removed"].append(cle)
+        elif a is not None and a != b:
+            resultat["changed"][cle] = diff_endpoint(a, b)
+    return resultat
@@ -1,5 +1,7 @@
 import os
+import math
 import json
+import time
 from collections import Counter
 import requests
 import io
@@ -11,6 +13,7 @@ from django.http import HttpResponse, JsonResponse, FileResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods, require_POST
 from django.utils import timezone
+from django.urls import reverse
 from django import forms
 from django.conf import settings
 from django.contrib import messages
@@ -22,7 +25,26 @@ from rest_framework import status, serializers
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 
-from .models import SwaggerProject, Endpoint
+from .models import AuthProfile, SwaggerProject, Endpoint, GoldenResponse, TestPlan, Monitor, Product
+from .catalogue import routage, synchroniser_endpoints, trouver_endpoint
+from .reports import cle_projet, ecrire_rapport
+from .search import index_recherche
+from .bundler import assembler_spec, est_distante
+from .generators import contraintes, generer_valeur
+from .spec_loader import (METHODES_HTTP, dereferencer, exemple_schema, resoudre_ref,
+                          schema_objet, type_schema)
+from .runner import (test_history, executer_test, executer_tests, entree_complete, en_echec, iterer_tests,
+                     formater_url, preparer_payload, url_base_projet)
+from .events import bus, lancer_tache, reponse_sse
+from .plans import PlanInvalide, executer_plan, verifier_plan
+from .validation import taux_violations
+from .monitoring import serie
+from .versions import VersionIntrouvable, cle_endpoint, contenu_version, diff_versions, enregistrer_version
+from .golden import compiler_motifs, enregistrer_golden, index_goldens, verifier_golden
+from .jsonpath import JSONPathInvalide
+from .http_cache import cache_http
+from .auth import gestionnaire_auth
+from .products import SourceInconnue, collecte_en_direct, config_source
 
 
 # adapte selon ton modèle
@@ -35,23 +57,78 @@ class SwaggerProjectForm(forms.ModelForm):
         fields = ['name', 'swagger_url']
 from django.shortcuts import render
 from urllib.parse import urlparse
-from django.core.paginator import Paginator
+from datetime import datetime, timedelta
+from django.db.models import Q
 from .models import SwaggerProject
 
-def list_projects(request):
-    projets_all = SwaggerProject.objects.all().order_by('-created_at')
+TAILLE_PAGE_PROJETS = 5
+
+
+# ✅ Pagination par curseur (created_at, id) : coût constant quelle que soit la page
+def encoder_curseur(projet):
+    return f"{projet.created_at.isoformat()}_{projet.pk}"
+
+
+class CurseurInvalide(ValueError):
+    pass
+
+
+def paginer_projets(request, taille=TAILLE_PAGE_PROJETS):
+    """
+    Projection légère des projets (sans swagger_json) avec recherche ?q=
+    et pagination ?after= / ?before= sur l'index (-created_at, -id) ; CurseurInvalide si le curseur est mal formé.
+    """
+    projets = SwaggerProject.objects.all()
+
+    q = request.GET.get('q', '').strip()
+    if q:
+        projets = projets.filter(Q(name__icontains=q) | Q(swagger_url__icontains=q))
+
+    after, before = request.GET.get('after'), request.GET.get('before')
+    curseur = after or before
+    if curseur:
+        try:
+            date_str, pk = curseur.rsplit('_', 1)
+            date, pk = datetime.fromisoformat(date_str), int(pk)
+        except ValueError:
+            raise CurseurInvalide(f"Curseur de pagination invalide : {curseur}")
+
+    if curseur and after:
+        projets = projets.filter(Q(created_at__lt=date) | Q(created_at=date, pk__lt=pk))
+    elif curseur and before:
+        projets = projets.filter(Q(created_at__gt=date) | Q(created_at=date, pk__gt=pk))
+
+    if curseur and before:
+        page = list(projets.order_by('created_at', 'id')[:taille + 1])
+        a_plus = len(page) > taille
+        page = page[:taille][::-1]
+        has_previous, has_next = a_plus, True
+    else:
+        page = list(projets.order_by('-created_at', '-id')[:taille + 1])
+        a_plus = len(page) > taille
+        page = page[:taille]
+        has_previous, has_next = bool(curseur), a_plus
+
+    return {
+        'projets': page,
+        'q': q,
+        'next_cursor': encoder_curseur(page[-1]) if page and has_next else None,
+        'previous_cursor': encoder_curseur(page[0]) if page and has_previous else None,
+    }
 
-    # Pagination : 5 projets par page
-    paginator = Paginator(projets_all, 5)
-    page_number = request.GET.get('page')
-    projets = paginator.get_page(page_number)
+
+def list_projects(request):
+    try:
+        context = paginer_projets(request)
+    except CurseurInvalide as e:
+        return JsonResponse({'status': 'error', 'error': str(e)}, status=400)
 
     # Ajouter swagger_root_url à chaque projet de la page courante
-    for p in projets:
+    for p in context['projets']:
         parsed_url = urlparse(p.swagger_url)
         p.swagger_root_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
 
-    return render(request, 'list_projects.html', {'projets': projets})
+    return render(request, 'list_projects.html', context)
 
 def add_project(request):
     if request.method == "POST":
@@ -112,101 +189,138 @@ def project_parameters(request, pk):
     return render(request, 'project_parameters.html', context)
 
 
-# --------- Sérializers exemple produits ---------
-class ProductSerializer(serializers.Serializer):
-    id = serializers.IntegerField(read_only=True)
-    title = serializers.CharField()
+# --------- Sérializers produits ---------
+class ProductSerializer(serializers.ModelSerializer):
     price = serializers.FloatField()
     category = serializers.CharField()
 
-
-# --------- Gestion produits fictifs ---------
-PRODUCTS = [
-    {"id": 1, "title": "Produit A", "price": 10.0, "category": "cat1"},
-    {"id": 2, "title": "Produit B", "price": 15.5, "category": "cat2"},
-]
-
-def get_products():
-    return PRODUCTS
-
-def save_products(data):
-    global PRODUCTS
-    PRODUCTS = data
+    class Meta:
+        model = Product
+        fields = ('id', 'title', 'price', 'category')
 
 
-# --------- API views produits (CRUD + fetch) ---------
+# --------- API views produits (CRUD + fetch) : produits saisis et collectés (table Product) ---------
 class ProductListView(APIView):
     def get(self, request):
-        data = get_products()
+        produits = Product.objects.order_by('id')
         q = request.query_params
 
-        if 'min_price' in q:
-            data = [p for p in data if p['price'] >= float(q['min_price'])]
-        if 'max_price' in q:
-            data = [p for p in data if p['price'] <= float(q['max_price'])]
+        try:
+            if 'min_price' in q:
+                produits = produits.filter(price__gte=float(q['min_price']))
+            if 'max_price' in q:
+                produits = produits.filter(price__lte=float(q['max_price']))
+        except ValueError:
+            return Response({'status': 'error', 'error': 'min_price et max_price doivent être des nombres.'},
+                            status=status.HTTP_400_BAD_REQUEST)
         if 'category' in q:
-            data = [p for p in data if p['category'].lower() == q['category'].lower()]
+            produits = produits.filter(category__iexact=q['category'])
         if 'name' in q:
-            data = [p for p in data if q['name'].lower() in p['title'].lower()]
+            produits = produits.filter(title__icontains=q['name'])
 
-        return Response(data)
+        return Response(ProductSerializer(produits, many=True).data)
 
     def post(self, request):
         serializer = ProductSerializer(data=request.data)
         if serializer.is_valid():
-            data = get_products()
-            new_product = serializer.validated_data
-            new_product['id'] = max([p['id'] for p in data], default=0) + 1
-            data.append(new_product)
-            save_products(data)
-            return Response(new_product, status=status.HTTP_201_CREATED)
+            serializer.save()
+            return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=400)
 
 
 class ProductDetailView(APIView):
     def put(self, request, pk):
-        data = get_products()
-        product = next((p for p in data if p['id'] == pk), None)
+        product = Product.objects.filter(pk=pk).first()
         if not product:
             return Response({"detail": "Produit non trouvé"}, status=404)
 
-        serializer = ProductSerializer(data=request.data)
+        serializer = ProductSerializer(product, data=request.data)
         if serializer.is_valid():
-            updated_product = serializer.validated_data
-            updated_product['id'] = pk
-            data[data.index(product)] = updated_product
-            save_products(data)
-            return Response(updated_product)
+            serializer.save()
+            return Response(serializer.data)
         return Response(serializer.errors, status=400)
 
     def delete(self, request, pk):
-        data = get_products()
-        product = next((p for p in data if p['id'] == pk), None)
-        if not product:
+        if not Product.objects.filter(pk=pk).delete()[0]:
             return Response({"detail": "Produit non trouvé"}, status=404)
-
-        data.remove(product)
-        save_products(data)
         return Response(status=204)
 
 
 class ProductFetchAPIView(APIView):
+    """
+    Collecte d'une source de PRODUCT_SOURCES vers Product, en arrière-plan :
+    POST {"source": "dummyjson", "incremental": true, "max_pages": 10} → 202 + URL du flux SSE de progression.
+    """
     def post(self, request):
-        data = [{"id": 3, "title": "Produit C", "price": 20, "category": "cat3"}]
-        return Response({"status": "succès", "produits": data})
+        source = request.data.get('source') or getattr(settings, 'PRODUCT_DEFAULT_SOURCE', 'fakestoreapi')
+        try:
+            config_source(source)
+            max_pages = request.data.get('max_pages')
+            max_pages = int(max_pages) if max_pages not in (None, '') else None
+            # JSON (true / false) ou formulaire ("true", "false", "1", "0", "on"...)
+            incremental = serializers.BooleanField().to_internal_value(request.data.get('incremental') or False)
+        except SourceInconnue as e:
+            return Response({'status': 'error', 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except serializers.ValidationError:
+            return Response({'status': 'error', 'error': 'incremental doit être un booléen.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        except (TypeError, ValueError):
+            return Response({'status': 'error', 'error': 'max_pages doit être un entier.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        cle = lancer_tache(collecte_en_direct, source, incremental=incremental, max_pages=max_pages)
+        return reponse_tache(request, cle)
+
+
+# --------- Scraping Swagger (JSON ou YAML) ---------
+def scrape_swagger(url, projet_id=None):
+    # Les $ref externes (fichiers voisins, URLs distantes) sont assemblées avant l'extraction ;
+    # le profil d'authentification du projet (re-scraping) accompagne les requêtes vers l'hôte de la spec
+    return extraire_endpoints(assembler_spec(url, session=gestionnaire_auth.session(projet_id, url)))
+
+
+def _parametre(name, emplacement, schema, required, source=None):
+    valeur = exemple_schema(source) if source is not None else None
+    if valeur is None:
+        valeur = exemple_schema(schema)
+    if valeur is None:
+        valeur = (source or {}).get("default", schema.get("default"))
+
+    parametre = {
+        "name": name,
+        "in": emplacement,
+        "type": type_schema(schema),
+        "required": required,
+    }
+    # Contraintes conservées pour régénérer des valeurs (mode fuzz des tests en masse)
+    schema = contraintes(schema)
+    if set(schema) - {"type"}:
+        parametre["schema"] = schema
+    parametre["value"] = valeur if valeur is not None else generer_valeur(schema)
+    return parametre
+
 
+def _parametres_corps(swagger_json, schema):
+    proprietes, requis = schema_objet(swagger_json, schema)
+    return [
+        _parametre(name, "body", dereferencer(swagger_json, prop), name in requis)
+        for name, prop in proprietes.items()
+    ]
 
-# --------- Scraping Swagger JSON ---------
-def scrape_swagger(url):
-    response = requests.get(url)
-    response.raise_for_status()
-    swagger_json = response.json()
 
+def extraire_endpoints(swagger_json):
+    """
+    Extrait la liste des endpoints d'un document Swagger 2.0 / OpenAPI 3.0 / 3.1 déjà chargé.
+    Les $ref locales (definitions, components) sont résolues.
+    """
     endpoints = []
     paths = swagger_json.get("paths", {})
 
     for path, methods in paths.items():
+        methods = resoudre_ref(swagger_json, methods)
+        communs = methods.get("parameters", [])  # paramètres déclarés au niveau du chemin
         for method, details in methods.items():
+            if method.lower() not in METHODES_HTTP or not isinstance(details, dict):
+                continue
             summary = details.get("summary", "") or details.get("description", "")
             if "IGNORE THIS ENDPOINT FOR NOW" in summary:
                 continue
@@ -217,45 +331,43 @@ def scrape_swagger(url):
                 "summary": summary,
                 "parameters": []
             }
-
-            for param in details.get("parameters", []):
-                param_type = ""
-                if "schema" in param and param["schema"]:
-                    param_type = param["schema"].get("type", "")
-                else:
-                    param_type = param.get("type", "")
-
-                param_value = param.get("example")
-                if param_value is None:
-                    param_value = param.get("default", "valeur")
-
-                endpoint["parameters"].append({
-                    "name": param.get("name", ""),
-                    "in": param.get("in", ""),
-                    "type": param_type,
-                    "required": param.get("required", False),
-                    "value": param_value
-                })
+            if details.get("tags"):
+                endpoint["tags"] = details["tags"]
+
+            parametres = {}
+            for param in communs + details.get("parameters", []):
+                param = resoudre_ref(swagger_json, param)
+                parametres[(param.get("name", ""), param.get("in", ""))] = param
+
+            for param in parametres.values():
+                if param.get("in") == "body":
+                    # Swagger 2.0 : le corps est un paramètre dont le schéma pointe souvent vers definitions
+                    endpoint["parameters"].extend(_parametres_corps(swagger_json, param.get("schema")))
+                    continue
+                schema = resoudre_ref(swagger_json, param.get("schema") or param)
+                endpoint["parameters"].append(
+                    _parametre(param.get("name", ""), param.get("in", ""), schema, param.get("required", False), param)
+                )
 
             if "requestBody" in details:
-                content = details["requestBody"].get("content", {})
+                content = resoudre_ref(swagger_json, details["requestBody"]).get("content", {})
                 if "application/json" in content:
                     schema = content["application/json"].get("schema", {})
-                    props = schema.get("properties", {})
-                    required_props = schema.get("required", [])
-                    for name, prop in props.items():
-                        param_type = prop.get("type", "")
-                        example_value = prop.get("example")
-                        if example_value is None:
-                            example_value = prop.get("default", "valeur")
-
-                        endpoint["parameters"].append({
-                            "name": name,
-                            "in": "body",
-                            "type": param_type,
-                            "required": name in required_props,
-                            "value": example_value
-                        })
+                    endpoint["parameters"].extend(_parametres_corps(swagger_json, schema))
+
+            # Schémas de réponse documentés (Swagger 2.0 : schema, OpenAPI 3 : content)
+            responses = {}
+            for code, reponse in (details.get("responses") or {}).items():
+                reponse = resoudre_ref(swagger_json, reponse)
+                if not isinstance(reponse, dict):
+                    continue
+                schema = reponse.get("schema")
+                if schema is None:
+                    schema = reponse.get("content", {}).get("application/json", {}).get("schema")
+                if schema:
+                    responses[str(code)] = dereferencer(swagger_json, schema)
+            if responses:
+                endpoint["responses"] = responses
 
             endpoints.append(endpoint)
 
@@ -283,13 +395,6 @@ def enrich_and_save(swagger_data, url):
 
         ep["url_complete"] = full_url
 
-    # Sauvegarde dans fichier JSON local
-    file_path = os.path.abspath(
-        os.path.join(os.path.dirname(__file__), '..', 'swagger_report.json')
-    )
-    with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(swagger_data, f, ensure_ascii=False, indent=2)
-
     return swagger_data
 
 @csrf_exempt
@@ -348,23 +453,75 @@ def afficher_rapport_swagger(request):
 
     return render(request, "rapport_swagger.html", context)
 
+def scraper_projet(url, canal=None):
+    """Scrape la spec, crée le projet et l'indexe ; chaque étape est publiée sur `canal` s'il est fourni."""
+    def etape(nom, **infos):
+        if canal is not None:
+            canal.publier("progression", {"etape": nom, **infos})
+
+    # Même URL : nouvelle version du projet existant plutôt qu'un doublon
+    projet = SwaggerProject.objects.filter(swagger_url=url).order_by('-created_at', '-id').first()
+    etape("telechargement", url=url)
+    swagger_data = scrape_swagger(url, projet.pk if projet else None)
+    etape("analyse", endpoints=len(swagger_data))
+    swagger_data = enrich_and_save(swagger_data, url)
+    return enregistrer_projet(url, swagger_data, projet, etape)
+
+
+def enregistrer_projet(url, swagger_data, projet=None, etape=lambda nom, **infos: None):
+    """Écritures d'un scraping : projet (créé ou nouvelle version), version de spec, rapport, index, Endpoint."""
+    etape("enregistrement")
+    if projet is None:
+        ancien = None
+        projet = SwaggerProject.objects.create(
+            name=None,
+            swagger_url=url,
+            swagger_json=swagger_data,
+            last_scraped_at=timezone.now()
+        )
+    else:
+        ancien = projet.swagger_json if not projet.spec_versions.exists() else None
+        projet.swagger_json = swagger_data
+        projet.last_scraped_at = timezone.now()
+        projet.save()
+    version = enregistrer_version(projet, ancien)
+    etape("version", project=projet.pk, version=version.number)
+    ecrire_rapport(cle_projet(projet.pk), swagger_data)
+    etape("indexation", project=projet.pk)  # index de recherche : mis à jour à l'enregistrement (signal)
+    synchroniser_endpoints(projet)
+    return projet
+
+
+def _scraping_en_direct(canal, url):
+    projet = scraper_projet(url, canal)
+    canal.terminer("fin", {"project": projet.pk, "endpoints": projet.endpoint_count})
+
+
+def reponse_tache(request, cle):
+    """202 + URL du flux SSE où suivre la tâche lancée en arrière-plan."""
+    events_url = request.build_absolute_uri(reverse('scraping_data:events', args=[cle]))
+    return JsonResponse({'status': 'ok', 'job': cle, 'events_url': events_url}, status=202)
+
+
 @require_POST
 def lancer_scraping(request):
     url = request.POST.get('swagger_url')
-    if not url:
-        messages.error(request, "L'URL Swagger est manquante.")
+    en_direct = request.POST.get('live') or 'application/json' in request.headers.get('Accept', '')
+    # Seules les URLs http(s) sont acceptées : jamais de lecture de fichiers du serveur depuis le web
+    erreur = None if url and est_distante(url) else (
+        "L'URL Swagger est manquante." if not url else "L'URL Swagger doit commencer par http:// ou https://.")
+    if erreur:
+        if en_direct:
+            return JsonResponse({'status': 'error', 'error': erreur}, status=400)
+        messages.error(request, erreur)
         return redirect('scraping_data:generate_test_page')
 
-    try:
-        swagger_data = scrape_swagger(url)
-        swagger_data = enrich_and_save(swagger_data, url)
-
-        SwaggerProject.objects.create(
-            name=None,
-            swagger_url=url,
-            swagger_json=swagger_data
-        )
+    # Mode direct : le scraping part en arrière-plan, la progression est suivie sur le flux SSE
+    if en_direct:
+        return reponse_tache(request, lancer_tache(_scraping_en_direct, url))
 
+    try:
+        scraper_projet(url)
         messages.success(request, "Scraping lancé avec succès.")
         return redirect('scraping_data:rapport-swagger')
 
@@ -385,25 +542,26 @@ def rapport_swagger_pdf(request):
 
 
 # ======================= VUES TEST API ========================
-test_history = []
-
 from scraping_data.models import Endpoint
 
 def tester_page(request):
     method = request.GET.get("method", "")
     url = request.GET.get("url", "")
 
-    # On cherche l'endpoint correspondant
+    # On cherche l'endpoint correspondant : URL exacte, sinon template de chemin (/users/{id})
     endpoint = Endpoint.objects.filter(method=method, cleaned_url=url).first()
+    path_vars = None
+    if endpoint is None and url:
+        endpoint, path_vars = trouver_endpoint(method or "GET", url, request.GET.get("project"))
 
     if endpoint:
         context = {
             "default_method": endpoint.method,
             "default_url": endpoint.cleaned_url,
-            "default_params": endpoint.query_params,       # JSON
-            "default_path_vars": endpoint.path_variables,  # JSON
-            "default_body": endpoint.request_body,         # JSON
-            "default_headers": endpoint.headers,           # JSON
+            "default_params": json.dumps(endpoint.query_params or {}),
+            "default_path_vars": json.dumps({**(endpoint.path_variables or {}), **(path_vars or {})}),
+            "default_body": json.dumps(endpoint.request_body or {}),
+            "default_headers": json.dumps(endpoint.headers or {}),
         }
     else:
         context = {
@@ -435,66 +593,54 @@ def test_endpoint(request):
             'error': 'Clé API NASA (api_key) requise pour cet endpoint'
         }, status=400)
 
-    formatted_url = url
-    for key, value in path_vars.items():
-        formatted_url = formatted_url.replace(f'{{{key}}}', value)
-
-    try:
-        resp = requests.request(
-            method,
-            formatted_url,
-            params=params,
-            json=body if body else None,
-            headers=headers,
-            timeout=5
-        )
-
-        if 200 <= resp.status_code <= 299:
-            test_status = "succeeded" if resp.status_code == 201 else "passed"
-        else:
-            test_status = "failed"
-
-        entry = {
-            'timestamp': timezone.now().isoformat(),
-            'method': method,
-            'url': formatted_url,
-            'params': params,
-            'path_vars': path_vars,
-            'body': body,
-            'headers': headers,
-            'status_code': resp.status_code,
-            'response': resp.text,
-            'test_status': test_status,
-        }
-        test_history.append(entry)
-
-        return JsonResponse({
-            'status': 'success',
-            'status_code': resp.status_code,
-            'response': resp.text,
-            'request_body': body
-        })
-
-    except requests.RequestException as e:
-        entry = {
-            'timestamp': timezone.now().isoformat(),
-            'method': method,
-            'url': formatted_url,
-            'params': params,
-            'path_vars': path_vars,
-            'body': body,
-            'headers': headers,
-            'status_code': 500,
-            'response': str(e),
-            'test_status': 'failed'
-        }
-        test_history.append(entry)
-        return JsonResponse({'status': 'error', 'error': str(e)}, status=500)
+    # Endpoint catalogué : cache HTTP du projet (si activé) et réponse de référence
+    endpoint, variables = trouver_endpoint(method, formater_url(url, path_vars))
+    projet_id = endpoint.project_id if endpoint else None
+    cache = endpoint is not None and endpoint.project.cache_enabled
+    entry = executer_test(method, url, params, path_vars, body, headers, projet_id=projet_id, cache=cache,
+                          interactif=True)
+
+    if 'erreur' in entry:
+        return JsonResponse({'status': 'error', 'error': entry['erreur']}, status=500)
+    if entry.get('limite_locale'):
+        # Limites de débit de l'hôte / du projet : la requête n'est pas partie, l'utilisateur réessaie plus tard
+        erreur = JsonResponse({'status': 'error', 'error': entry['response'], 'retry_after': entry['retry_after']},
+                              status=429)
+        erreur['Retry-After'] = str(math.ceil(entry['retry_after']))
+        return erreur
+
+    reponse = {
+        'status': 'success',
+        'status_code': entry['status_code'],
+        'response': entry['response'],
+        'request_body': body
+    }
+    if 'cache' in entry:
+        reponse['cache'] = entry['cache']
+    if 'retry_after' in entry:
+        reponse['retry_after'] = entry['retry_after']
+    golden = golden_test_manuel(endpoint, variables, entry, method, params, body, data.get('record_golden'))
+    if golden is not None:
+        reponse['golden'] = golden
+    return JsonResponse(reponse)
+
+
+# ✅ Réponse de référence d'un test manuel (endpoint catalogué uniquement)
+def golden_test_manuel(endpoint, variables, entry, method, params, body, enregistrer=False):
+    """{"recorded": true} si enregistrer, sinon le verdict de verifier_golden (None sans référence)."""
+    if endpoint is None:
+        return None
+    payload = {'params': params, 'path_vars': variables, 'body': body}
+    if enregistrer:
+        enregistrer_golden(endpoint.project_id, method, endpoint.endpoint, payload, entry['status_code'], entry['response'])
+        return {'recorded': True}
+    goldens = index_goldens(endpoint.project_id, method=method.upper(), endpoint=endpoint.endpoint)
+    return verifier_golden(goldens, method, endpoint.endpoint, payload, entry['status_code'], entry['response'])
 
 
 def download_history(request):
     buffer = io.StringIO()
-    json.dump(test_history, buffer, indent=2)
+    json.dump([entree_complete(e) for e in list(test_history)], buffer, indent=2)
     buffer.seek(0)
     mem = io.BytesIO()
     mem.write(buffer.getvalue().encode('utf-8'))
@@ -526,26 +672,90 @@ def generate_test_report(request):
 
 
 # ====== Fonction pour lancer les tests sur tous les endpoints =======
-def run_tests(request):
-    endpoints = SwaggerEndpoint.objects.all()
-    results = []
+# ✅ Tests en masse d'un projet : endpoints isolés, ou plan de test si ?plan=<id>
+def options_tests(request):
+    """
+    ?base_url=...  ?concurrency=4 (borné à TESTS_MAX_CONCURRENCY)  ?fuzz=<graine> (valeurs régénérées selon les schémas) ;
+    ValueError si invalide.
+    """
+    fuzz = request.GET.get("fuzz")
+    concurrence = int(request.GET.get("concurrency") or 1)
+    return {
+        "base_url": request.GET.get("base_url"),
+        "concurrence": min(max(1, concurrence), getattr(settings, "TESTS_MAX_CONCURRENCY", 32)),
+        "graine_fuzz": int(fuzz) if fuzz not in (None, "") else None,
+    }
 
-    for ep in endpoints:
-        try:
-            response = requests.get(ep.url_complete, timeout=5)
-            results.append({
-                "endpoint": ep.url_complete,
-                "success": response.status_code == 200,
-                "message": f"{response.status_code} {response.reason}"
-            })
-        except Exception as e:
+
+def erreur_options_tests():
+    return JsonResponse({'status': 'error', 'error': 'concurrency et fuzz doivent être des entiers.'}, status=400)
+
+
+def projets_du_plan(request, projets):
+    """?plan=<id> : seul le projet de ce plan est testé ; None si le plan n'existe pas parmi `projets`."""
+    plan_id = request.GET.get("plan")
+    if not plan_id:
+        return projets
+    if not plan_id.isdigit():
+        return None
+    projets = projets.filter(test_plans__pk=plan_id)
+    return projets if projets.exists() else None
+
+
+def erreur_plan_inconnu(request):
+    return JsonResponse({'status': 'error', 'error': f"Plan de test {request.GET.get('plan')} introuvable."}, status=404)
+
+
+def resultats_tests_projet(request, projet, options):
+    """Options de options_tests, plus ?plan=<id> (vérifié par projets_du_plan) pour exécuter un plan de test."""
+    plan_id = request.GET.get("plan")
+    if plan_id:
+        plan = projet.test_plans.get(pk=plan_id)
+        return executer_plan(plan, base_url=options["base_url"], concurrence=options["concurrence"])["etapes"]
+    return executer_tests(projet, **options)
+
+
+# ✅ Tests en masse en direct : un événement SSE par endpoint testé
+def _tests_en_direct(canal, lots, base_url=None, concurrence=1, graine_fuzz=None):
+    total = sum(len(endpoints) for _, endpoints in lots)
+    faits = echecs = 0
+    debut = time.perf_counter()
+    canal.publier("debut", {"total": total})
+    for projet, endpoints in lots:
+        for resultat in iterer_tests(projet, base_url=base_url, concurrence=concurrence,
+                                     graine_fuzz=graine_fuzz, endpoints=endpoints):
+            faits += 1
+            echecs += en_echec(resultat)
+            canal.publier("resultat", {"project": projet.pk, "faits": faits, "total": total, **resultat})
+    canal.terminer("fin", {"total": total, "faits": faits, "echecs": echecs,
+                           "duree_ms": round((time.perf_counter() - debut) * 1000, 2)})
+
+
+def run_tests(request):
+    try:
+        options = options_tests(request)
+    except ValueError:
+        return erreur_options_tests()
+    projets = SwaggerProject.objects.all()
+    project_id = request.GET.get("id")
+    if project_id:
+        projets = projets.filter(pk=project_id)
+    projets = projets_du_plan(request, projets)
+    if projets is None:
+        return erreur_plan_inconnu(request)
+
+    results, bruts = [], []
+    for projet in projets:
+        for res in resultats_tests_projet(request, projet, options):
+            bruts.append(res)
             results.append({
-                "endpoint": ep.url_complete,
-                "success": False,
-                "message": str(e)
+                "endpoint": res["endpoint"],
+                "success": not en_echec(res),
+                "message": f"{res['status_code']} {res['details']}",
+                "violations": res.get("violations", []),
             })
 
-    return JsonResponse({"status": "ok", "results": results})
+    return JsonResponse({"status": "ok", "results": results, "schema_report": taux_violations(bruts)})
 
 
 from django.shortcuts import redirect
@@ -566,8 +776,7 @@ def tester_tous(request):
 
 
 def clear_tests(request):
-    global test_history
-    test_history = []
+    test_history.clear()
     messages.info(request, "Les résultats de test ont été effacés.")
     return redirect('scraping_data:rapport-swagger')
 
@@ -575,14 +784,47 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 
 class SwaggerScrapeAPIView(APIView):
+    """Endpoints de tous les projets, ou d'un seul (?project=<id>)."""
     def get(self, request):
-        projects = SwaggerProject.objects.all()
+        projects = SwaggerProject.objects.select_related('spec_blob')
+        if request.GET.get('project'):
+            try:
+                projects = projects.filter(pk=int(request.GET['project']))
+            except ValueError:
+                return Response({'status': 'error', 'error': 'project doit être un entier.'},
+                                status=status.HTTP_400_BAD_REQUEST)
         all_endpoints = []
         for projet in projects:
             swagger_json = projet.swagger_json or []
             all_endpoints.extend(swagger_json)
         return Response(all_endpoints)
 
+class ProjectListAPIView(APIView):
+    """Liste paginée des projets (résumé uniquement, sans swagger_json)."""
+    def get(self, request):
+        try:
+            taille = max(1, min(int(request.GET.get('limit', 50)), 200))
+        except ValueError:
+            return Response({'status': 'error', 'error': 'limit doit être un entier.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            context = paginer_projets(request, taille=taille)
+        except CurseurInvalide as e:
+            return Response({'status': 'error', 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response({
+            'results': [{
+                'id': p.pk,
+                'name': p.name,
+                'swagger_url': p.swagger_url,
+                'created_at': p.created_at,
+                'last_scraped_at': p.last_scraped_at,
+                'endpoint_count': p.endpoint_count,
+                'spec_size': p.spec_size,
+            } for p in context['projets']],
+            'next': context['next_cursor'],
+            'previous': context['previous_cursor'],
+        })
+
 import json
 import requests
 from django.views.decorators.csrf import csrf_exempt
@@ -592,47 +834,39 @@ from django.views.decorators.http import require_POST
 from django.utils import timezone
 from scraping_data.models import Endpoint
 
-# à adapter selon ton modèle
-
-test_history = []
-
 @csrf_exempt
 def tester_tous_endpoints(request):
-    endpoints = SwaggerEndpoint.objects.all()  # récupère les endpoints depuis la DB
+    """
+    Teste tous les endpoints d'un projet (?id=...) ou de tous les projets.
+    ?base_url=http://127.0.0.1:8001 permet de cibler le serveur mock local.
+    """
+    try:
+        options = options_tests(request)
+    except ValueError:
+        return erreur_options_tests()
+    projets = SwaggerProject.objects.all()
+    project_id = request.GET.get("id")
+    if project_id:
+        projets = projets.filter(pk=project_id)
+    projets = projets_du_plan(request, projets)
+    if projets is None:
+        return erreur_plan_inconnu(request)
+
+    # ?live=1 : les résultats arrivent un par un sur un flux SSE au lieu d'attendre la fin du dernier test
+    if request.GET.get("live") and not request.GET.get("plan"):
+        lots = [(projet, projet.swagger_json or []) for projet in projets.select_related('spec_blob')]
+        cle = lancer_tache(_tests_en_direct, lots, **options)
+        if 'application/json' in request.headers.get('Accept', ''):
+            return reponse_tache(request, cle)
+        return render(request, 'resultats_tests.html', {
+            'results': [], 'events_url': reverse('scraping_data:events', args=[cle]),
+        })
 
     results = []
+    for projet in projets:
+        results.extend(resultats_tests_projet(request, projet, options))
 
-    for ep in endpoints:
-        payload = {
-            'method': ep.method,
-            'url': ep.url_complete,
-            'params': ep.params or {},
-            'path_vars': ep.path_vars or {},
-            'body': ep.body or {},
-            'headers': ep.headers or {},
-        }
-
-        try:
-            # Appelle la même logique que `test_endpoint`
-            response = requests.post(
-                request.build_absolute_uri('/api/test-endpoint/'),
-                data=json.dumps(payload),
-                headers={'Content-Type': 'application/json'}
-            )
-            res_data = response.json()
-            results.append({
-                'endpoint': ep.url_complete,
-                'status': res_data.get('status', 'error'),
-                'details': res_data.get('response', '')[:200]
-            })
-        except Exception as e:
-            results.append({
-                'endpoint': ep.url_complete,
-                'status': 'error',
-                'details': str(e)
-            })
-
-    return render(request, 'swagger/test_results.html', {'results': results})
+    return render(request, 'resultats_tests.html', {'results': results, 'schema_report': taux_violations(results)})
 
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
@@ -652,6 +886,7 @@ def clean_tests(request):
 
         # Suppression réelle des endpoints liés à ce projet
         nb_deleted, _ = project.endpoints.all().delete()
+        routage.invalider(project.pk)
 
         return JsonResponse({'success': True, 'deleted_count': nb_deleted})
 
@@ -686,6 +921,8 @@ def add_header(request, pk):
 
             projet.swagger_json = swagger_json
             projet.save()
+            enregistrer_version(projet)
+            synchroniser_endpoints(projet)
 
         return redirect('scraping_data:project-parameters', pk=pk)
 
@@ -730,6 +967,8 @@ def update_header(request, pk, header_name):
         # Sauvegarder la modification dans le projet
         project.swagger_json = swagger_json
         project.save()
+        enregistrer_version(project)
+        synchroniser_endpoints(project)
 
         # Rediriger vers la page des paramètres
         return redirect('scraping_data:project-parameters', pk=project.id)
@@ -738,4 +977,342 @@ def update_header(request, pk, header_name):
     return render(request, 'update_header.html', {
         'project': project,
         'header': header,
-    })
\ No newline at end of file
+    })
+
+
+# ======================= PROFILAGE (debug) ========================
+from .middleware import statistiques, reinitialiser
+
+def profiling_stats(request):
+    """Agrégats du ProfilingMiddleware ; réservé au mode DEBUG ou aux membres du staff."""
+    if not (settings.DEBUG or request.user.is_staff):
+        return JsonResponse({'status': 'error', 'error': 'Accès refusé.'}, status=403)
+
+    if request.method == 'POST' and request.POST.get('reset'):
+        reinitialiser()
+
+    return JsonResponse({'enabled': settings.PROFILING_ENABLED, **statistiques()})
+
+
+# ======================= RECHERCHE D'ENDPOINTS ========================
+def search_endpoints(request):
+    """
+    Recherche plein texte (chemin, résumé, paramètres, tags) sur tous les projets.
+    ?q=user get  ?method=GET&method=POST  ?project=3  ?prefix=/users  ?limit=50&offset=0
+    """
+    debut = time.perf_counter()
+    try:
+        projets = {int(p) for p in request.GET.getlist('project')}
+        limit = min(int(request.GET.get('limit', 50)), 500)
+        offset = int(request.GET.get('offset', 0))
+    except ValueError:
+        return JsonResponse({'status': 'error', 'error': 'Paramètre numérique invalide.'}, status=400)
+    if limit < 0 or offset < 0:
+        return JsonResponse({'status': 'error', 'error': 'limit et offset doivent être positifs.'}, status=400)
+
+    index_recherche.preparer()
+
+    resultat = index_recherche.rechercher(
+        q=request.GET.get('q', ''),
+        methods={m.upper() for m in request.GET.getlist('method')},
+        projets=projets,
+        prefixe=request.GET.get('prefix'),
+        limit=limit,
+        offset=offset,
+    )
+    resultat['took_ms'] = round((time.perf_counter() - debut) * 1000, 2)
+    return JsonResponse(resultat)
+
+
+# ======================= PLANS DE TEST ========================
+def plan_en_dict(plan):
+    return {
+        'id': plan.pk,
+        'project': plan.project_id,
+        'name': plan.name,
+        'steps': plan.steps,
+        'variables': plan.variables,
+        'updated_at': plan.updated_at,
+    }
+
+
+class TestPlanListAPIView(APIView):
+    """Plans de test d'un projet : liste (GET) et création (POST {name, steps, variables})."""
+    def get(self, request, pk):
+        projet = get_object_or_404(SwaggerProject.objects.only('id'), pk=pk)
+        return Response([plan_en_dict(p) for p in projet.test_plans.order_by('id')])
+
+    def post(self, request, pk):
+        projet = get_object_or_404(SwaggerProject.objects.only('id'), pk=pk)
+        steps = request.data.get('steps')
+        variables = request.data.get('variables') or {}
+        try:
+            verifier_plan(steps, variables)
+        except PlanInvalide as e:
+            return Response({'status': 'error', 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        plan = TestPlan.objects.create(
+            project=projet,
+            name=request.data.get('name') or f"Plan {projet.pk}",
+            steps=steps,
+            variables=variables,
+        )
+        return Response(plan_en_dict(plan), status=status.HTTP_201_CREATED)
+
+
+class TestPlanRunAPIView(APIView):
+    """Exécute un plan : POST /api/plans/<id>/run/?base_url=...&concurrency=4"""
+    def post(self, request, pk):
+        plan = get_object_or_404(TestPlan.objects.select_related('project'), pk=pk)
+        try:
+            concurrence = int(request.GET.get('concurrency', 4))
+            resultat = executer_plan(plan, base_url=request.GET.get('base_url'), concurrence=concurrence)
+        except (ValueError, PlanInvalide) as e:
+            return Response({'status': 'error', 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(resultat)
+
+
+def monitor_en_dict(monitor):
+    return {
+        'id': monitor.pk,
+        'endpoint': monitor.endpoint_id,
+        'interval_seconds': monitor.interval_seconds,
+        'timeout': monitor.timeout,
+        'expect_status': monitor.expect_status,
+        'enabled': monitor.enabled,
+        'next_run_at': monitor.next_run_at,
+        'last_run_at': monitor.last_run_at,
+        'missed_runs': monitor.missed_runs,
+    }
+
+
+class MonitorListAPIView(APIView):
+    """Monitors d'un projet : liste (GET) et création (POST {endpoint, interval_seconds, timeout, expect_status})."""
+    def get(self, request, pk):
+        monitors = Monitor.objects.filter(endpoint__project_id=pk).order_by('id')
+        return Response([monitor_en_dict(m) for m in monitors])
+
+    def post(self, request, pk):
+        endpoint_id = request.data.get('endpoint')
+        if isinstance(endpoint_id, bool) or not str(endpoint_id).isdigit():
+            return Response({'status': 'error', 'error': 'endpoint doit être un identifiant numérique.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        endpoint = Endpoint.objects.filter(project_id=pk, pk=int(endpoint_id)).first()
+        if endpoint is None:
+            return Response({'status': 'error', 'error': 'Endpoint introuvable dans ce projet.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            intervalle = int(request.data.get('interval_seconds', 60))
+            timeout = float(request.data.get('timeout', 5))
+        except (TypeError, ValueError):
+            return Response({'status': 'error', 'error': 'interval_seconds et timeout doivent être numériques.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if intervalle < 10:
+            return Response({'status': 'error', 'error': 'interval_seconds doit valoir au moins 10.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        attendu = request.data.get('expect_status')
+        if attendu in (None, ''):
+            attendu = None
+        elif isinstance(attendu, bool) or not str(attendu).isdigit() or not 100 <= int(attendu) <= 599:
+            return Response({'status': 'error', 'error': 'expect_status doit être un code HTTP entre 100 et 599.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        else:
+            attendu = int(attendu)
+        monitor = Monitor.objects.create(endpoint=endpoint, interval_seconds=intervalle, timeout=timeout,
+                                         expect_status=attendu)
+        return Response(monitor_en_dict(monitor), status=status.HTTP_201_CREATED)
+
+
+class MonitorSeriesAPIView(APIView):
+    """Série temporelle : GET /api/monitors/<id>/series/?hours=24 (résolution choisie selon la période, ou ?resolution=0|60|3600)"""
+    def get(self, request, pk):
+        monitor = get_object_or_404(Monitor, pk=pk)
+        try:
+            heures = float(request.GET.get('hours', 24))
+            resolution = request.GET.get('resolution')
+            resolution = int(resolution) if resolution not in (None, '') else None
+        except ValueError:
+            return Response({'status': 'error', 'error': 'Paramètres hours / resolution invalides.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if resolution not in (None, 0, 60, 3600):
+            return Response({'status': 'error', 'error': 'resolution doit valoir 0, 60 ou 3600.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response(serie(monitor, timezone.now() - timedelta(hours=heures), resolution=resolution))
+
+
+class SpecVersionListAPIView(APIView):
+    """Historique des versions de la spec d'un projet."""
+    def get(self, request, pk):
+        projet = get_object_or_404(SwaggerProject.objects.only('id'), pk=pk)
+        return Response([
+            {
+                'number': v.number, 'created_at': v.created_at, 'snapshot': v.snapshot_blob_id is not None,
+                'endpoint_count': v.endpoint_count, 'added': v.added, 'removed': v.removed, 'changed': v.changed,
+            }
+            for v in projet.spec_versions.order_by('number')
+        ])
+
+
+class SpecVersionDetailAPIView(APIView):
+    """Contenu (liste d'endpoints) d'une version : GET /api/projects/<id>/versions/<n>/"""
+    def get(self, request, pk, number):
+        projet = get_object_or_404(SwaggerProject.objects.only('id'), pk=pk)
+        try:
+            endpoints = contenu_version(projet, number)
+        except VersionIntrouvable as e:
+            return Response({'status': 'error', 'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        return Response({'number': number, 'endpoints': endpoints})
+
+
+class SpecVersionDiffAPIView(APIView):
+    """Diff entre deux versions : GET /api/projects/<id>/versions/diff/?from=1&to=3"""
+    def get(self, request, pk):
+        projet = get_object_or_404(SwaggerProject.objects.only('id'), pk=pk)
+        try:
+            depuis, vers = int(request.GET['from']), int(request.GET['to'])
+        except (KeyError, ValueError):
+            return Response({'status': 'error', 'error': 'Paramètres from et to (numéros de version) requis.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            return Response(diff_versions(projet, depuis, vers))
+        except VersionIntrouvable as e:
+            return Response({'status': 'error', 'error': str(e)}, status=status.HTTP_404_NOT_FOUND)
+
+
+def golden_en_dict(golden):
+    return {
+        'id': golden.pk,
+        'method': golden.method,
+        'endpoint': golden.endpoint,
+        'params_hash': golden.params_hash,
+        'parameters': golden.parameters,
+        'status_code': golden.status_code,
+        'ignore_paths': golden.ignore_paths,
+        'recorded_at': golden.recorded_at,
+    }
+
+
+class GoldenListAPIView(APIView):
+    """
+    Réponses de référence d'un projet : liste (GET) et enregistrement (POST {method, endpoint, ignore_paths?, base_url?}).
+    Le POST appelle l'endpoint avec les valeurs de la spec et enregistre sa réponse (ou la remplace).
+    """
+    def get(self, request, pk):
+        goldens = GoldenResponse.objects.filter(project_id=pk).order_by('endpoint', 'method', 'id')
+        return Response([golden_en_dict(g) for g in goldens])
+
+    def post(self, request, pk):
+        projet = get_object_or_404(SwaggerProject, pk=pk)
+        cle = f"{str(request.data.get('method', 'GET')).upper()} {request.data.get('endpoint', '')}"
+        ep = next((e for e in projet.swagger_json or [] if cle_endpoint(e) == cle), None)
+        if ep is None:
+            return Response({'status': 'error', 'error': f'Endpoint {cle} absent de la spec du projet.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        ignore_paths = request.data.get('ignore_paths')
+        if ignore_paths is not None and (not isinstance(ignore_paths, list)
+                                         or not all(isinstance(m, str) for m in ignore_paths)):
+            return Response({'status': 'error', 'error': 'ignore_paths doit être une liste de chemins JSONPath.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        try:
+            compiler_motifs(tuple(ignore_paths or ()))  # avant d'appeler l'API : un motif invalide ne coûte pas de requête
+        except JSONPathInvalide as e:
+            return Response({'status': 'error', 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        payload = preparer_payload(ep, request.data.get('base_url') or url_base_projet(projet))
+        entry = executer_test(projet_id=projet.pk, **payload)
+        if 'erreur' in entry:
+            return Response({'status': 'error', 'error': entry['erreur']}, status=status.HTTP_502_BAD_GATEWAY)
+        golden = enregistrer_golden(projet.pk, payload['method'], ep.get('endpoint', ''), payload,
+                                    entry['status_code'], entry['response'], ignore_paths)
+        return Response(golden_en_dict(golden), status=status.HTTP_201_CREATED)
+
+
+class HttpCacheAPIView(APIView):
+    """
+    Cache HTTP du testeur pour un projet : GET (état et métriques), POST {"enabled": bool}, DELETE (vide ses entrées).
+    """
+    def reponse(self, projet):
+        return Response({'project': projet.pk, 'enabled': projet.cache_enabled,
+                         'stats': cache_http.statistiques(projet.pk), 'global': cache_http.statistiques()})
+
+    def get(self, request, pk):
+        return self.reponse(get_object_or_404(SwaggerProject.objects.only('id', 'cache_enabled'), pk=pk))
+
+    def post(self, request, pk):
+        projet = get_object_or_404(SwaggerProject.objects.only('id', 'cache_enabled'), pk=pk)
+        if not isinstance(request.data.get('enabled'), bool):
+            return Response({'status': 'error', 'error': 'enabled doit valoir true ou false.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        projet.cache_enabled = request.data['enabled']
+        projet.save(update_fields=['cache_enabled'])
+        if not projet.cache_enabled:
+            cache_http.purger(projet.pk)
+        return self.reponse(projet)
+
+    def delete(self, request, pk):
+        projet = get_object_or_404(SwaggerProject.objects.only('id', 'cache_enabled'), pk=pk)
+        cache_http.purger(projet.pk)
+        return self.reponse(projet)
+
+
+# Champs d'AuthProfile modifiables par l'API ; les secrets ne sont jamais renvoyés
+CHAMPS_AUTH = ('kind', 'enabled', 'token', 'api_key', 'api_key_name', 'api_key_location', 'username', 'password',
+               'token_url', 'client_id', 'client_secret', 'scope')
+SECRETS_AUTH = ('token', 'api_key', 'password', 'client_secret')
+
+
+class AuthProfileSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AuthProfile
+        fields = CHAMPS_AUTH
+
+
+def profil_auth_en_dict(profil):
+    donnees = {champ: getattr(profil, champ) for champ in CHAMPS_AUTH if champ not in SECRETS_AUTH}
+    donnees.update({f"{champ}_set": bool(getattr(profil, champ)) for champ in SECRETS_AUTH})
+    donnees['updated_at'] = profil.updated_at
+    return donnees
+
+
+class AuthProfileAPIView(APIView):
+    """
+    Authentification des requêtes de test d'un projet : GET, PUT {kind, token | api_key... | client_id...}, DELETE.
+    Les secrets sont écrits mais jamais relus (GET indique seulement s'ils sont renseignés).
+    """
+    def get(self, request, pk):
+        profil = get_object_or_404(AuthProfile, project_id=pk)
+        return Response(profil_auth_en_dict(profil))
+
+    def put(self, request, pk):
+        projet = get_object_or_404(SwaggerProject.objects.only('id'), pk=pk)
+        profil = AuthProfile.objects.filter(project=projet).first() or AuthProfile(project=projet)
+        # Types et choix vérifiés (enabled booléen, api_key_location connu...) avant d'écrire dans le modèle
+        serializer = AuthProfileSerializer(profil, data=request.data, partial=True)
+        if not serializer.is_valid():
+            return Response({'status': 'error', 'error': serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        for champ, valeur in serializer.validated_data.items():
+            setattr(profil, champ, valeur)
+        if profil.kind not in dict(AuthProfile.KINDS):
+            return Response({'status': 'error', 'error': f"kind doit valoir {', '.join(dict(AuthProfile.KINDS))}."},
+                            status=status.HTTP_400_BAD_REQUEST)
+        if profil.kind == 'oauth2_client_credentials' and not profil.token_url:
+            return Response({'status': 'error', 'error': 'token_url est requis pour OAuth2.'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        profil.save()
+        # Jeton et réponses obtenus avec les anciens identifiants : oubliés
+        gestionnaire_auth.oublier(projet.pk)
+        cache_http.purger(projet.pk)
+        return Response(profil_auth_en_dict(profil))
+
+    def delete(self, request, pk):
+        AuthProfile.objects.filter(project_id=pk).delete()
+        gestionnaire_auth.oublier(pk)
+        cache_http.purger(pk)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+# ✅ Flux Server-Sent Events d'une tâche (scraping ou tests en masse en direct)
+def evenements(request, cle):
+    canal = bus.canal(cle)
+    if canal is None:
+        return JsonResponse({'status': 'error', 'error': 'Tâche inconnue ou expirée.'}, status=404)
+    return reponse_sse(request, canal)